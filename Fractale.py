@@ -1,46 +1,64 @@
-import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
-
-# Télécharger les données financières
-data = yf.download("AAPL", start="2022-01-01", end="2023-01-01")
+import data_cache
+import reporting
+from fractal_engine import find_fractals
+import instrumentation
+from instrumentation import COMPUTE, RENDER, instrumented
 
 # Détecter les fractales
-def detect_fractals(data):
+@instrumented(COMPUTE)
+def detect_fractals(data, window=5):
     """
     Identifie les fractales haussières et baissières dans les données.
     Args:
         data (pd.DataFrame): Données financières avec prix haut et bas.
+        window (int): Taille impaire de la fenêtre (5 barres par défaut).
     Returns:
-        pd.DataFrame: Données avec colonnes 'Fractal_Up' et 'Fractal_Down'.
+        pd.DataFrame: Données avec colonnes 'Fractal_Up' et 'Fractal_Down',
+        marquées sur la barre pivot.
     """
-    data['Fractal_Up'] = (data['High'].shift(2) > data['High'].shift(1)) & \
-                         (data['High'].shift(2) > data['High']) & \
-                         (data['High'].shift(2) > data['High'].shift(-1)) & \
-                         (data['High'].shift(2) > data['High'].shift(-2))
-    
-    data['Fractal_Down'] = (data['Low'].shift(2) < data['Low'].shift(1)) & \
-                           (data['Low'].shift(2) < data['Low']) & \
-                           (data['Low'].shift(2) < data['Low'].shift(-1)) & \
-                           (data['Low'].shift(2) < data['Low'].shift(-2))
-    
+    bullish, bearish = find_fractals(data['High'].to_numpy(), data['Low'].to_numpy(), window)
+    data['Fractal_Up'] = bearish
+    data['Fractal_Down'] = bullish
     return data
 
-# Appliquer la détection des fractales
-data = detect_fractals(data)
-
-# Visualiser les fractales sur un graphique
-plt.figure(figsize=(14, 7))
-plt.plot(data['Close'], label="Prix de clôture", alpha=0.5, linewidth=1)
-plt.scatter(data[data['Fractal_Up']].index, data[data['Fractal_Up']]['High'], 
-            label='Fractale Haussière', color='green', marker='^', s=100)
-plt.scatter(data[data['Fractal_Down']].index, data[data['Fractal_Down']]['Low'], 
-            label='Fractale Baissière', color='red', marker='v', s=100)
-
-# Ajouter des titres et légendes
-plt.title('Détection des Fractales sur les Prix de AAPL', fontsize=16)
-plt.xlabel('Date', fontsize=12)
-plt.ylabel('Prix ($)', fontsize=12)
-plt.legend()
-plt.grid(True)
-plt.show()
+# Visualiser les fractales
+@instrumented(RENDER)
+def plot_fractals(data, ticker, output=None):
+    """
+    Trace les prix de clôture et les fractales détectées.
+    Args:
+        data (pd.DataFrame): Données avec colonnes 'Fractal_Up' et 'Fractal_Down'.
+        ticker (str): Symbole de l'actif.
+        output (str): Fichier .png ou .svg ; None pour afficher la figure.
+    """
+    fig, ax = reporting.figure((14, 7), output)
+    ax.plot(data['Close'], label="Prix de clôture", alpha=0.5, linewidth=1)
+    ax.scatter(data[data['Fractal_Up']].index, data[data['Fractal_Up']]['High'], 
+               label='Fractale Haussière', color='green', marker='^', s=100)
+    ax.scatter(data[data['Fractal_Down']].index, data[data['Fractal_Down']]['Low'], 
+               label='Fractale Baissière', color='red', marker='v', s=100)
+
+    # Ajouter des titres et légendes
+    ax.set_title(f'Détection des Fractales sur les Prix de {ticker}', fontsize=16)
+    ax.set_xlabel('Date', fontsize=12)
+    ax.set_ylabel('Prix ($)', fontsize=12)
+    ax.legend()
+    ax.grid(True)
+    return reporting.finish(fig, output)
+
+def main():
+    # Télécharger les données financières
+    data = data_cache.download("AAPL", start="2022-01-01", end="2023-01-01")
+
+    # Appliquer la détection des fractales
+    data = detect_fractals(data)
+
+    # Visualiser les fractales sur un graphique
+    plot_fractals(data, "AAPL")
+
+    if instrumentation.is_enabled():
+        print(instrumentation.format_summary())
+
+if __name__ == "__main__":
+    main()
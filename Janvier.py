@@ -1,29 +1,20 @@
-import yfinance as yf
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+import argparse
+import os
+import reporting
+from calendar_returns import fetch_monthly_returns, prepare_comparison_data
+import instrumentation
+from instrumentation import RENDER, instrumented
 
-def fetch_data(ticker, start, end):
-    """Télécharge les données historiques et calcule les rendements mensuels."""
-    data = yf.download(ticker, start=start, end=end)
-    data['Monthly Return'] = data['Adj Close'].pct_change().resample('M').last()
-    data['Month'] = data.index.month
-    data['Year'] = data.index.year
-    return data
+@instrumented(RENDER)
+def visualize_3d(comparison, output=None):
+    """
+    Crée une visualisation 3D des rendements.
+    Args:
+        comparison (pd.DataFrame): Rendements mensuels (voir prepare_comparison_data).
+        output (str): Fichier .html (.png/.svg avec kaleido) ; None pour afficher la figure.
+    """
+    import plotly.express as px
 
-def prepare_comparison_data(small_caps, large_caps):
-    """Prépare les données pour une comparaison mois par mois."""
-    comparison = pd.DataFrame({
-        'Year': small_caps['Year'],
-        'Month': small_caps['Month'],
-        'Small Caps Return (%)': small_caps['Monthly Return'] * 100,
-        'Large Caps Return (%)': large_caps['Monthly Return'] * 100,
-    })
-    comparison = comparison.dropna()
-    return comparison
-
-def visualize_3d(comparison):
-    """Crée une visualisation 3D des rendements."""
     fig = px.scatter_3d(
         comparison,
         x='Month',
@@ -48,10 +39,18 @@ def visualize_3d(comparison):
         ),
         margin=dict(l=0, r=0, b=0, t=40),
     )
-    fig.show()
+    return reporting.finish(fig, output)
+
+@instrumented(RENDER)
+def visualize_evolution_bar(comparison, output=None):
+    """
+    Affiche une comparaison de l'évolution des rendements entre décembre et janvier.
+    Args:
+        comparison (pd.DataFrame): Rendements mensuels (voir prepare_comparison_data).
+        output (str): Fichier .html (.png/.svg avec kaleido) ; None pour afficher la figure.
+    """
+    import plotly.graph_objects as go
 
-def visualize_evolution_bar(comparison):
-    """Affiche une comparaison de l'évolution des rendements entre décembre et janvier."""
     december_data = comparison[comparison['Month'] == 12]
     january_data = comparison[comparison['Month'] == 1]
     
@@ -95,9 +94,15 @@ def visualize_evolution_bar(comparison):
         bargap=0.15,
         bargroupgap=0.1
     )
-    fig.show()
+    return reporting.finish(fig, output)
 
 def main():
+    parser = argparse.ArgumentParser(description="Effet janvier : rendements mensuels small caps vs large caps.")
+    parser.add_argument("--output-dir", default=None,
+                        help="Écrit les graphiques en HTML dans ce répertoire au lieu de les afficher.")
+    args = parser.parse_args()
+    output = (lambda name: os.path.join(args.output_dir, name)) if args.output_dir else (lambda name: None)
+
     # Indices représentatifs
     small_caps_ticker = '^RUT'  # Russell 2000 (Small Caps)
     large_caps_ticker = '^GSPC'  # S&P 500 (Large Caps)
@@ -107,17 +112,20 @@ def main():
     end_date = '2023-12-31'
 
     # Chargement des données
-    small_caps_data = fetch_data(small_caps_ticker, start=start_date, end=end_date)
-    large_caps_data = fetch_data(large_caps_ticker, start=start_date, end=end_date)
+    small_caps_data = fetch_monthly_returns(small_caps_ticker, start=start_date, end=end_date)
+    large_caps_data = fetch_monthly_returns(large_caps_ticker, start=start_date, end=end_date)
 
     # Préparation des données pour la comparaison
     comparison = prepare_comparison_data(small_caps_data, large_caps_data)
 
     # Visualisation 3D des rendements
-    visualize_3d(comparison)
+    visualize_3d(comparison, output("visualize_3d.html"))
 
     # Évolution des rendements entre décembre et janvier
-    visualize_evolution_bar(comparison)
+    visualize_evolution_bar(comparison, output("visualize_evolution_bar.html"))
+
+    if instrumentation.is_enabled():
+        print(instrumentation.format_summary())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,239 @@
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from calendar_returns import month_day_positions, period_returns
+
+# Recherche d'anomalies calendaires sur tout un univers
+#
+# La matrice des rendements (périodes x tickers) est construite une fois par
+# paquet de tickers, puis chaque effet est testé pour tous les tickers à la
+# fois : les périodes reçoivent une étiquette de groupe (mois, jour de la
+# semaine, ...), et les effectifs, sommes et sommes des carrés par groupe
+# sont obtenus par un produit matriciel avec l'encodage one-hot des
+# étiquettes. Chaque groupe est comparé au reste des périodes par un test de
+# Welch ; les p-values sont corrigées de la multiplicité (Benjamini-Hochberg)
+# sur l'ensemble du tableau.
+
+EFFECTS = ("month_of_year", "day_of_week", "turn_of_month", "pre_holiday")
+MONTH_NAMES = ("Jan", "Fév", "Mar", "Avr", "Mai", "Juin", "Juil", "Août", "Sep", "Oct", "Nov", "Déc")
+DAY_NAMES = ("Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi")
+RESULT_COLUMNS = ["ticker", "effect", "group", "n", "n_other", "mean", "mean_other",
+                  "diff", "t_stat", "df", "p_value", "q_value"]
+
+_lgamma = np.frompyfunc(math.lgamma, 1, 1)
+
+
+def _betacf(a, b, x, iterations=300):
+    """Fraction continue de la fonction bêta incomplète (méthode de Lentz), vectorisée."""
+    tiny = 1e-300
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = np.ones_like(x)
+    d = 1.0 - qab * x / qap
+    d = 1.0 / np.where(np.abs(d) < tiny, tiny, d)
+    h = d.copy()
+    for m in range(1, iterations + 1):
+        m2 = 2 * m
+        for aa in (m * (b - m) * x / ((qam + m2) * (a + m2)),
+                   -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))):
+            d = 1.0 + aa * d
+            d = 1.0 / np.where(np.abs(d) < tiny, tiny, d)
+            c = 1.0 + aa / c
+            c = np.where(np.abs(c) < tiny, tiny, c)
+            h *= d * c
+        if np.all(np.abs(d * c - 1.0) < 1e-14):
+            break
+    return h
+
+
+def _betainc(a, b, x):
+    """Fonction bêta incomplète régularisée I_x(a, b)."""
+    log_front = (_lgamma(a + b) - _lgamma(a) - _lgamma(b)).astype(np.float64)
+    with np.errstate(divide="ignore"):
+        front = np.exp(log_front + a * np.log(x) + b * np.log1p(-x))
+    # La fraction converge vite pour x < (a + 1) / (a + b + 2) ; sinon, symétrie
+    direct = x < (a + 1.0) / (a + b + 2.0)
+    return np.where(direct,
+                    front * _betacf(a, b, np.where(direct, x, 0.0)) / a,
+                    1.0 - front * _betacf(b, a, np.where(direct, 0.0, 1.0 - x)) / b)
+
+
+def _student_two_sided(t, df):
+    """p-value bilatérale d'une statistique t à df degrés de liberté (non entiers acceptés)."""
+    p = np.full(np.shape(t), np.nan)
+    finite = np.isfinite(t) & np.isfinite(df) & (df > 0)
+    t, df = t[finite], df[finite]
+    p[finite] = np.clip(_betainc(df / 2.0, np.full_like(df, 0.5), df / (df + t * t)), 0.0, 1.0)
+    return p
+
+
+def benjamini_hochberg(p_values):
+    """q-values de Benjamini-Hochberg (les NaN sont ignorés et restent NaN)."""
+    p_values = np.asarray(p_values, dtype=np.float64)
+    q = np.full(p_values.shape, np.nan)
+    finite = np.flatnonzero(np.isfinite(p_values))
+    order = finite[np.argsort(p_values[finite])]
+    ranked = p_values[order] * len(order) / np.arange(1, len(order) + 1)
+    q[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return q
+
+
+def group_tests(returns, labels, n_groups, min_obs=10):
+    """
+    Compare, pour chaque ticker, chaque groupe de périodes au reste (test de Welch).
+    Args:
+        returns (np.ndarray): Rendements (périodes x tickers), NaN si absents.
+        labels (np.ndarray): Groupe de chaque période (entier), -1 pour l'exclure.
+        n_groups (int): Nombre de groupes.
+        min_obs (int): Effectif minimal de chaque côté pour que le test soit calculé.
+    Returns:
+        dict: Tableaux (n_groupes x tickers) 'n', 'n_other', 'mean', 'mean_other',
+        't_stat', 'df' et 'p_value'.
+    """
+    valid = np.isfinite(returns)
+    x = np.where(valid, returns, 0.0)
+    onehot = (labels[:, None] == np.arange(n_groups)).astype(np.float64)
+    n = onehot.T @ valid.astype(np.float64)
+    s = onehot.T @ x
+    ss = onehot.T @ (x * x)
+    n_other = n.sum(axis=0) - n
+    s_other = s.sum(axis=0) - s
+    ss_other = ss.sum(axis=0) - ss
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean, mean_other = s / n, s_other / n_other
+        var = (ss - s * mean) / (n - 1)
+        var_other = (ss_other - s_other * mean_other) / (n_other - 1)
+        a, b = var / n, var_other / n_other
+        se2 = a + b
+        t = (mean - mean_other) / np.sqrt(se2)
+        df = se2 * se2 / (a * a / (n - 1) + b * b / (n_other - 1))
+    enough = (n >= min_obs) & (n_other >= min_obs) & (se2 > 0)
+    t = np.where(enough, t, np.nan)
+    return {"n": n, "n_other": n_other, "mean": mean, "mean_other": mean_other,
+            "t_stat": t, "df": df, "p_value": _student_two_sided(t, df)}
+
+
+def pre_holiday_mask(index):
+    """Séances suivies d'un jour ouvré sans cotation (jour férié du marché)."""
+    days = index.values.astype("datetime64[D]")
+    next_business = np.busday_offset(days, 1, roll="forward")
+    mask = ~np.isin(next_business, days)
+    mask[-1] = False  # Fin de l'historique : on ne sait pas
+    return mask
+
+
+def _daily_returns(prices):
+    values = prices.to_numpy(dtype=np.float64)
+    returns = np.full_like(values, np.nan)
+    returns[1:] = values[1:] / values[:-1] - 1.0
+    return returns
+
+
+def _effect_labels(effect, index, turn_days):
+    """Étiquettes des périodes et noms des groupes rapportés (None = groupe de référence)."""
+    if effect == "month_of_year":
+        return index.month.to_numpy() - 1, list(MONTH_NAMES)
+    if effect == "day_of_week":
+        weekday = index.dayofweek.to_numpy()
+        return np.where(weekday < 5, weekday, -1), list(DAY_NAMES)
+    if effect == "turn_of_month":
+        days_before, days_after = turn_days
+        from_start, from_end = month_day_positions(index)
+        inside = (from_end < days_before) | (from_start < days_after)
+        return np.where(inside, 0, 1), [f"J-{days_before}..J+{days_after}", None]
+    if effect == "pre_holiday":
+        return np.where(pre_holiday_mask(index), 0, 1), ["Veille de férié", None]
+    raise ValueError(f"Effet inconnu : {effect} (choisir parmi {EFFECTS})")
+
+
+def _scan_chunk(prices, effects, turn_days, min_obs):
+    frames = []
+    daily = _daily_returns(prices) if set(effects) - {"month_of_year"} else None
+    for effect in effects:
+        if effect == "month_of_year":
+            monthly = period_returns(prices, "M")
+            returns, index = monthly.to_numpy(), monthly.index
+        else:
+            returns, index = daily, prices.index
+        labels, names = _effect_labels(effect, index, turn_days)
+        stats = group_tests(returns, labels, len(names), min_obs)
+        reported = [i for i, name in enumerate(names) if name is not None]
+        n_tickers = prices.shape[1]
+        frame = pd.DataFrame({
+            "ticker": np.tile(prices.columns.to_numpy(), len(reported)),
+            "effect": effect,
+            "group": np.repeat([names[i] for i in reported], n_tickers),
+        })
+        for key, values in stats.items():
+            frame[key] = values[reported].ravel()
+        frames.append(frame[frame["t_stat"].notna()])
+    return frames
+
+
+def scan_calendar_anomalies(prices, effects=EFFECTS, turn_days=(1, 3), min_obs=10, chunk_size=500):
+    """
+    Teste toutes les anomalies calendaires pour tous les tickers d'un panel de prix.
+    Args:
+        prices (pd.DataFrame): Clôtures quotidiennes (dates x tickers), NaN hors cotation.
+        effects (tuple): Effets à tester, parmi EFFECTS.
+        turn_days (tuple): (séances avant, séances après) le changement de mois.
+        min_obs (int): Nombre minimal d'observations par groupe.
+        chunk_size (int): Nombre de tickers traités ensemble (borne la mémoire).
+    Returns:
+        pd.DataFrame: Un test par ligne (ticker, effet, groupe), colonnes
+        RESULT_COLUMNS, classé par p-value croissante ; 'q_value' est la p-value
+        corrigée par Benjamini-Hochberg sur l'ensemble des tests.
+    """
+    prices = prices.sort_index()
+    frames = []
+    for start in range(0, prices.shape[1], chunk_size):
+        frames.extend(_scan_chunk(prices.iloc[:, start:start + chunk_size], effects, turn_days, min_obs))
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    results = pd.concat(frames, ignore_index=True)
+    results["diff"] = results["mean"] - results["mean_other"]
+    results["q_value"] = benjamini_hochberg(results["p_value"].to_numpy())
+    results[["n", "n_other"]] = results[["n", "n_other"]].astype(int)
+    return results[RESULT_COLUMNS].sort_values("p_value", kind="stable").reset_index(drop=True)
+
+
+def load_price_panel(tickers, start_date, end_date, threads=8):
+    """Charge les clôtures d'un univers (via le cache) en un panel dates x tickers."""
+    from universe_runner import load_universe
+
+    series, status = load_universe(tickers, start_date, end_date, threads=threads)
+    panel = pd.DataFrame({t: pd.Series(values, index=dates) for t, (dates, values) in series.items()})
+    failures = {t: e for t, (_, e) in status.items() if e is not None}
+    return panel.sort_index(), failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anomalies calendaires sur un univers de tickers.")
+    parser.add_argument("tickers", help="Fichier texte avec un ticker par ligne.")
+    parser.add_argument("--start", default="1990-01-01")
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--effects", nargs="+", default=list(EFFECTS), choices=EFFECTS)
+    parser.add_argument("--min-obs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", default="calendar_anomalies.csv")
+    args = parser.parse_args()
+
+    with open(args.tickers) as f:
+        tickers = [line.strip() for line in f if line.strip()]
+    started = time.perf_counter()
+    prices, failures = load_price_panel(tickers, args.start, args.end or pd.Timestamp.today().strftime("%Y-%m-%d"))
+    loaded = time.perf_counter()
+    results = scan_calendar_anomalies(prices, effects=tuple(args.effects), min_obs=args.min_obs)
+    results.to_csv(args.output, index=False)
+    print(f"{prices.shape[1]} tickers ({len(failures)} échecs), {len(results)} tests : "
+          f"chargement {loaded - started:.1f} s, analyse {time.perf_counter() - loaded:.1f} s -> {args.output}")
+    print(results.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
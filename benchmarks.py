@@ -0,0 +1,358 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Aucune fenêtre ni aucun accès réseau pendant les mesures
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ.setdefault("MARKET_DATA_OFFLINE", "1")
+
+import numpy as np
+import pandas as pd
+
+# Mesures de performance des calculs numériques du projet
+#
+# Chaque cas prépare des données synthétiques (marche aléatoire géométrique,
+# graine fixe) puis mesure la fonction seule : temps (meilleur et médian sur
+# plusieurs répétitions) et pic de mémoire allouée (tracemalloc, sur une
+# exécution séparée pour ne pas fausser les temps). Les résultats sont
+# enregistrés dans .benchmarks/<commit>.json et peuvent être comparés à ceux
+# d'un autre commit pour repérer les régressions.
+#
+# Avec --imports, on mesure plutôt le temps d'import de chaque module dans
+# un interpréteur neuf, et on vérifie qu'aucune dépendance lourde
+# (interface, tracés, réseau) n'est chargée par le seul import.
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+# Taille maximale par cas, quand les données préparées ne tiennent pas en mémoire au-delà
+MAX_SIZES = {}
+RESULTS_DIR = Path(__file__).resolve().parent / ".benchmarks"
+
+# Modules dont les fonctions sont réutilisées ailleurs (workers, tests, notebooks)
+IMPORT_MODULES = (
+    "hurst_estimators", "rolling_hurst", "streaming_hurst", "fractal_engine", "streaming_fractals",
+    "fractional_brownian", "feature_graph", "sma_backtest", "calendar_returns", "data_cache",
+    "walk_forward", "event_backtester", "Fractale", "fractaldown", "quanta",
+    "trading_quantitative_strategy", "Janvier", "Machine", "hurst_analysis", "explicationhurst", "showfractal",
+    "binance_client", "timeframes", "hurst_table", "market_data_hub", "downsampling", "reporting",
+)
+# Dépendances qui ne doivent être chargées qu'à l'usage
+HEAVY_MODULES = ("dash", "flask", "plotly", "matplotlib", "aiohttp", "yfinance", "sklearn", "scipy")
+
+
+def synthetic_ohlcv(n, seed=0):
+    """Barres OHLCV synthétiques d'une minute, indexées par date comme celles de data_cache."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 1e-3, n)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    spread = np.abs(rng.normal(0.0, 5e-4, n)) * close
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + spread,
+        "Low": np.minimum(open_, close) - spread,
+        "Close": close,
+        "Volume": rng.uniform(1e3, 1e4, n),
+    }, index=pd.date_range("2000-01-01", periods=n, freq="min"))
+
+
+# Cas mesurés : nom -> fonction(n) renvoyant l'appel à mesurer (préparation exclue)
+def _fractale_detect(n):
+    from Fractale import detect_fractals
+    data = synthetic_ohlcv(n)
+    return lambda: detect_fractals(data.copy())
+
+
+def _fractaldown_bearish(n):
+    from fractaldown import find_bearish_fractals
+    data = synthetic_ohlcv(n).add_suffix("_NVDA")
+    return lambda: find_bearish_fractals(data.copy())
+
+
+def _moving_averages_signals(n):
+    from trading_quantitative_strategy import calculate_moving_averages, generate_signals
+    data = synthetic_ohlcv(n)[["Close"]]
+    return lambda: generate_signals(calculate_moving_averages(data.copy(), 10, 50))
+
+
+def _quanta_momentum(n):
+    from quanta import calculate_momentum
+    close = synthetic_ohlcv(n)["Close"]
+    return lambda: calculate_momentum(close, 5)
+
+
+def _quanta_mean_reversion(n):
+    from quanta import calculate_mean_reversion
+    close = synthetic_ohlcv(n)["Close"]
+    return lambda: calculate_mean_reversion(close, 20)
+
+
+def synthetic_klines_payload(n, seed=0):
+    """Corps brut d'une réponse /api/v3/klines (JSON, prix et volumes en chaînes) de n klines d'une minute."""
+    data = synthetic_ohlcv(n, seed)
+    open_time = data.index.asi8 // 1_000_000
+    columns = zip(open_time, data["Open"], data["High"], data["Low"], data["Close"], data["Volume"],
+                  open_time + 59_999, data["Close"] * data["Volume"], np.arange(n) % 1000,
+                  data["Volume"] * 0.5, data["Close"] * data["Volume"] * 0.5)
+    rows = (f'[{t},"{o:.8f}","{h:.8f}","{lo:.8f}","{c:.8f}","{v:.8f}",{ct},"{qv:.8f}",{k},"{bv:.8f}","{bq:.8f}","0"]'
+            for t, o, h, lo, c, v, ct, qv, k, bv, bq in columns)
+    return ("[" + ",".join(rows) + "]").encode()
+
+
+def _klines_pandas(n):
+    # Ancien chemin de hurst_analysis : DataFrame de chaînes puis conversion colonne par colonne
+    payload = synthetic_klines_payload(n)
+    columns = ["Open time", "Open", "High", "Low", "Close", "Volume", "Close time", "Quote asset volume",
+               "Number of trades", "Taker buy base asset volume", "Taker buy quote asset volume", "Ignore"]
+
+    def call():
+        df = pd.DataFrame(json.loads(payload), columns=columns)
+        for column in columns[1:-1]:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        df["Time"] = pd.to_datetime(df["Close time"], unit="ms")
+        df.dropna(inplace=True)
+        return df
+    return call
+
+
+def _klines_json(n):
+    from binance_client import parse_klines
+    payload = synthetic_klines_payload(n)
+    return lambda: parse_klines(json.loads(payload))
+
+
+def _klines_bytes(float_dtype):
+    def setup(n):
+        from binance_client import parse_klines
+        payload = synthetic_klines_payload(n)
+        return lambda: parse_klines(payload, float_dtype)
+    return setup
+
+
+def _resample_klines(interval):
+    def setup(n):
+        from binance_client import parse_klines
+        from timeframes import resample_klines
+        klines = parse_klines(synthetic_klines_payload(n))
+        return lambda: resample_klines(klines, interval)
+    return setup
+
+
+def _hurst(method):
+    def setup(n):
+        from hurst_estimators import estimate_hurst
+        close = synthetic_ohlcv(n)["Close"].to_numpy()
+        return lambda: estimate_hurst(close, method=method, kind="price")
+    return setup
+
+
+CASES = {
+    "fractale.detect_fractals": _fractale_detect,
+    "fractaldown.find_bearish_fractals": _fractaldown_bearish,
+    "trading_quantitative_strategy.moving_averages_signals": _moving_averages_signals,
+    "quanta.calculate_momentum": _quanta_momentum,
+    "quanta.calculate_mean_reversion": _quanta_mean_reversion,
+    "hurst_estimators.estimate_hurst[rs]": _hurst("rs"),
+    "hurst_estimators.estimate_hurst[dfa]": _hurst("dfa"),
+    "klines.pandas_frame": _klines_pandas,
+    "binance_client.parse_klines[json]": _klines_json,
+    "binance_client.parse_klines[bytes]": _klines_bytes(np.float64),
+    "binance_client.parse_klines[bytes,float32]": _klines_bytes(np.float32),
+    "timeframes.resample_klines[1h]": _resample_klines("1h"),
+}
+# Une réponse de 10 millions de klines dépasse 1,5 Go de JSON
+MAX_SIZES.update(dict.fromkeys([name for name in CASES if "klines" in name], 1_000_000))
+
+
+def measure(call, min_time=0.5, max_repeats=20):
+    """
+    Mesure un appel : au moins une exécution, puis des répétitions jusqu'à
+    `min_time` secondes cumulées (ou `max_repeats`).
+    Returns:
+        dict: 'best', 'median' (secondes), 'repeats' et 'peak_bytes'.
+    """
+    call()  # Échauffement (imports paresseux, caches)
+    times = []
+    while len(times) < max_repeats and (not times or sum(times) < min_time):
+        started = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"best": min(times), "median": statistics.median(times), "repeats": len(times), "peak_bytes": peak}
+
+
+def import_time(module, repeats=5):
+    """
+    Mesure l'import d'un module dans un interpréteur neuf (démarrage exclu).
+    Returns:
+        dict: 'best', 'median' (secondes), 'repeats', 'peak_bytes' (tracemalloc,
+        exécution séparée) et 'heavy' (dépendances lourdes chargées par l'import).
+    """
+    code = ("import json, sys, time, tracemalloc\n"
+            "if sys.argv[1] == 'memory': tracemalloc.start()\n"
+            "started = time.perf_counter()\n"
+            f"import {module}\n"
+            "elapsed = time.perf_counter() - started\n"
+            "peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0\n"
+            f"heavy = sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules)\n"
+            "print(json.dumps([elapsed, peak, heavy]))")
+    root = Path(__file__).resolve().parent
+
+    def run_once(mode):
+        output = subprocess.run([sys.executable, "-c", code, mode], cwd=root, capture_output=True,
+                                text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    times = []
+    for _ in range(repeats):
+        elapsed, _, heavy = run_once("time")
+        times.append(elapsed)
+    _, peak, _ = run_once("memory")
+    return {"best": min(times), "median": statistics.median(times), "repeats": repeats,
+            "peak_bytes": peak, "heavy": heavy}
+
+
+def run_imports(modules=IMPORT_MODULES, repeats=5):
+    """Temps d'import de chaque module ; un résultat par module, taille 0."""
+    results = []
+    for module in modules:
+        stats = import_time(module, repeats)
+        results.append({"case": f"import {module}", "size": 0, **stats})
+        heavy = f"  chargé : {', '.join(stats['heavy'])}" if stats["heavy"] else ""
+        print(f"{'import ' + module:<55} best {stats['best'] * 1e3:8.1f} ms  "
+              f"médiane {stats['median'] * 1e3:8.1f} ms  pic {stats['peak_bytes'] / 2**20:7.1f} Mio{heavy}")
+    return results
+
+
+def git_commit():
+    """Commit courant (suffixé de '-dirty' si l'arbre de travail est modifié), ou 'unknown'."""
+    root = Path(__file__).resolve().parent
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def run(cases=None, sizes=SIZES, min_time=0.5):
+    """
+    Exécute les cas demandés pour chaque taille.
+    Returns:
+        list: Un dictionnaire par (cas, taille).
+    """
+    results = []
+    for name in cases or CASES:
+        for n in sizes:
+            if n > MAX_SIZES.get(name, n):
+                continue
+            call = CASES[name](int(n))
+            stats = measure(call, min_time=min_time)
+            del call
+            results.append({"case": name, "size": int(n), **stats})
+            print(f"{name:<55} {int(n):>10,}  best {stats['best'] * 1e3:10.2f} ms  "
+                  f"médiane {stats['median'] * 1e3:10.2f} ms  pic {stats['peak_bytes'] / 2**20:9.1f} Mio")
+    return results
+
+
+def save(results, directory=RESULTS_DIR):
+    """Enregistre les résultats sous .benchmarks/<commit>.json et renvoie le chemin."""
+    directory.mkdir(parents=True, exist_ok=True)
+    commit = git_commit()
+    payload = {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor(), "cpu_count": os.cpu_count(),
+                    "numpy": np.__version__, "pandas": pd.__version__},
+        "results": results,
+    }
+    path = directory / f"{commit}.json"
+    path.write_text(json.dumps(payload, indent=2))
+    return path
+
+
+def load(reference, directory=RESULTS_DIR, exclude=None):
+    """Charge les résultats d'un commit, ou les plus récents ('latest') hors `exclude`."""
+    if reference == "latest":
+        candidates = sorted((p for p in directory.glob("*.json") if p != exclude),
+                            key=lambda p: p.stat().st_mtime)
+        if not candidates:
+            return None
+        return json.loads(candidates[-1].read_text())
+    path = directory / f"{reference}.json"
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def compare(current, baseline, threshold=1.2, min_delta=1e-3):
+    """
+    Compare deux séries de résultats (meilleur temps et pic mémoire).
+    Args:
+        threshold (float): Rapport courant / référence signalé comme régression.
+        min_delta (float): Écart de temps minimal (s) pour signaler une régression
+            de temps, afin d'ignorer le bruit des mesures très courtes.
+    Returns:
+        pd.DataFrame: Rapports courant / référence ; 'regression' vaut True
+        au-delà de `threshold` sur le temps ou la mémoire.
+    """
+    key = ["case", "size"]
+    merged = pd.DataFrame(current).merge(pd.DataFrame(baseline), on=key, suffixes=("", "_ref"))
+    merged["time_ratio"] = merged["best"] / merged["best_ref"]
+    merged["memory_ratio"] = merged["peak_bytes"] / merged["peak_bytes_ref"].replace(0, np.nan)
+    slower = (merged["time_ratio"] > threshold) & (merged["best"] - merged["best_ref"] > min_delta)
+    merged["regression"] = slower | (merged["memory_ratio"] > threshold)
+    return merged[key + ["best_ref", "best", "time_ratio", "peak_bytes_ref", "peak_bytes",
+                         "memory_ratio", "regression"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures de performance hors ligne sur données synthétiques.")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=None)
+    parser.add_argument("--sizes", nargs="+", type=float, default=list(SIZES),
+                        help="Nombres de barres ou de klines (1e3 à 1e7 par défaut).")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Durée cumulée minimale par mesure (s).")
+    parser.add_argument("--compare", default="latest",
+                        help="Commit de référence ('latest' pour la dernière exécution, 'none' pour ne pas comparer).")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Rapport au-delà duquel signaler une régression.")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--imports", nargs="*", default=None, metavar="MODULE",
+                        help="Mesure les temps d'import (tous les modules réutilisables si aucun n'est donné) "
+                             "au lieu des calculs.")
+    args = parser.parse_args()
+
+    baseline = None if args.compare == "none" else load(args.compare)
+    if args.imports is not None:
+        results = run_imports(args.imports or IMPORT_MODULES)
+    else:
+        results = run(args.cases, [int(n) for n in args.sizes], args.min_time)
+    if not args.no_save:
+        print(f"Résultats enregistrés dans {save(results)}")
+    if baseline is not None:
+        table = compare(results, baseline["results"], args.threshold)
+        print(f"\nComparaison avec {baseline['commit']} ({baseline['date']}) :")
+        print(table.to_string(index=False))
+        regressions = table[table["regression"]]
+        if len(regressions):
+            print(f"\n{len(regressions)} régression(s) au-delà de x{args.threshold}.")
+            raise SystemExit(1)
+    eager = [r["case"] for r in results if r.get("heavy")]
+    if eager:
+        print(f"\nDépendances lourdes chargées à l'import par : {', '.join(eager)}.")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+import asyncio
+import atexit
+import os
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from instrumentation import FETCH, instrumented
+
+# Client asynchrone des klines Binance
+#
+# Une seule session aiohttp (connexions keep-alive réutilisées) sert toutes
+# les requêtes ; un limiteur de débit à jeton borne le nombre d'appels par
+# seconde, et les pages de 1000 klines sont enchaînées pour couvrir une plage
+# de temps arbitraire. Les réponses brutes sont décodées directement dans un
+# tableau structuré NumPy préalloué (voir KlineBuffer), sans liste Python
+# intermédiaire ni colonne de chaînes. L'URL de base est configurable (BINANCE_API_URL) pour pointer
+# vers un serveur local qui rejoue des réponses enregistrées.
+#
+# Les fonctions synchrones (scripts, callbacks Dash, table de Hurst) partagent
+# un client persistant par (URL, débit), servi par une boucle asyncio dans un
+# thread de fond : les connexions keep-alive et le limiteur de débit sont
+# donc communs à tous les appels et à tous les threads appelants.
+#
+# aiohttp n'est importé qu'à l'ouverture d'une session : le décodage des
+# klines (decode_klines, KlineBuffer) et les modules qui ne font qu'importer
+# ce client n'en dépendent pas.
+
+DEFAULT_BASE_URL = "https://api.binance.com"
+KLINES_PATH = "/api/v3/klines"
+MAX_PAGE_LIMIT = 1000
+
+# (nom, type) des 11 champs utiles d'une kline, dans l'ordre de l'API
+KLINE_FIELDS = [
+    ("open_time", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+    ("close_time", np.int64),
+    ("quote_volume", np.float64),
+    ("trades", np.int64),
+    ("taker_buy_base_volume", np.float64),
+    ("taker_buy_quote_volume", np.float64),
+]
+
+
+KLINE_COLUMNS = 12  # Champs par kline dans la réponse, dont un dernier champ ignoré
+
+# Les crochets et guillemets de la réponse deviennent des espaces : il ne reste
+# que des nombres séparés par des virgules, lus en une passe par np.fromstring
+_JSON_SEPARATORS = bytes.maketrans(b'[]"', b"   ")
+
+
+def kline_dtype(float_dtype=np.float64):
+    """Type structuré d'une kline : int64 pour les temps (ms) et le nombre de transactions, `float_dtype` sinon."""
+    return np.dtype([(name, dtype if dtype is np.int64 else float_dtype) for name, dtype in KLINE_FIELDS])
+
+
+KLINE_DTYPE = kline_dtype()
+
+
+def decode_klines(payload):
+    """
+    Décode le corps brut d'une réponse de klines.
+    Args:
+        payload (bytes | str): Liste JSON de klines telle que renvoyée par l'API.
+    Returns:
+        np.ndarray: Tableau (n, 12) float64 ; les temps en ms (< 2**53) et les
+        nombres de transactions y sont représentés exactement.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+    text = payload.translate(_JSON_SEPARATORS)
+    if not text.strip():
+        return np.empty((0, KLINE_COLUMNS))
+    with warnings.catch_warnings():
+        # Sans cela, un contenu inattendu tronque silencieusement la lecture
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(text, sep=",")
+        except (DeprecationWarning, ValueError) as e:
+            raise ValueError(f"Réponse de klines illisible : {payload[:200]!r}") from e
+    if len(values) % KLINE_COLUMNS:
+        raise ValueError(f"Réponse de klines illisible : {len(values)} valeurs pour {KLINE_COLUMNS} champs par kline.")
+    return values.reshape(-1, KLINE_COLUMNS)
+
+
+def _fill(out, values):
+    """Copie les colonnes décodées dans le tableau structuré `out` (même nombre de lignes)."""
+    for i, name in enumerate(out.dtype.names):
+        out[name] = values[:, i]
+
+
+def parse_klines(rows, float_dtype=np.float64):
+    """
+    Convertit une réponse de klines en tableau structuré.
+    Args:
+        rows (bytes | str | list): Corps brut de la réponse, ou liste déjà décodée par json.
+        float_dtype: np.float64, ou np.float32 pour diviser par deux la mémoire des prix et volumes.
+    Returns:
+        np.ndarray: Tableau structuré (voir kline_dtype) ; klines['close'] donne la colonne des clôtures.
+    """
+    if isinstance(rows, (bytes, str)):
+        values = decode_klines(rows)
+        out = np.empty(len(values), dtype=kline_dtype(float_dtype))
+        _fill(out, values)
+        return out
+    n = len(rows)
+    out = np.empty(n, dtype=kline_dtype(float_dtype))
+    for i, name in enumerate(out.dtype.names):
+        out[name] = np.fromiter((row[i] for row in rows), dtype=out.dtype[name], count=n)
+    return out
+
+
+class KlineBuffer:
+    """
+    Tableau structuré de klines préalloué, rempli page par page.
+    Les pages s'ajoutent à la fin (pagination vers l'avant) ou au début
+    (pagination vers l'arrière) de la zone occupée ; le tableau n'est
+    réalloué (par doublement) que si la capacité est dépassée.
+    Args:
+        capacity (int): Nombre de klines attendu.
+        float_dtype: Type des prix et volumes (voir kline_dtype).
+    """
+
+    def __init__(self, capacity=MAX_PAGE_LIMIT, float_dtype=np.float64):
+        self._data = np.empty(max(int(capacity), 1), dtype=kline_dtype(float_dtype))
+        # En pagination vers l'arrière, les pages remplissent le tableau depuis la fin
+        self._start = self._stop = 0
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def _grow(self, extra, front):
+        needed = len(self) + extra
+        capacity = len(self._data)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty(capacity, dtype=self._data.dtype)
+        start = capacity - len(self) if front else 0
+        grown[start:start + len(self)] = self.klines
+        self._data = grown
+        self._start, self._stop = start, start + needed - extra
+
+    def append(self, payload):
+        """Ajoute une page après les klines déjà présentes. Returns: les klines ajoutées (vue)."""
+        values = payload if isinstance(payload, np.ndarray) else decode_klines(payload)
+        n = len(values)
+        if self._stop + n > len(self._data):
+            self._grow(n, front=False)
+        page = self._data[self._stop:self._stop + n]
+        _fill(page, values)
+        self._stop += n
+        return page
+
+    def prepend(self, payload):
+        """Ajoute une page avant les klines déjà présentes. Returns: les klines ajoutées (vue)."""
+        values = payload if isinstance(payload, np.ndarray) else decode_klines(payload)
+        n = len(values)
+        if len(self) == 0:
+            self._start = self._stop = len(self._data)
+        if self._start < n:
+            self._grow(n, front=True)
+        page = self._data[self._start - n:self._start]
+        _fill(page, values)
+        self._start -= n
+        return page
+
+    @property
+    def klines(self):
+        """Klines reçues, dans l'ordre (vue sur le tableau préalloué, sans copie)."""
+        return self._data[self._start:self._stop]
+
+
+class RateLimiter:
+    """Seau à jetons : au plus `rate` requêtes par seconde, avec une rafale de `burst`."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class BinanceClient:
+    """
+    Client asynchrone des klines, à utiliser comme contexte asynchrone.
+    Args:
+        base_url (str): URL de l'API (BINANCE_API_URL ou api.binance.com par défaut).
+        max_connections (int): Taille du pool de connexions keep-alive.
+        rate (float): Nombre maximal de requêtes par seconde.
+        retries (int): Nombre de nouvelles tentatives sur erreur réseau, 429 ou 5xx.
+        timeout (float): Délai maximal par requête, en secondes.
+    """
+
+    def __init__(self, base_url=None, max_connections=10, rate=10, retries=3, timeout=10):
+        self.base_url = (base_url or os.environ.get("BINANCE_API_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.max_connections = max_connections
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.timeout = timeout
+        self.session = None
+
+    async def __aenter__(self):
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    async def _get(self, params):
+        """Une requête de klines avec limitation de débit et nouvelles tentatives ; renvoie le corps brut."""
+        import aiohttp
+
+        url = self.base_url + KLINES_PATH
+        for attempt in range(self.retries + 1):
+            await self.limiter.acquire()
+            try:
+                async with self.session.get(url, params=params) as response:
+                    if response.status == 200:
+                        return await response.read()
+                    if response.status not in (418, 429) and response.status < 500:
+                        raise ValueError(f"Erreur {response.status} : {await response.text()}")
+                    delay = float(response.headers.get("Retry-After", 2 ** attempt))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+                delay = 2 ** attempt
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+        raise RuntimeError(f"Échec après {self.retries + 1} tentatives : {params}")
+
+    @instrumented(FETCH)
+    async def fetch_klines(self, symbol, interval, start_time=None, end_time=None, limit=None,
+                           float_dtype=np.float64):
+        """
+        Récupère les klines d'une plage de temps en enchaînant les pages.
+        Args:
+            symbol (str): Paire (ex: 'BTCUSDT').
+            interval (str): Intervalle (ex: '1m').
+            start_time (int): Début en ms ; sans début, on remonte depuis end_time.
+            end_time (int): Fin en ms (incluse), maintenant par défaut.
+            limit (int): Nombre maximal de klines (obligatoire sans start_time).
+            float_dtype: np.float64, ou np.float32 pour les prix et volumes.
+        Returns:
+            np.ndarray: Tableau structuré (voir kline_dtype), trié par temps d'ouverture.
+        """
+        if start_time is None and limit is None:
+            raise ValueError("Indiquer start_time ou limit.")
+        remaining = limit if limit is not None else float("inf")
+        # Avec une limite connue, toutes les pages tiennent dans le tableau initial
+        buffer = KlineBuffer(limit if limit is not None else MAX_PAGE_LIMIT, float_dtype)
+
+        if start_time is not None:
+            # Pagination vers l'avant à partir de start_time
+            cursor = start_time
+            while remaining > 0:
+                page = int(min(MAX_PAGE_LIMIT, remaining))
+                params = {"symbol": symbol, "interval": interval, "startTime": cursor, "limit": page}
+                if end_time is not None:
+                    params["endTime"] = end_time
+                batch = buffer.append(await self._get(params))
+                remaining -= len(batch)
+                if len(batch) < page:
+                    break
+                cursor = int(batch["open_time"][-1]) + 1
+        else:
+            # Pagination vers l'arrière : les `limit` klines les plus récentes
+            cursor = end_time
+            while remaining > 0:
+                page = int(min(MAX_PAGE_LIMIT, remaining))
+                params = {"symbol": symbol, "interval": interval, "limit": page}
+                if cursor is not None:
+                    params["endTime"] = cursor
+                batch = buffer.prepend(await self._get(params))
+                remaining -= len(batch)
+                if len(batch) < page:
+                    break
+                cursor = int(batch["open_time"][0]) - 1
+
+        return buffer.klines
+
+    async def fetch_many(self, queries):
+        """
+        Récupère plusieurs (symbole, intervalle) en parallèle.
+        Args:
+            queries (list): Dictionnaires d'arguments de fetch_klines.
+        Returns:
+            list: Résultats dans l'ordre des requêtes (l'exception en cas d'échec).
+        """
+        return await asyncio.gather(*(self.fetch_klines(**q) for q in queries), return_exceptions=True)
+
+
+class _SyncClient:
+    """Client persistant et sa boucle asyncio, dans un thread de fond, pour les appels synchrones."""
+
+    def __init__(self, base_url, rate):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="binance-client", daemon=True)
+        self.thread.start()
+        self.client = BinanceClient(base_url, rate=rate)
+        self.run(self.client.__aenter__())
+
+    def run(self, coroutine):
+        """Exécute une coroutine sur la boucle du client et attend son résultat."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        try:
+            self.run(self.client.__aexit__(None, None, None))
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+
+
+_sync_clients = {}  # (URL, débit) -> _SyncClient
+_sync_lock = threading.Lock()
+
+
+def _sync_client(base_url, rate):
+    base_url = (base_url or os.environ.get("BINANCE_API_URL", DEFAULT_BASE_URL)).rstrip("/")
+    with _sync_lock:
+        sync = _sync_clients.get((base_url, rate))
+        # Après un fork, le thread de la boucle n'existe plus dans le processus enfant
+        if sync is None or sync.pid != os.getpid():
+            sync = _sync_clients[(base_url, rate)] = _SyncClient(base_url, rate)
+        return sync
+
+
+def close_sync_clients():
+    """Ferme les clients partagés par les fonctions synchrones (appelé aussi à la sortie du programme)."""
+    with _sync_lock:
+        clients = [sync for sync in _sync_clients.values() if sync.pid == os.getpid()]
+        _sync_clients.clear()
+    for sync in clients:
+        sync.close()
+
+
+atexit.register(close_sync_clients)
+
+
+def fetch_klines_sync(symbol, interval, start_time=None, end_time=None, limit=None, base_url=None,
+                      float_dtype=np.float64):
+    """Version synchrone de BinanceClient.fetch_klines pour les scripts et callbacks Dash (client partagé)."""
+    client = _sync_client(base_url, 10)
+    return client.run(client.client.fetch_klines(symbol, interval, start_time, end_time, limit, float_dtype))
+
+
+def fetch_many_sync(queries, base_url=None, rate=10):
+    """Version synchrone de BinanceClient.fetch_many (client partagé)."""
+    client = _sync_client(base_url, rate)
+    return client.run(client.client.fetch_many(queries))
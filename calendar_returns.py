@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+
+import data_cache
+from instrumentation import FETCH, instrumented
+
+# Rendements par période calendaire
+#
+# Les rendements sont calculés directement sur les prix : pour chaque période
+# (semaine, mois, trimestre, année), on repère la dernière séance par une
+# comparaison de clés entières consécutives, puis le rendement est le ratio
+# des clôtures de fin de période successives. Tout est vectorisé sur l'axe
+# du temps et s'applique à un panel (dates x tickers) en une seule passe.
+# Les résultats sont indexés par la date calendaire de fin de période, ce
+# qui aligne exactement des tickers téléchargés séparément.
+# fetch_monthly_returns regroupe téléchargement (data_cache) et rendements
+# mensuels pour les scripts d'effet janvier (Janvier.py, Machine.py).
+
+FREQUENCIES = ("W", "M", "Q", "Y")
+
+
+def _period_keys(index, freq):
+    """Clé entière croissante identifiant la période de chaque date."""
+    days = index.values.astype("datetime64[D]")
+    if freq == "W":
+        # Semaines du lundi au dimanche (le 1970-01-01 est un jeudi)
+        return (days.astype(np.int64) + 3) // 7
+    months = days.astype("datetime64[M]").astype(np.int64)
+    if freq == "M":
+        return months
+    if freq == "Q":
+        return months // 3
+    if freq == "Y":
+        return months // 12
+    raise ValueError(f"Fréquence inconnue : {freq} (choisir parmi {FREQUENCIES})")
+
+
+def _period_end(keys, freq):
+    """Date calendaire de fin de période pour chaque clé."""
+    if freq == "W":
+        return pd.DatetimeIndex((keys * 7 + 3).astype("datetime64[D]"))
+    months = {"M": 1, "Q": 3, "Y": 12}[freq]
+    next_start = ((keys + 1) * months).astype("datetime64[M]").astype("datetime64[D]")
+    return pd.DatetimeIndex(next_start - np.timedelta64(1, "D"))
+
+
+def _period_bounds(index, freq):
+    """Indices de la première et de la dernière séance de chaque période, et les clés."""
+    keys = _period_keys(index, freq)
+    last = np.append(np.flatnonzero(keys[1:] != keys[:-1]), len(keys) - 1)
+    first = np.append(0, last[:-1] + 1)
+    return first, last, keys[last]
+
+
+def month_day_positions(index):
+    """
+    Position de chaque séance dans son mois.
+    Args:
+        index (pd.DatetimeIndex): Dates de séance croissantes.
+    Returns:
+        tuple: (rang depuis le début du mois, rang depuis la fin du mois), à partir de 0.
+    """
+    first, last, _ = _period_bounds(index, "M")
+    lengths = last - first + 1
+    from_start = np.arange(len(index)) - np.repeat(first, lengths)
+    from_end = np.repeat(last, lengths) - np.arange(len(index))
+    return from_start, from_end
+
+
+def _wrap(values, index, like):
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=index, columns=like.columns)
+    return pd.Series(values, index=index, name=getattr(like, "name", None))
+
+
+def period_returns(prices, freq="M"):
+    """
+    Calcule les vrais rendements par période à partir des clôtures.
+    Args:
+        prices (pd.Series | pd.DataFrame): Prix quotidiens, un ticker par colonne.
+        freq (str): 'W', 'M', 'Q' ou 'Y'.
+    Returns:
+        pd.Series | pd.DataFrame: Rendement de chaque période (clôture de fin de
+        période / clôture de fin de période précédente - 1), indexé par la date
+        de fin de période ; NaN pour la première période.
+    """
+    if len(prices) == 0:
+        return prices.iloc[:0]
+    # Report des derniers prix connus pour les tickers qui ne cotent pas chaque jour,
+    # sans prolonger un ticker au-delà de sa dernière cotation
+    values = prices.ffill(limit_area="inside").to_numpy(dtype=np.float64)
+    _, last, keys = _period_bounds(prices.index, freq)
+    closes = values[last]
+    returns = np.full_like(closes, np.nan)
+    returns[1:] = closes[1:] / closes[:-1] - 1.0
+    return _wrap(returns, _period_end(keys, freq), prices)
+
+
+def turn_of_month_returns(prices, days_before=1, days_after=3):
+    """
+    Rendement sur la fenêtre de changement de mois.
+    Args:
+        prices (pd.Series | pd.DataFrame): Prix quotidiens.
+        days_before (int): Nombre de dernières séances du mois inclus dans la fenêtre.
+        days_after (int): Nombre de premières séances du mois suivant inclus.
+    Returns:
+        pd.Series | pd.DataFrame: Rendement entre la clôture précédant la fenêtre
+        et la clôture de sa dernière séance, indexé par la fin du nouveau mois.
+    """
+    values = prices.ffill(limit_area="inside").to_numpy(dtype=np.float64)
+    first, last, keys = _period_bounds(prices.index, "M")
+    start = last[:-1] - days_before
+    end = first[1:] + days_after - 1
+    # Fenêtres impossibles (mois trop courts ou incomplets en bord d'historique)
+    valid = (start >= first[:-1]) & (end <= last[1:])
+    returns = np.full((len(start),) + values.shape[1:], np.nan)
+    returns[valid] = values[end[valid]] / values[start[valid]] - 1.0
+    return _wrap(returns, _period_end(keys[1:], "M"), prices)
+
+
+def monthly_returns_frame(prices):
+    """
+    Rendements mensuels d'un ticker au format attendu par prepare_comparison_data.
+    Args:
+        prices (pd.Series): Prix quotidiens (idéalement ajustés).
+    Returns:
+        pd.DataFrame: Colonnes 'Monthly Return', 'Month' et 'Year', une ligne par mois.
+    """
+    returns = period_returns(prices, "M")
+    return pd.DataFrame({
+        'Monthly Return': returns,
+        'Month': returns.index.month,
+        'Year': returns.index.year,
+    }, index=returns.index)
+
+
+@instrumented(FETCH)
+def fetch_monthly_returns(ticker, start, end):
+    """
+    Télécharge les prix d'un ticker (via data_cache) et calcule ses rendements mensuels.
+    Args:
+        ticker (str): Symbole Yahoo Finance (ex: '^RUT').
+        start (str): Premier mois analysé.
+        end (str): Date de fin.
+    Returns:
+        pd.DataFrame: Voir monthly_returns_frame ; uniquement les mois à partir de `start`.
+    """
+    # Un mois de plus pour disposer de la clôture précédant le premier mois
+    data = data_cache.download(ticker, start=pd.Timestamp(start) - pd.DateOffset(months=1), end=end)
+    prices = data['Adj Close'] if 'Adj Close' in data else data['Close']
+    monthly = monthly_returns_frame(prices)
+    return monthly[monthly.index >= pd.Timestamp(start)]
+
+
+def prepare_comparison_data(small_caps, large_caps):
+    """Prépare les données pour une comparaison mois par mois."""
+    comparison = pd.DataFrame({
+        'Year': small_caps['Year'],
+        'Month': small_caps['Month'],
+        'Small Caps Return (%)': small_caps['Monthly Return'] * 100,
+        'Large Caps Return (%)': large_caps['Monthly Return'] * 100,
+    })
+    return comparison.dropna()
@@ -0,0 +1,350 @@
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import FETCH, instrumented
+
+# Cache local des données OHLCV
+#
+# Chaque partition (ticker, intervalle) est un répertoire contenant une
+# colonne par fichier .npy plus un fichier meta.json qui décrit les plages de
+# dates déjà couvertes. Les lectures passent par np.load(mmap_mode='c') :
+# les colonnes sont projetées en mémoire sans copie, et une écriture
+# éventuelle dans le DataFrame reste privée au processus.
+#
+# Le cache conserve les prix bruts et la clôture ajustée ('Adj Close') ;
+# download() renvoie par défaut des prix ajustés des dividendes et
+# divisions, comme yf.download(auto_adjust=True) qu'utilisaient les scripts.
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "trading_quantitatif")
+INDEX_FILE = "index.npy"
+META_FILE = "meta.json"
+
+_PERIOD_UNITS = {
+    "d": lambda n: pd.DateOffset(days=n),
+    "wk": lambda n: pd.DateOffset(weeks=n),
+    "mo": lambda n: pd.DateOffset(months=n),
+    "y": lambda n: pd.DateOffset(years=n),
+}
+
+
+# Sources de données
+class YahooSource:
+    """Source distante : téléchargement via l'API Yahoo Finance."""
+
+    def fetch(self, ticker, start, end, interval):
+        """
+        Télécharge les données OHLCV d'un ticker sur [start, end[.
+        Args:
+            ticker (str): Symbole de l'actif.
+            start (pd.Timestamp): Date de début.
+            end (pd.Timestamp): Date de fin (exclue).
+            interval (str): Intervalle de temps (ex: '1d').
+        Returns:
+            pd.DataFrame: Données brutes avec 'Adj Close', colonnes à un seul niveau.
+        """
+        import yfinance as yf
+
+        # Prix bruts et clôture ajustée : l'ajustement est appliqué à la lecture (voir adjust_prices)
+        data = yf.download(ticker, start=start, end=end, interval=interval,
+                           auto_adjust=False, progress=False)
+        if isinstance(data.columns, pd.MultiIndex):
+            # Les versions récentes de yfinance ajoutent un niveau 'Ticker'
+            data.columns = data.columns.get_level_values(0)
+        return data
+
+
+class LocalFileSource:
+    """
+    Source hors ligne : lit des fichiers CSV ou Parquet d'un répertoire.
+
+    Les fichiers sont recherchés sous les noms '<ticker>_<interval>.<ext>'
+    puis '<ticker>.<ext>', avec la date en première colonne.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _find_file(self, ticker, interval):
+        name = _safe_name(ticker)
+        for stem in (f"{name}_{interval}", name):
+            for ext in (".parquet", ".csv"):
+                path = os.path.join(self.directory, stem + ext)
+                if os.path.exists(path):
+                    return path
+        raise FileNotFoundError(
+            f"Aucun fichier local pour {ticker} ({interval}) dans {self.directory}")
+
+    def fetch(self, ticker, start, end, interval):
+        path = self._find_file(ticker, interval)
+        if path.endswith(".parquet"):
+            data = pd.read_parquet(path)
+        else:
+            data = pd.read_csv(path, index_col=0)
+        data.index = pd.to_datetime(data.index)
+        data = data.sort_index()
+        return data[(data.index >= _align_tz(start, data.index)) &
+                    (data.index < _align_tz(end, data.index))]
+
+
+def default_source():
+    """
+    Choisit la source selon la variable d'environnement MARKET_DATA_SOURCE :
+    un chemin de répertoire active la source locale, sinon Yahoo Finance.
+    """
+    directory = os.environ.get("MARKET_DATA_SOURCE")
+    if directory:
+        return LocalFileSource(directory)
+    return YahooSource()
+
+
+# Utilitaires
+def _safe_name(ticker):
+    return "".join("_" if c in '/\\:*?"<>|' else c for c in ticker)
+
+
+def _align_tz(ts, index):
+    """Aligne le fuseau horaire d'un timestamp sur celui d'un index."""
+    ts = pd.Timestamp(ts)
+    tz = getattr(index, "tz", None)
+    if tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tzinfo is not None:
+        return ts.tz_convert(None)
+    return ts
+
+
+def _period_to_start(period, end):
+    """Convertit une période yfinance ('3mo', '1y', 'max', ...) en date de début."""
+    if period == "max":
+        return pd.Timestamp("1900-01-01")
+    for unit in sorted(_PERIOD_UNITS, key=len, reverse=True):
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return end - _PERIOD_UNITS[unit](int(period[:-len(unit)]))
+    raise ValueError(f"Période non reconnue : {period}")
+
+
+def adjust_prices(frame):
+    """
+    Ajuste Open, High, Low et Close par le rapport 'Adj Close' / 'Close' (comme
+    yf.download(auto_adjust=True)) et retire 'Adj Close' ; sans cette colonne,
+    les prix sont supposés déjà ajustés et renvoyés tels quels.
+    """
+    if "Adj Close" not in frame.columns:
+        return frame
+    frame = frame.copy()
+    ratio = frame["Adj Close"] / frame["Close"]
+    for name in ("Open", "High", "Low"):
+        if name in frame.columns:
+            frame[name] = frame[name] * ratio
+    frame["Close"] = frame["Adj Close"]
+    return frame.drop(columns="Adj Close")
+
+
+def _merge_ranges(ranges):
+    """Fusionne des intervalles [début, fin[ qui se chevauchent ou se touchent."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _missing_ranges(covered, start, end):
+    """Retourne les sous-intervalles de [start, end[ absents de `covered`."""
+    gaps = []
+    cursor = start
+    for c_start, c_end in covered:
+        if c_end <= cursor:
+            continue
+        if c_start >= end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, min(c_start, end)))
+        cursor = max(cursor, c_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+# Cache
+class OHLCVCache:
+    """
+    Stockage colonnaire sur disque, une partition par (ticker, intervalle).
+
+    Seules les plages de dates manquantes sont demandées à la source ; les
+    requêtes répétées sont servies depuis des fichiers projetés en mémoire.
+    """
+
+    def __init__(self, root=None, source=None, offline=None):
+        self.root = root or os.environ.get("MARKET_DATA_CACHE", DEFAULT_CACHE_DIR)
+        self.source = source or default_source()
+        if offline is None:
+            offline = os.environ.get("MARKET_DATA_OFFLINE", "") not in ("", "0")
+        self.offline = offline
+
+    def _partition(self, ticker, interval):
+        return os.path.join(self.root, _safe_name(ticker), interval)
+
+    def _read_meta(self, path):
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            return {"columns": [], "covered": [], "tz": None}
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def load_columns(self, ticker, interval="1d"):
+        """
+        Charge une partition sous forme de tableaux projetés en mémoire.
+        Args:
+            ticker (str): Symbole de l'actif.
+            interval (str): Intervalle de temps.
+        Returns:
+            tuple: (index int64 en ns UTC, dict colonne -> np.ndarray, meta).
+        """
+        path = self._partition(ticker, interval)
+        meta = self._read_meta(path)
+        if not meta["columns"]:
+            return np.empty(0, dtype=np.int64), {}, meta
+        index = np.load(os.path.join(path, INDEX_FILE), mmap_mode="c")
+        columns = {
+            name: np.load(os.path.join(path, f"{i}.npy"), mmap_mode="c")
+            for i, name in enumerate(meta["columns"])
+        }
+        return index, columns, meta
+
+    def _write(self, path, frame, meta):
+        os.makedirs(path, exist_ok=True)
+        index = frame.index
+        if index.tz is not None:
+            meta["tz"] = str(index.tz)
+            index = index.tz_convert("UTC").tz_localize(None)
+        meta["columns"] = [str(c) for c in frame.columns]
+
+        # Écriture dans des fichiers temporaires puis renommage atomique
+        files = {INDEX_FILE: index.values.astype("datetime64[ns]").view(np.int64)}
+        for i, name in enumerate(frame.columns):
+            values = frame[name].to_numpy()
+            files[f"{i}.npy"] = values if values.dtype.kind in "biuf" else values.astype(np.float64)
+        for name, values in files.items():
+            tmp = os.path.join(path, name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, values)
+            os.replace(tmp, os.path.join(path, name))
+        self._write_meta(path, meta)
+
+    def _write_meta(self, path, meta):
+        tmp = os.path.join(path, META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, META_FILE))
+
+    def _to_frame(self, index, columns, meta):
+        frame_index = pd.DatetimeIndex(index.view("datetime64[ns]"), name="Date")
+        if meta.get("tz"):
+            frame_index = frame_index.tz_localize("UTC").tz_convert(meta["tz"])
+        return pd.DataFrame(columns, index=frame_index, copy=False)
+
+    def _fill(self, ticker, interval, start, end):
+        """Télécharge les plages manquantes et les fusionne dans la partition."""
+        path = self._partition(ticker, interval)
+        meta = self._read_meta(path)
+        covered = [[pd.Timestamp(s), pd.Timestamp(e)] for s, e in meta["covered"]]
+        gaps = _missing_ranges(covered, start, end)
+        if not gaps or self.offline:
+            return
+
+        try:
+            pieces = [self.source.fetch(ticker, s, e, interval) for s, e in gaps]
+        except Exception as e:
+            # Sans réseau, on sert ce qui est déjà en cache plutôt que d'échouer
+            if not meta["columns"]:
+                raise
+            warnings.warn(f"Source indisponible pour {ticker} ({interval}), données en cache utilisées : {e}",
+                          RuntimeWarning, stacklevel=3)
+            return
+        pieces = [p for p in pieces if len(p)]
+        if pieces:
+            index, columns, _ = self.load_columns(ticker, interval)
+            if len(index):
+                pieces.insert(0, self._to_frame(index, columns, meta))
+            frame = pd.concat(pieces)
+            frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        else:
+            frame = None
+
+        # La barre en cours n'est pas définitive : on ne marque comme couvert
+        # que ce qui précède la date du jour. Une plage sans données (jours
+        # fériés, symbole radié) est couverte aussi, pour ne pas la redemander.
+        today = pd.Timestamp.now().normalize()
+        covered += [[s, min(e, today)] for s, e in gaps if s < min(e, today)]
+        meta["covered"] = [[str(s), str(e)] for s, e in _merge_ranges(covered)]
+        if frame is not None:
+            self._write(path, frame, meta)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._write_meta(path, meta)
+
+    @instrumented(FETCH)
+    def download(self, ticker, start=None, end=None, period=None, interval="1d", auto_adjust=True):
+        """
+        Équivalent de yf.download pour un seul ticker, servi depuis le cache.
+        Args:
+            ticker (str): Symbole de l'actif.
+            start (str): Date de début ('YYYY-MM-DD').
+            end (str): Date de fin exclue ('YYYY-MM-DD'), aujourd'hui par défaut.
+            period (str): Période à la place de start (ex: '3mo').
+            interval (str): Intervalle de temps (ex: '1d').
+            auto_adjust (bool): Prix ajustés (par défaut, comme yf.download) ; False
+                pour les prix bruts et la colonne 'Adj Close'.
+        Returns:
+            pd.DataFrame: Données OHLCV indexées par date.
+        """
+        end = pd.Timestamp(end) if end is not None else pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+        if start is None:
+            start = _period_to_start(period or "max", end)
+        start = pd.Timestamp(start)
+
+        self._fill(ticker, interval, start, end)
+
+        index, columns, meta = self.load_columns(ticker, interval)
+        if not len(index):
+            frame = pd.DataFrame(columns=["Open", "High", "Low", "Close", "Adj Close", "Volume"])
+        else:
+            lo, hi = np.searchsorted(index, [_utc_ns(start, meta), _utc_ns(end, meta)])
+            frame = self._to_frame(index[lo:hi], {k: v[lo:hi] for k, v in columns.items()}, meta)
+        return adjust_prices(frame) if auto_adjust else frame
+
+
+def _utc_ns(ts, meta):
+    """Convertit une borne de date en nanosecondes UTC comparables à l'index stocké."""
+    ts = pd.Timestamp(ts)
+    if meta.get("tz") and ts.tzinfo is None:
+        ts = ts.tz_localize(meta["tz"])
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.value
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Retourne le cache partagé par les scripts du projet."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = OHLCVCache()
+    return _default_cache
+
+
+def download(ticker, start=None, end=None, period=None, interval="1d", auto_adjust=True):
+    """Télécharge les données d'un ticker en passant par le cache partagé."""
+    return get_cache().download(ticker, start=start, end=end, period=period, interval=interval,
+                                auto_adjust=auto_adjust)
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import RENDER, instrumented
+
+# Décimation des séries avant leur envoi au navigateur
+#
+# Deux méthodes, qui retournent toutes deux les indices des points conservés
+# (à appliquer ensuite à x et à y) :
+# - 'lttb' (Largest-Triangle-Three-Buckets) : garde dans chaque paquet le point
+#   qui forme le plus grand triangle avec le point retenu précédemment et la
+#   moyenne du paquet suivant ; préserve bien l'allure visuelle d'une courbe.
+# - 'minmax' : garde le minimum et le maximum de chaque paquet ; aucun pic
+#   n'est perdu, au prix de deux points par paquet.
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Sélectionne `n_out` points par l'algorithme Largest-Triangle-Three-Buckets.
+    Args:
+        x (array-like): Abscisses croissantes (nombres ou dates).
+        y (array-like): Ordonnées.
+        n_out (int): Nombre de points à conserver.
+    Returns:
+        np.ndarray: Indices croissants des points retenus.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bornes des n_out - 2 paquets intérieurs ; le premier et le dernier point sont toujours gardés
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Moyennes de tous les paquets calculées d'un coup, plus le dernier point comme « paquet » final
+    counts = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / counts, x[-1])
+    mean_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (mean_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Sélectionne le minimum et le maximum de (n_out - 2) / 2 paquets de taille égale.
+    Args:
+        y (array-like): Ordonnées.
+        n_out (int): Nombre maximal de points à conserver (au moins 4).
+    Returns:
+        np.ndarray: Indices croissants des points retenus (premier et dernier inclus).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    # Deux places réservées au premier et au dernier point, s'ils ne sont pas des extremums
+    n_buckets = max((n_out - 2) // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    pad = n_buckets * size - n
+    # Le remplissage par ±inf n'est jamais choisi comme extremum
+    lows = np.concatenate([y, np.full(pad, np.inf)]).reshape(n_buckets, size)
+    highs = np.concatenate([y, np.full(pad, -np.inf)]).reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    indices = np.concatenate([
+        [0, n - 1],
+        offsets + lows.argmin(axis=1),
+        offsets + highs.argmax(axis=1),
+    ])
+    return np.unique(indices)
+
+
+def visible_slice(x, x_range):
+    """Bornes [début, fin[ des points dont l'abscisse est dans `x_range` (avec un point de marge)."""
+    if x_range is None:
+        return 0, len(x)
+    x = np.asarray(x)
+    lo_value, hi_value = x_range
+    if np.issubdtype(x.dtype, np.datetime64):
+        lo_value, hi_value = np.datetime64(pd.Timestamp(lo_value)), np.datetime64(pd.Timestamp(hi_value))
+    lo = max(np.searchsorted(x, lo_value, side="left") - 1, 0)
+    hi = min(np.searchsorted(x, hi_value, side="right") + 1, len(x))
+    return lo, hi
+
+
+@instrumented(RENDER)
+def decimate(x, y, max_points, method="lttb", x_range=None):
+    """
+    Réduit une série au nombre de points affichables, dans la fenêtre visible.
+    Args:
+        x (array-like): Abscisses croissantes.
+        y (array-like): Ordonnées.
+        max_points (int): Nombre maximal de points (typiquement la largeur en pixels).
+        method (str): 'lttb' ou 'minmax'.
+        x_range (tuple): Plage visible (zoom) ; None pour toute la série.
+    Returns:
+        tuple: (x, y) décimés, sous forme de np.ndarray.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    lo, hi = visible_slice(x, x_range)
+    x, y = x[lo:hi], y[lo:hi]
+    if method == "lttb":
+        indices = lttb_indices(x, y, max_points)
+    elif method == "minmax":
+        indices = minmax_indices(y, max_points)
+    else:
+        raise ValueError(f"Méthode de décimation inconnue : {method}")
+    return x[indices], y[indices]
+
+
+def x_range_from_relayout(relayout_data):
+    """
+    Extrait la plage de zoom de l'axe x à partir de `relayoutData` d'un dcc.Graph.
+    Returns:
+        tuple: (début, fin), ou None si le graphique n'est pas zoomé.
+    """
+    if not relayout_data or relayout_data.get("xaxis.autorange"):
+        return None
+    if "xaxis.range[0]" in relayout_data:
+        return relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+    if "xaxis.range" in relayout_data:
+        return tuple(relayout_data["xaxis.range"])
+    return None
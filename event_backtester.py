@@ -0,0 +1,260 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# Backtest événementiel sur des barres (klines)
+#
+# Les barres sont rangées dans un tableau structuré NumPy et transmises à la
+# stratégie par paquets : la stratégie est un callback qui renvoie, pour
+# chaque barre du paquet, la position cible (NaN = pas de changement). Seules
+# les barres où il se passe quelque chose sont ensuite simulées une à une :
+# arrivée d'un ordre (décision + latence) ou ordre encore partiellement
+# exécuté. Les exécutions sont inscrites dans un journal structuré
+# préalloué ; positions, trésorerie et courbe de capital sont reconstruites
+# à la fin par sommes cumulées, sans aucun objet Python par transaction.
+#
+# Modèle d'exécution :
+# - une décision prise à la clôture de la barre i est exécutée à l'ouverture
+#   de la barre i + latence (latence >= 1) ;
+# - chaque barre ne peut exécuter qu'une fraction `participation` de son
+#   volume ; le reliquat reste en carnet pour les barres suivantes, jusqu'à
+#   la prochaine décision, qui le remplace ;
+# - prix d'exécution = ouverture x (1 ± glissement fixe ± impact x quantité / volume) ;
+# - frais proportionnels au montant exécuté.
+
+BAR_DTYPE = np.dtype([
+    ("open_time", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+])
+
+FILL_DTYPE = np.dtype([
+    ("bar", np.int64),        # Indice de la barre d'exécution
+    ("time", np.int64),       # open_time de cette barre (ms)
+    ("quantity", np.float64), # Signée : > 0 achat, < 0 vente
+    ("price", np.float64),    # Prix d'exécution, glissement inclus
+    ("fee", np.float64),
+    ("slippage", np.float64), # Coût du glissement par rapport à l'ouverture
+])
+
+
+def to_bars(data):
+    """
+    Convertit des klines (tableau structuré de binance_client.fetch_klines, ou
+    DataFrame avec les mêmes colonnes) en tableau structuré BAR_DTYPE.
+    """
+    bars = np.empty(len(data["open"]), dtype=BAR_DTYPE)
+    for name in BAR_DTYPE.names:
+        bars[name] = np.asarray(data[name])
+    return bars
+
+
+class FillLedger:
+    """Journal des exécutions, préalloué et agrandi par doublement."""
+
+    def __init__(self, capacity=1024):
+        self._fills = np.empty(capacity, dtype=FILL_DTYPE)
+        self.size = 0
+
+    def append(self, bar, time_ms, quantity, price, fee, slippage):
+        if self.size == len(self._fills):
+            grown = np.empty(2 * len(self._fills), dtype=FILL_DTYPE)
+            grown[:self.size] = self._fills
+            self._fills = grown
+        self._fills[self.size] = (bar, time_ms, quantity, price, fee, slippage)
+        self.size += 1
+
+    @property
+    def fills(self):
+        return self._fills[:self.size]
+
+
+def _collect_targets(bars, strategy, chunk_size):
+    """Appelle la stratégie paquet par paquet et renvoie les positions cibles de chaque barre."""
+    targets = np.full(len(bars), np.nan)
+    view = bars.view()
+    view.flags.writeable = False
+    for start in range(0, len(bars), chunk_size):
+        end = min(start + chunk_size, len(bars))
+        targets[start:end] = strategy(view, start, end)
+    return targets
+
+
+def _order_arrivals(targets, latency):
+    """Barres d'arrivée des ordres et positions cibles associées (seuls les changements de cible comptent)."""
+    decided = np.flatnonzero(np.isfinite(targets))
+    values = targets[decided]
+    changed = np.ones(len(values), dtype=bool)
+    changed[1:] = values[1:] != values[:-1]
+    return decided[changed] + latency, values[changed]
+
+
+def run_backtest(bars, strategy, initial_cash=10_000.0, latency=1, fee_rate=0.001,
+                 slippage_bps=1.0, impact=0.0, participation=None, chunk_size=1_000_000):
+    """
+    Simule une stratégie sur des barres.
+    Args:
+        bars (np.ndarray): Barres au format BAR_DTYPE (voir to_bars).
+        strategy (callable): strategy(bars, start, end) -> tableau de end - start
+            positions cibles (en unités de l'actif), NaN pour ne rien changer ;
+            `bars` est le tableau complet en lecture seule, pour les indicateurs
+            qui ont besoin d'historique.
+        initial_cash (float): Trésorerie initiale.
+        latency (int): Délai, en barres, entre la décision et l'exécution (>= 1).
+        fee_rate (float): Frais en proportion du montant (0.001 = 0,1 %).
+        slippage_bps (float): Glissement fixe en points de base.
+        impact (float): Glissement supplémentaire proportionnel à quantité / volume de la barre.
+        participation (float): Part maximale du volume d'une barre exécutable ;
+            None pour des exécutions complètes.
+        chunk_size (int): Nombre de barres passées à la stratégie par appel.
+    Returns:
+        tuple: (pd.DataFrame indexé par open_time avec 'position', 'cash' et
+        'equity' en fin de barre, et initial_cash dans attrs ; tableau structuré
+        FILL_DTYPE des exécutions).
+    """
+    if latency < 1:
+        raise ValueError("La latence doit être d'au moins une barre (pas d'exécution sur la barre de décision).")
+    n = len(bars)
+    arrivals, arrival_targets = _order_arrivals(_collect_targets(bars, strategy, chunk_size), latency)
+    opens, volumes, times = bars["open"], bars["volume"], bars["open_time"]
+    slip = slippage_bps * 1e-4
+    ledger = FillLedger()
+
+    position, target, bar, k = 0.0, 0.0, -1, 0
+    while True:
+        # Prochain événement : barre suivante si un reliquat est en carnet, sinon prochaine arrivée
+        if position != target:
+            bar += 1
+        elif k < len(arrivals):
+            bar = arrivals[k]
+        else:
+            break
+        if bar >= n:
+            break
+        if k < len(arrivals) and arrivals[k] == bar:
+            target = arrival_targets[k]
+            k += 1
+        quantity = target - position
+        if quantity == 0.0:
+            continue
+        complete = True
+        if participation is not None:
+            capacity = participation * volumes[bar]
+            if capacity <= 0.0:
+                continue
+            if abs(quantity) > capacity:
+                quantity = capacity if quantity > 0 else -capacity
+                complete = False
+        side = 1.0 if quantity > 0 else -1.0
+        size = quantity * side
+        price = opens[bar] * (1.0 + side * (slip + (impact * size / volumes[bar] if impact else 0.0)))
+        ledger.append(bar, times[bar], quantity, price, size * price * fee_rate, size * abs(price - opens[bar]))
+        # Exécution complète : position alignée exactement sur la cible (pas de reliquat d'arrondi)
+        position = target if complete else position + quantity
+
+    fills = ledger.fills
+    position_delta = np.zeros(n)
+    cash_delta = np.zeros(n)
+    np.add.at(position_delta, fills["bar"], fills["quantity"])
+    np.add.at(cash_delta, fills["bar"], -(fills["quantity"] * fills["price"] + fills["fee"]))
+    positions = np.cumsum(position_delta)
+    cash = initial_cash + np.cumsum(cash_delta)
+    equity = pd.DataFrame({
+        "position": positions,
+        "cash": cash,
+        "equity": cash + positions * bars["close"],
+    }, index=pd.to_datetime(times, unit="ms"))
+    equity.attrs["initial_cash"] = initial_cash
+    return equity, fills
+
+
+def fills_frame(fills):
+    """Journal des exécutions sous forme de DataFrame (une ligne par exécution)."""
+    frame = pd.DataFrame(fills)
+    frame["time"] = pd.to_datetime(frame["time"], unit="ms")
+    return frame
+
+
+def summarize(equity, fills, initial_cash=None):
+    """
+    Statistiques principales d'un backtest.
+    Args:
+        equity (pd.DataFrame): Courbe de capital renvoyée par run_backtest.
+        fills (np.ndarray): Journal des exécutions.
+        initial_cash (float): Capital de départ ; equity.attrs['initial_cash'] par défaut.
+    Returns:
+        dict: Rendement total et drawdown maximal mesurés depuis le capital de départ
+        (une exécution ou une variation dès la première barre est donc comptée).
+    """
+    if initial_cash is None:
+        initial_cash = equity.attrs["initial_cash"]
+    values = equity["equity"].to_numpy()
+    peak = np.maximum.accumulate(np.concatenate([[initial_cash], values]))[1:]
+    return {
+        "bars": len(values),
+        "fills": len(fills),
+        "total_return": float(values[-1] / initial_cash - 1.0) if len(values) else np.nan,
+        "max_drawdown": float(np.min(values / peak - 1.0)) if len(values) else np.nan,
+        "fees": float(fills["fee"].sum()),
+        "slippage": float(fills["slippage"].sum()),
+    }
+
+
+def sma_crossover_strategy(short_window=20, long_window=100, size=1.0):
+    """
+    Exemple de stratégie : position `size` quand la SMA courte est au-dessus
+    de la SMA longue, 0 sinon. Les moyennes sont calculées sur le paquet et
+    les long_window - 1 barres qui le précèdent.
+    """
+    def strategy(bars, start, end):
+        lo = max(start - long_window + 1, 0)
+        close = bars["close"][lo:end]
+        cumulative = np.concatenate([[0.0], np.cumsum(close)])
+
+        def sma(window):
+            out = np.full(len(close), np.nan)
+            out[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window
+            return out
+
+        short, long = sma(short_window)[start - lo:], sma(long_window)[start - lo:]
+        return np.where(np.isnan(long), np.nan, np.where(short > long, size, 0.0))
+    return strategy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest événementiel sur des klines Binance.")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--limit", type=int, default=10_000, help="Nombre de barres à récupérer.")
+    parser.add_argument("--short-window", type=int, default=20)
+    parser.add_argument("--long-window", type=int, default=100)
+    parser.add_argument("--size", type=float, default=0.1)
+    parser.add_argument("--latency", type=int, default=1)
+    parser.add_argument("--fee-rate", type=float, default=0.001)
+    parser.add_argument("--slippage-bps", type=float, default=1.0)
+    parser.add_argument("--participation", type=float, default=None)
+    parser.add_argument("--output", default=None, help="Fichier CSV du journal des exécutions.")
+    args = parser.parse_args()
+
+    from binance_client import fetch_klines_sync
+
+    bars = to_bars(fetch_klines_sync(args.symbol, args.interval, limit=args.limit))
+    started = time.perf_counter()
+    equity, fills = run_backtest(bars, sma_crossover_strategy(args.short_window, args.long_window, args.size),
+                                 latency=args.latency, fee_rate=args.fee_rate,
+                                 slippage_bps=args.slippage_bps, participation=args.participation)
+    elapsed = time.perf_counter() - started
+    for key, value in summarize(equity, fills).items():
+        print(f"{key}: {value}")
+    print(f"{len(bars) / max(elapsed, 1e-9):,.0f} barres/s")
+    if args.output:
+        fills_frame(fills).to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,28 @@
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
 import numpy as np
-import plotly.graph_objs as go
-from hurst import compute_Hc
+from hurst_estimators import estimate_hurst
+from fractional_brownian import fbm
+import instrumentation
+from instrumentation import CALLBACK, COMPUTE, RENDER, instrumented
 
-# Initialiser l'application Dash
-app = dash.Dash(__name__)
+# Dash et plotly ne sont importés qu'à la création de l'application ou d'une
+# figure : les fonctions de calcul s'importent sans eux
 
-# Fonction pour générer une série temporelle fractale simulée
-def generate_fractal_series(length=500):
-    np.random.seed(42)
-    return np.cumsum(np.random.randn(length))
+# Fonction pour générer une série temporelle fractale simulée (mouvement brownien fractionnaire d'exposant H)
+@instrumented(COMPUTE)
+def generate_fractal_series(length=500, H=0.5):
+    return fbm(length, H, seed=42)
 
 # Fonction pour calculer l'exposant de Hurst avec les données nécessaires pour la visualisation
-def calculate_hurst_with_visualization(data):
-    """Retourne l'exposant de Hurst et les données log-log nécessaires."""
-    H, c, tau = compute_Hc(data, kind='price', simplified=False)
-    scales = 2 ** np.arange(2, len(tau) + 2)  # Échelles (2^n)
-    fluctuations = np.exp(tau)  # Fluctuations associées
-    return H, scales, fluctuations
-
-# Générer les données initiales
-data_length = 500
-series = generate_fractal_series(data_length)
-H, scales, fluctuations = calculate_hurst_with_visualization(series)
+@instrumented(COMPUTE)
+def calculate_hurst_with_visualization(data, method='rs'):
+    """Retourne l'exposant de Hurst, la constante c et les données log-log (F(s) ≈ c · s^H)."""
+    H, c, scales, fluctuations = estimate_hurst(data, method=method, kind='random_walk')
+    return H, c, scales, fluctuations
 
-# Mise en page de l'application
-app.layout = html.Div([
-    html.H1("Exposant de Hurst : Visualisation Interactive"),
-    
-    # Graphique interactif
-    dcc.Graph(id='hurst-plot', style={'height': '70vh'}),
-    
-    # Contrôle utilisateur pour ajuster la longueur de la série
-    html.Div([
-        html.Label("Longueur de la série temporelle :"),
-        dcc.Slider(
-            id='series-length-slider',
-            min=100,
-            max=1000,
-            step=50,
-            value=500,
-            marks={i: str(i) for i in range(100, 1001, 200)},
-        )
-    ], style={'margin-top': '20px'}),
-    
-    # Résultats de l'exposant de Hurst
-    html.Div([
-        html.H4("Exposant de Hurst Calculé :"),
-        html.Div(id='hurst-value', style={'font-size': '18px', 'margin-bottom': '20px'}),
-    ])
-])
-
-# Callback pour mettre à jour les graphiques et les calculs
-@app.callback(
-    [Output('hurst-plot', 'figure'),
-     Output('hurst-value', 'children')],
-    [Input('series-length-slider', 'value')]
-)
-def update_hurst_visualization(length):
-    # Générer une nouvelle série temporelle
-    series = generate_fractal_series(length)
-    H, scales, fluctuations = calculate_hurst_with_visualization(series)
+# Figure : série simulée, points log-log et droite de régression
+@instrumented(RENDER)
+def build_hurst_figure(series, H, c, scales, fluctuations):
+    import plotly.graph_objs as go
 
     # Préparer les graphiques
     fig = go.Figure()
@@ -88,8 +48,7 @@ def update_hurst_visualization(length):
     ))
 
     # Régression linéaire pour Hurst
-    intercept = log_fluctuations[0] - H * log_scales[0]
-    regression_line = H * log_scales + intercept
+    regression_line = H * log_scales + np.log2(c)
     fig.add_trace(go.Scatter(
         x=log_scales,
         y=regression_line,
@@ -106,8 +65,84 @@ def update_hurst_visualization(length):
         legend_title="Graphiques",
         height=600
     )
-    return fig, f"Exposant de Hurst Calculé : H = {H:.2f}"
+    return fig
+
+# Longueur initiale de la série simulée
+data_length = 500
+
+# Mise en page de l'application
+def serve_layout():
+    from dash import dcc, html
+
+    return html.Div([
+        html.H1("Exposant de Hurst : Visualisation Interactive"),
+    
+        # Graphique interactif
+        dcc.Graph(id='hurst-plot', style={'height': '70vh'}),
+    
+        # Contrôle utilisateur pour ajuster la longueur de la série
+        html.Div([
+            html.Label("Longueur de la série temporelle :"),
+            dcc.Slider(
+                id='series-length-slider',
+                min=100,
+                max=1000,
+                step=50,
+                value=data_length,
+                marks={i: str(i) for i in range(100, 1001, 200)},
+            )
+        ], style={'margin-top': '20px'}),
+
+        # Contrôle utilisateur pour choisir l'exposant de Hurst de la série simulée
+        html.Div([
+            html.Label("Exposant de Hurst de la série simulée :"),
+            dcc.Slider(
+                id='target-hurst-slider',
+                min=0.05,
+                max=0.95,
+                step=0.05,
+                value=0.5,
+                marks={h: f"{h:.1f}" for h in (0.1, 0.3, 0.5, 0.7, 0.9)},
+            )
+        ], style={'margin-top': '20px'}),
+    
+        # Résultats de l'exposant de Hurst
+        html.Div([
+            html.H4("Exposant de Hurst Calculé :"),
+            html.Div(id='hurst-value', style={'font-size': '18px', 'margin-bottom': '20px'}),
+        ])
+    ])
+
+# Callback pour mettre à jour les graphiques et les calculs (enregistré par create_app)
+@instrumented(CALLBACK)
+def update_hurst_visualization(length, target_H):
+    # Générer une nouvelle série temporelle
+    series = generate_fractal_series(length, target_H)
+    H, c, scales, fluctuations = calculate_hurst_with_visualization(series)
+
+    fig = build_hurst_figure(series, H, c, scales, fluctuations)
+    return fig, f"Exposant de Hurst Calculé : H = {H:.2f} (valeur simulée : {target_H:.2f})"
+
+# Application Dash : mise en page, callback et mesures exposées sur /metrics
+def create_app():
+    import dash
+    from dash.dependencies import Input, Output
+
+    app = dash.Dash(__name__)
+    instrumentation.register_metrics_route(app)
+    app.layout = serve_layout()
+    app.callback(
+        [Output('hurst-plot', 'figure'),
+         Output('hurst-value', 'children')],
+        [Input('series-length-slider', 'value'),
+         Input('target-hurst-slider', 'value')]
+    )(update_hurst_visualization)
+    return app
 
 # Lancer l'application
+def main():
+    instrumentation.configure_from_env(default="time")
+    create_app().run(debug=True)
+
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    main()
@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+
+# Graphe paresseux d'indicateurs
+#
+# Chaque indicateur est déclaré avec ses entrées (autres nœuds du graphe) et
+# n'est calculé qu'à la première demande, puis conservé dans le cache du
+# graphe sous la clé (nom, fenêtre). Les statistiques glissantes reposent sur
+# des sommes cumulées partagées (valeurs, carrés, nombre de points valides),
+# calculées une seule fois par série : une moyenne ou un écart-type glissant
+# sur une nouvelle fenêtre ne coûte plus qu'une soustraction de deux
+# décalages, au lieu d'un nouveau passage complet de `rolling`.
+# Un graphe porte sur une série (ou un panel, une série par colonne, calculé
+# colonne par colonne en une seule opération).
+
+FEATURES = {}
+
+
+def feature(name, inputs=(), windowed=True):
+    """
+    Déclare un indicateur du graphe.
+    Args:
+        name (str): Nom du nœud.
+        inputs (tuple): Nœuds dont il dépend, passés dans cet ordre à la fonction ;
+            les nœuds fenêtrés reçoivent la même fenêtre que l'indicateur.
+        windowed (bool): False pour un nœud indépendant de la fenêtre (sommes cumulées).
+    """
+    def register(func):
+        FEATURES[name] = (func, tuple(inputs), windowed)
+        return func
+    return register
+
+
+class FeatureGraph:
+    """
+    Cache d'indicateurs calculés à la demande pour une série de prix.
+    Args:
+        data (pd.Series | pd.DataFrame): Série (ou panel) de prix, NaN autorisés.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        values = data.to_numpy(dtype=np.float64)
+        self._values = values if values.ndim == 2 else values[:, None]
+        self._cache = {}
+        self.computed = 0  # Nombre de nœuds effectivement calculés
+
+    def _node(self, name, window=None):
+        if name not in FEATURES:
+            raise ValueError(f"Indicateur inconnu : {name} (disponibles : {sorted(FEATURES)})")
+        func, inputs, windowed = FEATURES[name]
+        key = (name, window if windowed else None)
+        if key not in self._cache:
+            if windowed and (window is None or window < 1):
+                raise ValueError(f"L'indicateur {name} demande une fenêtre entière positive.")
+            args = [self._node(dep, window) for dep in inputs]
+            self._cache[key] = func(self, *args, window) if windowed else func(self, *args)
+            self.computed += 1
+        return self._cache[key]
+
+    def _wrap(self, values, name):
+        if isinstance(self.data, pd.DataFrame):
+            return pd.DataFrame(values, index=self.data.index, columns=self.data.columns)
+        return pd.Series(values[:, 0], index=self.data.index, name=name)
+
+    def get(self, name, window=None):
+        """Indicateur `name` sur la fenêtre `window`, au format de la série d'origine."""
+        return self._wrap(self._node(name, window), name)
+
+    def get_many(self, name, windows):
+        """
+        Même indicateur pour plusieurs fenêtres (série d'origine uniquement).
+        Returns:
+            pd.DataFrame: Une colonne par fenêtre.
+        """
+        if isinstance(self.data, pd.DataFrame):
+            raise ValueError("get_many s'applique à une seule série ; utiliser get sur un panel.")
+        return pd.DataFrame({w: self._node(name, w)[:, 0] for w in windows}, index=self.data.index)
+
+    def clear(self):
+        self._cache.clear()
+
+
+# Nœuds de base
+@feature("series", windowed=False)
+def _series(graph):
+    return graph._values
+
+
+@feature("offset", inputs=("series",), windowed=False)
+def _offset(graph, values):
+    # Les sommes cumulées portent sur la série recentrée, pour limiter
+    # les pertes de précision dans les différences de grandes sommes
+    with np.errstate(invalid="ignore"):
+        offset = np.nanmean(values, axis=0) if len(values) else np.zeros(values.shape[1])
+    return np.nan_to_num(offset)
+
+
+def _prefix(values, dtype=np.longdouble):
+    """
+    Sommes cumulées précédées d'un zéro, en précision étendue par défaut
+    (np.longdouble, 80 bits sur x86) : la différence de deux grands cumuls
+    reste précise même sur de très longues séries.
+    """
+    prefix = np.zeros((len(values) + 1, values.shape[1]), dtype=dtype)
+    np.cumsum(values, axis=0, out=prefix[1:], dtype=dtype)
+    return prefix
+
+
+@feature("prefix_count", inputs=("series",), windowed=False)
+def _prefix_count(graph, values):
+    return _prefix(np.isfinite(values), dtype=np.int64)
+
+
+@feature("prefix_sum", inputs=("series", "offset"), windowed=False)
+def _prefix_sum(graph, values, offset):
+    return _prefix(np.nan_to_num(values - offset))
+
+
+@feature("prefix_sum_sq", inputs=("series", "offset"), windowed=False)
+def _prefix_sum_sq(graph, values, offset):
+    centered = np.nan_to_num(values - offset)
+    return _prefix(centered * centered)
+
+
+def _window_diff(prefix, window):
+    """prefix[t + 1] - prefix[t + 1 - window], NaN tant que la fenêtre n'est pas complète."""
+    out = np.full((len(prefix) - 1, prefix.shape[1]), np.nan)
+    if window < len(prefix):
+        np.subtract(prefix[window:], prefix[:-window], out=out[window - 1:], casting="unsafe")
+    return out
+
+
+@feature("rolling_complete", inputs=("prefix_count",))
+def _rolling_complete(graph, prefix_count, window):
+    """Fenêtres sans valeur manquante (comme pandas avec min_periods = window) ; None si la série est complète."""
+    if prefix_count[-1].min() == len(prefix_count) - 1:
+        return None
+    complete = np.zeros((len(prefix_count) - 1, prefix_count.shape[1]), dtype=bool)
+    if window < len(prefix_count):
+        complete[window - 1:] = prefix_count[window:] - prefix_count[:-window] == window
+    return complete
+
+
+@feature("centered_sum", inputs=("prefix_sum",))
+def _centered_sum(graph, prefix_sum, window):
+    return _window_diff(prefix_sum, window)
+
+
+@feature("centered_sum_sq", inputs=("prefix_sum_sq",))
+def _centered_sum_sq(graph, prefix_sum_sq, window):
+    return _window_diff(prefix_sum_sq, window)
+
+
+@feature("rolling_sum", inputs=("centered_sum", "offset", "rolling_complete"))
+def _rolling_sum(graph, centered_sum, offset, complete, window):
+    rolling_sum = centered_sum + window * offset
+    return rolling_sum if complete is None else np.where(complete, rolling_sum, np.nan)
+
+
+@feature("rolling_mean", inputs=("rolling_sum",))
+def _rolling_mean(graph, rolling_sum, window):
+    return rolling_sum / window
+
+
+@feature("rolling_var", inputs=("centered_sum", "centered_sum_sq", "rolling_complete"))
+def _rolling_var(graph, s, ss, complete, window):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = np.maximum(ss - s * s / window, 0.0) / (window - 1)
+    # Variance non biaisée (ddof = 1) : indéfinie sur une fenêtre d'un seul point
+    if window < 2:
+        return np.full_like(var, np.nan)
+    return var if complete is None else np.where(complete, var, np.nan)
+
+
+@feature("rolling_std", inputs=("rolling_var",))
+def _rolling_std(graph, rolling_var, window):
+    return np.sqrt(rolling_var)
+
+
+@feature("lag_diff", inputs=("series",))
+def _lag_diff(graph, values, window):
+    out = np.full_like(values, np.nan)
+    out[window:] = values[window:] - values[:-window]
+    return out
+
+
+# Indicateurs
+@feature("momentum", inputs=("lag_diff",))
+def _momentum(graph, lag_diff, window):
+    return lag_diff
+
+
+@feature("mean_reversion", inputs=("series", "rolling_mean"))
+def _mean_reversion(graph, values, rolling_mean, window):
+    return values - rolling_mean
+
+
+@feature("zscore", inputs=("mean_reversion", "rolling_std"))
+def _zscore(graph, deviation, rolling_std, window):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return deviation / rolling_std
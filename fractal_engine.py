@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from instrumentation import COMPUTE, instrumented
+
+# Moteur de détection des fractales sur N barres
+#
+# Une fractale est un pivot : la barre centrale d'une fenêtre de taille
+# impaire dont le plus haut (resp. le plus bas) dépasse strictement celui de
+# toutes les autres barres de la fenêtre. Le calcul se fait sur des vues
+# glissantes NumPy, sans boucle Python, et s'applique indifféremment à une
+# série (temps) ou à un panel (tickers x temps). pivot_mask ne calcule
+# qu'un côté (sommets ou creux) pour les appelants qui n'ont besoin que de
+# l'un des deux.
+
+
+def pivot_mask(values, window=5, axis=-1, greater=True):
+    """
+    Marque les barres qui sont un extremum strict de leur fenêtre centrée.
+    Args:
+        values (array-like): Prix (1D ou 2D).
+        window (int): Taille impaire de la fenêtre.
+        axis (int): Axe du temps.
+        greater (bool): True pour les sommets (des hauts), False pour les creux (des bas).
+    Returns:
+        np.ndarray: Masque booléen de même forme que `values`.
+    """
+    if window < 3 or window % 2 == 0:
+        raise ValueError("La fenêtre doit être un entier impair supérieur ou égal à 3.")
+    values = np.moveaxis(np.asarray(values, dtype=np.float64), axis, -1)
+    mask = np.zeros(values.shape, dtype=bool)
+    half = window // 2
+    if values.shape[-1] < window:
+        return np.moveaxis(mask, -1, axis)
+
+    # Vue (..., n - window + 1, window) sans copie des données
+    windows = sliding_window_view(values, window, axis=-1)
+    center = windows[..., half]
+    # Réduction colonne par colonne de la fenêtre : chaque windows[..., k] est
+    # une vue décalée, ce qui reste vectorisé et bien plus rapide qu'un
+    # max(axis=-1) sur un petit axe non contigu.
+    reduce = np.maximum if greater else np.minimum
+    neighbours = windows[..., 0].copy()
+    for k in range(1, window):
+        if k != half:
+            reduce(neighbours, windows[..., k], out=neighbours)
+    pivot = center > neighbours if greater else center < neighbours
+    mask[..., half:values.shape[-1] - half] = pivot
+    return np.moveaxis(mask, -1, axis)
+
+
+@instrumented(COMPUTE)
+def find_fractals(high, low, window=5, axis=-1):
+    """
+    Identifie les fractales haussières et baissières.
+    Args:
+        high (array-like): Prix hauts, série ou panel (tickers x temps).
+        low (array-like): Prix bas, même forme que `high`.
+        window (int): Taille impaire de la fenêtre (5 pour les fractales de Williams).
+        axis (int): Axe du temps (-1 par défaut, 0 pour un DataFrame temps x tickers).
+    Returns:
+        tuple: (bullish, bearish) masques booléens ; une fractale baissière
+        est un sommet local des hauts, une fractale haussière un creux local des bas.
+    """
+    bullish = pivot_mask(low, window, axis, greater=False)
+    bearish = pivot_mask(high, window, axis, greater=True)
+    return bullish, bearish
+
+
+def find_fractals_frame(high, low, window=5):
+    """
+    Version pandas de find_fractals pour des DataFrames temps x tickers.
+    Args:
+        high (pd.DataFrame): Prix hauts, une colonne par ticker.
+        low (pd.DataFrame): Prix bas, mêmes index et colonnes.
+        window (int): Taille impaire de la fenêtre.
+    Returns:
+        tuple: (bullish, bearish) DataFrames booléens alignés sur `high`.
+    """
+    bullish, bearish = find_fractals(high.to_numpy(), low.to_numpy(), window, axis=0)
+    return (pd.DataFrame(bullish, index=high.index, columns=high.columns),
+            pd.DataFrame(bearish, index=high.index, columns=high.columns))
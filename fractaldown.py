@@ -1,8 +1,12 @@
-import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
+import data_cache
+import reporting
+from fractal_engine import pivot_mask
+import instrumentation
+from instrumentation import COMPUTE, FETCH, RENDER, instrumented
 
 # Télécharger les données de NVIDIA sur les 3 derniers mois
+@instrumented(FETCH)
 def download_market_data(ticker, period="3mo", interval="1d"):
     """
     Télécharge les données de marché pour un actif donné.
@@ -13,61 +17,60 @@ def download_market_data(ticker, period="3mo", interval="1d"):
     Returns:
         pd.DataFrame: Données du marché.
     """
-    data = yf.download(ticker, period=period, interval=interval)
-    print(data.head())  # Vérifie les premières lignes des données
-    print(data.columns)  # Vérifie les colonnes disponibles
-    if 'High' not in [col[0] for col in data.columns]:
+    data = data_cache.download(ticker, period=period, interval=interval)
+    if 'High' not in data.columns:
         raise ValueError("La colonne 'High' est absente des données téléchargées.")
-    # Aplatir les colonnes
-    data.columns = ['_'.join(col) for col in data.columns]
+    # Suffixer les colonnes par le ticker (ex: 'High_NVDA')
+    data.columns = [f'{col}_{ticker}' for col in data.columns]
     return data
 
 # Identifier les fractales baissières
-def find_bearish_fractals(data):
+@instrumented(COMPUTE)
+def find_bearish_fractals(data, column='High_NVDA', window=5):
     """
     Identifie les fractales baissières dans les données de marché.
     Args:
         data (pd.DataFrame): Données de marché.
+        column (str): Colonne des prix hauts.
+        window (int): Taille impaire de la fenêtre (5 barres par défaut).
     Returns:
         pd.DataFrame: Données avec une colonne indiquant les fractales baissières.
     """
-    data['Bearish_Fractal'] = 0  # Initialisation de la colonne des fractales baissières
-    
-    for i in range(2, len(data) - 2):
-        current_high = data.at[data.index[i], 'High_NVDA']
-        prev_high_1 = data.at[data.index[i - 1], 'High_NVDA']
-        prev_high_2 = data.at[data.index[i - 2], 'High_NVDA']
-        next_high_1 = data.at[data.index[i + 1], 'High_NVDA']
-        next_high_2 = data.at[data.index[i + 2], 'High_NVDA']
-        
-        if current_high > prev_high_1 and current_high > prev_high_2 and current_high > next_high_1 and next_high_2:
-            data.at[data.index[i], 'Bearish_Fractal'] = 1  # Marquer la fractale baissière
-    
+    bearish = pivot_mask(data[column].to_numpy(), window, greater=True)
+    data['Bearish_Fractal'] = bearish.astype(int)  # 1 sur chaque sommet local
     return data
 
 # Visualiser les fractales baissières
-def plot_bearish_fractals(data, ticker):
+@instrumented(RENDER)
+def plot_bearish_fractals(data, ticker, output=None):
     """
     Visualise les fractales baissières sur un graphique.
     Args:
         data (pd.DataFrame): Données de marché avec fractales baissières.
-        ticker (str): Symbole de l'actif.
+        ticker (str): Symbole de l'actif (suffixe des colonnes).
+        output (str): Fichier .png ou .svg ; None pour afficher la figure.
     """
-    plt.figure(figsize=(14, 7))
-    plt.plot(data['Close_NVDA'], label=f'{ticker} - Prix de clôture', alpha=0.8)
+    fig, ax = reporting.figure((14, 7), output)
+    ax.plot(data[f'Close_{ticker}'], label=f'{ticker} - Prix de clôture', alpha=0.8)
     # Ajouter les fractales baissières sur le graphique
     bearish_fractals = data[data['Bearish_Fractal'] == 1]
-    plt.scatter(bearish_fractals.index, bearish_fractals['High_NVDA'], label='Fractales Baissières', color='red', marker='v')
+    ax.scatter(bearish_fractals.index, bearish_fractals[f'High_{ticker}'], label='Fractales Baissières', color='red', marker='v')
     
-    plt.title(f'Fractales Baissières pour {ticker}')
-    plt.xlabel('Date')
-    plt.ylabel('Prix')
-    plt.legend()
-    plt.show()
+    ax.set_title(f'Fractales Baissières pour {ticker}')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Prix')
+    ax.legend()
+    return reporting.finish(fig, output)
 
 # Exemple d'utilisation
-if __name__ == "__main__":
+def main():
     ticker = "NVDA"  # Symbole de NVIDIA
     data = download_market_data(ticker, period="3mo", interval="1d")
     data = find_bearish_fractals(data)
     plot_bearish_fractals(data, ticker)
+
+    if instrumentation.is_enabled():
+        print(instrumentation.format_summary())
+
+if __name__ == "__main__":
+    main()
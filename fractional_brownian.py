@@ -0,0 +1,71 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Génération de bruit gaussien fractionnaire (fGn) et de mouvement brownien
+# fractionnaire (fBm) d'exposant de Hurst donné
+#
+# Méthode de Davies–Harte (plongement circulant) : la matrice de covariance
+# Toeplitz du fGn de longueur n est plongée dans une matrice circulante de
+# taille 2n, diagonalisée par la FFT. Un tirage exact s'obtient en pondérant
+# un bruit gaussien complexe par la racine des valeurs propres puis en
+# repassant par une FFT, soit O(n log n) par trajectoire. Les valeurs
+# propres ne dépendent que de (H, n) et sont mises en cache ; un lot de
+# trajectoires est généré par une seule FFT sur un tableau 2D.
+
+
+def fgn_autocovariance(H, n):
+    """Autocovariance γ(k), k = 0..n-1, d'un fGn de variance unité."""
+    k = np.arange(n, dtype=np.float64)
+    return 0.5 * (np.abs(k + 1) ** (2 * H) - 2 * k ** (2 * H) + np.abs(k - 1) ** (2 * H))
+
+
+@lru_cache(maxsize=16)
+def _circulant_eigenvalues(H, n):
+    """Racines des valeurs propres (divisées par 2n) de la matrice circulante de taille 2n."""
+    gamma = fgn_autocovariance(H, n + 1)
+    row = np.concatenate([gamma, gamma[-2:0:-1]])  # Première ligne de la matrice circulante
+    eigenvalues = np.fft.rfft(row).real
+    if eigenvalues.min() < -1e-8 * eigenvalues.max():
+        raise ValueError(f"Plongement circulant non défini positif pour H={H}, n={n}.")
+    sqrt = np.sqrt(np.maximum(eigenvalues, 0.0) / len(row))
+    sqrt.flags.writeable = False
+    return sqrt
+
+
+def fgn(n, H=0.5, n_paths=None, sigma=1.0, seed=None):
+    """
+    Bruit gaussien fractionnaire (incréments d'un fBm).
+    Args:
+        n (int): Nombre de points par trajectoire.
+        H (float): Exposant de Hurst, strictement entre 0 et 1.
+        n_paths (int): Nombre de trajectoires indépendantes ; None pour une seule série 1D.
+        sigma (float): Écart-type de chaque incrément.
+        seed (int | np.random.Generator): Graine (ou générateur) pour la reproductibilité.
+    Returns:
+        np.ndarray: Forme (n,) ou (n_paths, n).
+    """
+    if not 0.0 < H < 1.0:
+        raise ValueError(f"L'exposant de Hurst doit être strictement entre 0 et 1 (reçu {H}).")
+    rng = np.random.default_rng(seed)
+    paths = 1 if n_paths is None else n_paths
+    weights = _circulant_eigenvalues(float(H), int(n))  # Longueur n + 1
+    # Bruit complexe à symétrie hermitienne : les fréquences 0 et n sont réelles,
+    # les autres se partagent la variance entre parties réelle et imaginaire
+    noise = rng.standard_normal((paths, n + 1, 2))
+    noise[:, 1:n] *= np.sqrt(0.5)
+    noise[:, [0, n], 1] = 0.0
+    spectrum = (noise[..., 0] + 1j * noise[..., 1]) * weights
+    series = np.fft.irfft(spectrum, n=2 * n, axis=-1)[:, :n] * (2 * n)
+    if sigma != 1.0:
+        series *= sigma
+    return series[0] if n_paths is None else series
+
+
+def fbm(n, H=0.5, n_paths=None, sigma=1.0, seed=None):
+    """
+    Mouvement brownien fractionnaire : somme cumulée d'un fGn (voir fgn pour les arguments).
+    Returns:
+        np.ndarray: Positions après chaque incrément, forme (n,) ou (n_paths, n).
+    """
+    return np.cumsum(fgn(n, H, n_paths, sigma, seed), axis=-1)
@@ -1,126 +1,230 @@
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import requests
+import warnings
+
 import pandas as pd
 import numpy as np
-import plotly.graph_objs as go
-from hurst import compute_Hc
-import time
-from threading import Thread
+from hurst_estimators import estimate_hurst
+from rolling_hurst import rolling_hurst
+from streaming_hurst import StreamingHurst
+from replay_clock import ReplayClock, SessionStore
+from downsampling import decimate, x_range_from_relayout
+from market_data_hub import MarketDataHub
+from hurst_table import HurstTable, heatmap_figure, klines_frame
+import instrumentation
+from instrumentation import CALLBACK, COMPUTE, FETCH, RENDER, instrumented, span
 
-# Initialiser l'application Dash
-app = dash.Dash(__name__)
+# Dash, plotly et le client Binance (aiohttp) ne sont importés qu'à la
+# création de l'application, dans les callbacks et au premier téléchargement :
+# les fonctions de calcul s'importent sans eux
 
 # Fonction pour récupérer les données de marché via l'API Binance
 def fetch_market_data(symbol="BTCUSDT", interval="1m", limit=500):
-    url = f"https://api.binance.com/api/v3/klines?symbol={symbol}&interval={interval}&limit={limit}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        data = response.json()
-        df = pd.DataFrame(data, columns=[
-            "Open time", "Open", "High", "Low", "Close", "Volume",
-            "Close time", "Quote asset volume", "Number of trades",
-            "Taker buy base asset volume", "Taker buy quote asset volume", "Ignore"
-        ])
-        df["Close"] = pd.to_numeric(df["Close"], errors='coerce')
-        df["Time"] = pd.to_datetime(df["Close time"], unit='ms')
-        df.dropna(inplace=True)
-        return df[["Time", "Close"]]
-    else:
-        print(f"Erreur lors de la récupération des données: {response.status_code}")
+    try:
+        return load_market_data((symbol, interval), limit)
+    except Exception as e:
+        warnings.warn(f"Erreur lors de la récupération des données : {e!r}", RuntimeWarning)
+        instrumentation.record_error("hurst_analysis.fetch_market_data", FETCH, e)
         return pd.DataFrame()
 
+# Chargement brut d'une clé (symbole, intervalle) pour le hub ; les erreurs sont propagées
+@instrumented(FETCH)
+def load_market_data(key, limit=500):
+    from binance_client import fetch_klines_sync
+
+    symbol, interval = key
+    return klines_frame(fetch_klines_sync(symbol, interval, limit=limit))
+
 # Calcul de l'exposant de Hurst
-def calculate_hurst(data):
-    H, _, _ = compute_Hc(data, kind='price', simplified=True)
+@instrumented(COMPUTE)
+def calculate_hurst(data, method='rs'):
+    H, _, _, _ = estimate_hurst(data, method=method, kind='price')
     return H
 
-# Initialisation des variables globales
+# Hurst incrémental : seuls les prix non encore vus sont ajoutés à l'estimateur ; même R/S
+# classique que calculate_hurst et la table, la valeur affichée ne dépend donc pas du chemin
+@instrumented(COMPUTE)
+def update_streaming_hurst(session, closes):
+    if len(closes) < session["hurst_fed"]:
+        session["hurst_estimator"] = StreamingHurst()
+        session["hurst_fed"] = 0
+    session["hurst_estimator"].extend(closes[session["hurst_fed"]:])
+    session["hurst_fed"] = len(closes)
+    return session["hurst_estimator"].value
+
+# Paramètres de l'application
 cryptos = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT"]
 intervals = ["1m", "5m", "15m", "1h"]
-market_data = pd.DataFrame()
-current_index = 0
-running = False
+speeds = [1, 10, 100, 1000, 10000]
+step_seconds = 0.5  # Durée d'une bougie rejouée à vitesse 1x
+default_plot_width = 1200  # Nombre de points envoyés tant que la largeur n'est pas connue
+rolling_window = 128  # Fenêtre du Hurst glissant affiché en surimpression
+market_data_ttl = 30  # Durée (s) pendant laquelle les données d'une paire sont servies sans nouvel appel
+session_timeout = 1800  # Une session inactive depuis plus longtemps (s) est libérée, avec ses données
 
-# Mise en page de l'application
-app.layout = html.Div([
-    html.H1("Analyse des Cryptomonnaies et Modélisation Fractale"),
-    
-    # Graphique interactif
-    dcc.Graph(id='market-plot', style={'height': '70vh'}),
-    
-    # Exposant de Hurst et son interprétation
-    html.Div([
-        html.H4("Exposant de Hurst :"),
-        html.Div(id='hurst-exponent', style={'font-size': '18px', 'margin-bottom': '20px'}),
-        html.Div(id='hurst-interpretation', style={'font-size': '16px', 'margin-bottom': '20px'}),
-    ]),
-    
-    # Contrôles utilisateur
-    html.Div([
-        html.Label("Choisissez une cryptomonnaie :"),
-        dcc.Dropdown(
-            id='crypto-dropdown',
-            options=[{'label': crypto[:-4], 'value': crypto} for crypto in cryptos],
-            value='BTCUSDT'
-        ),
-        
-        html.Label("Intervalle de temps :"),
-        dcc.Dropdown(
-            id='interval-dropdown',
-            options=[{'label': interval, 'value': interval} for interval in intervals],
-            value='1m'
-        ),
-        html.Button('Start', id='start-button', n_clicks=0),
-        html.Button('Pause', id='pause-button', n_clicks=0),
-    ], style={'margin-top': '20px'}),
-    
-    # Explications mathématiques
-    html.Div([
-        html.H4("Explications Mathématiques :"),
-        html.P(
-            "Les fractales sont des objets mathématiques qui présentent une auto-similarité, "
-            "c'est-à-dire que leurs motifs se répètent à différentes échelles. "
-            "L'exposant de Hurst est une mesure de la mémoire ou de la tendance des séries temporelles. "
-            "Il se situe entre 0 et 1 :"
-        ),
-        html.Ul([
-            html.Li("H = 0.5 : La série est une marche aléatoire (sans tendance)."),
-            html.Li("H > 0.5 : La série est persistante (les hausses ont tendance à être suivies par d'autres hausses)."),
-            html.Li("H < 0.5 : La série est anti-persistante (les hausses sont suivies de baisses, et vice-versa).")
+# Toutes les paires (symbole, intervalle) et leur Hurst, tenues à jour en arrière-plan
+# (thread lancé par create_app) : changer de paire ne coûte qu'une recherche dans la table
+hurst_table = HurstTable(cryptos, intervals, limit=500, refresh=market_data_ttl)
+
+# Données de la table si elle les a déjà, sinon appel direct à l'API
+def lookup_market_data(key):
+    entry = hurst_table.get(*key)
+    if entry is not None:
+        return entry["data"]
+    return load_market_data(key)
+
+# Données partagées par toutes les sessions : un seul appel à l'API par (symbole, intervalle)
+hub = MarketDataHub(lookup_market_data, ttl=market_data_ttl, session_timeout=session_timeout)
+
+@instrumented(COMPUTE)
+def compute_rolling_hurst(data):
+    closes = data.get("Close", pd.Series(dtype=float))
+    return rolling_hurst(closes, window=rolling_window) if len(closes) > rolling_window else pd.Series(dtype=float)
+
+def empty_market_data():
+    return pd.DataFrame({"Time": pd.Series(dtype="datetime64[ns]"), "Close": pd.Series(dtype=float)})
+
+# État propre à chaque session de navigateur
+def new_session():
+    return {
+        "market_data": empty_market_data(),
+        "clock": ReplayClock(0, step_seconds=step_seconds),
+        "hurst_estimator": StreamingHurst(),
+        "hurst_fed": 0,
+        "rolling_hurst": pd.Series(dtype=float),
+        "table_hurst": None,  # Hurst de la table tant que la série complète est affichée sans rejeu
+    }
+
+# Une session supprimée libère aussi sa clé dans le hub
+sessions = SessionStore(new_session, ttl=session_timeout, on_evict=lambda session_id, _: hub.release(session_id))
+
+# Mise en page de l'application (générée à chaque chargement pour attribuer un identifiant de session)
+def serve_layout():
+    from dash import dcc, html
+
+    return html.Div([
+        html.H1("Analyse des Cryptomonnaies et Modélisation Fractale"),
+        dcc.Store(id='session-id', data=SessionStore.new_id()),
+        dcc.Interval(id='replay-interval', interval=500, disabled=True),
+        dcc.Store(id='plot-width'),
+
+        # Graphique interactif
+        dcc.Graph(id='market-plot', style={'height': '70vh'}),
+
+        # Exposant de Hurst et son interprétation
+        html.Div([
+            html.H4("Exposant de Hurst :"),
+            html.Div(id='hurst-exponent', style={'font-size': '18px', 'margin-bottom': '20px'}),
+            html.Div(id='hurst-interpretation', style={'font-size': '16px', 'margin-bottom': '20px'}),
+        ]),
+
+        # Hurst de toutes les paires, d'après la table précalculée
+        dcc.Graph(id='hurst-heatmap'),
+        dcc.Interval(id='heatmap-interval', interval=market_data_ttl * 1000),
+
+        # Contrôles utilisateur
+        html.Div([
+            html.Label("Choisissez une cryptomonnaie :"),
+            dcc.Dropdown(
+                id='crypto-dropdown',
+                options=[{'label': crypto[:-4], 'value': crypto} for crypto in cryptos],
+                value='BTCUSDT'
+            ),
+
+            html.Label("Intervalle de temps :"),
+            dcc.Dropdown(
+                id='interval-dropdown',
+                options=[{'label': interval, 'value': interval} for interval in intervals],
+                value='1m'
+            ),
+
+            html.Label("Vitesse de rejeu :"),
+            dcc.Dropdown(
+                id='speed-dropdown',
+                options=[{'label': f'{speed}x', 'value': speed} for speed in speeds],
+                value=1
+            ),
+            dcc.Checklist(
+                id='overlay-options',
+                options=[{'label': f'Hurst glissant ({rolling_window} bougies)', 'value': 'rolling'}],
+                value=[]
+            ),
+            html.Button('Start', id='start-button', n_clicks=0),
+            html.Button('Pause', id='pause-button', n_clicks=0),
+        ], style={'margin-top': '20px'}),
+
+        # Explications mathématiques
+        html.Div([
+            html.H4("Explications Mathématiques :"),
+            html.P(
+                "Les fractales sont des objets mathématiques qui présentent une auto-similarité, "
+                "c'est-à-dire que leurs motifs se répètent à différentes échelles. "
+                "L'exposant de Hurst est une mesure de la mémoire ou de la tendance des séries temporelles. "
+                "Il se situe entre 0 et 1 :"
+            ),
+            html.Ul([
+                html.Li("H = 0.5 : La série est une marche aléatoire (sans tendance)."),
+                html.Li("H > 0.5 : La série est persistante (les hausses ont tendance à être suivies par d'autres hausses)."),
+                html.Li("H < 0.5 : La série est anti-persistante (les hausses sont suivies de baisses, et vice-versa).")
+            ])
         ])
     ])
-])
-
-# Callback pour mettre à jour le graphique et calculer Hurst
-@app.callback(
-    [Output('market-plot', 'figure'),
-     Output('hurst-exponent', 'children'),
-     Output('hurst-interpretation', 'children')],
-    [Input('start-button', 'n_clicks'),
-     Input('pause-button', 'n_clicks'),
-     Input('crypto-dropdown', 'value'),
-     Input('interval-dropdown', 'value')]
-)
-def update_graph_and_hurst(start_clicks, pause_clicks, crypto, interval):
-    global running, current_index, market_data
+
+# Données de la paire choisie pour une session (partagées via le hub, vides en cas d'échec)
+def load_session_pair(session, session_id, crypto, interval):
+    try:
+        session["market_data"] = hub.acquire(session_id, (crypto, interval))
+        # Chaque valeur n'utilise que les bougies passées : calculée une fois par version des
+        # données (et partagée entre les sessions), puis découpée au rejeu
+        session["rolling_hurst"] = hub.derived((crypto, interval), "rolling_hurst", compute_rolling_hurst)
+    except Exception as e:
+        warnings.warn(f"Erreur lors de la récupération de {crypto} {interval} : {e!r}", RuntimeWarning)
+        instrumentation.record_error("hurst_analysis.load_session_pair", FETCH, e)
+        session["market_data"] = empty_market_data()
+        session["rolling_hurst"] = pd.Series(dtype=float)
+    session["hurst_estimator"] = StreamingHurst()
+    session["hurst_fed"] = 0
+    session["table_hurst"] = None
+
+# Callback pour mettre à jour le graphique et calculer Hurst (enregistré par create_app)
+@instrumented(CALLBACK)
+def update_graph_and_hurst(start_clicks, pause_clicks, crypto, interval, speed, n_intervals, relayout_data,
+                           overlays, session_id, plot_width):
+    import dash
+    import plotly.graph_objs as go
+
+    session = sessions.get(session_id)
+    clock = session["clock"]
     
     try:
-        # Gérer les actions Start/Pause
+        # Gérer les actions Start/Pause (Pause bascule entre pause et reprise)
         ctx = dash.callback_context
-        if ctx.triggered and 'start-button' in ctx.triggered[0]['prop_id']:
-            running = True
-            current_index = 0
-            market_data = fetch_market_data(crypto, interval)
-        elif ctx.triggered and 'pause-button' in ctx.triggered[0]['prop_id']:
-            running = False
-
-        # Afficher les données jusqu'à l'index actuel
-        display_data = market_data.iloc[:current_index] if running else market_data
+        trigger = ctx.triggered[0]['prop_id'] if ctx.triggered else '.'
+        if trigger == '.' or 'crypto-dropdown' in trigger or 'interval-dropdown' in trigger:
+            # Chargement de la page ou changement de paire : série complète affichée sans rejeu, lue
+            # dans la table si elle a déjà cette paire (sinon le hub la récupère), avec le Hurst de la table
+            load_session_pair(session, session_id, crypto, interval)
+            entry = hurst_table.get(crypto, interval)
+            if entry is not None:
+                session["table_hurst"] = entry["hurst"]
+            clock.seek(len(session["market_data"]), len(session["market_data"]))
+        elif 'start-button' in trigger:
+            load_session_pair(session, session_id, crypto, interval)
+            clock.start(len(session["market_data"]))
+        elif 'pause-button' in trigger:
+            if clock.running:
+                clock.pause()
+            else:
+                clock.resume()
+        if speed and speed != clock.speed:
+            clock.set_speed(speed)
+        hub.touch(session_id)
+
+        # Afficher les données jusqu'à l'index de l'horloge
+        display_data = session["market_data"].iloc[:clock.index]
         hurst_value = 0.5
-        if len(display_data) > 100:
-            hurst_value = calculate_hurst(display_data["Close"].values)
+        if session["table_hurst"] is not None and not np.isnan(session["table_hurst"]):
+            hurst_value = session["table_hurst"]
+        elif len(display_data) > 100:
+            hurst_value = update_streaming_hurst(session, display_data["Close"].values)
 
         # Interprétation de Hurst
         if hurst_value > 0.5:
@@ -131,40 +235,99 @@ def update_graph_and_hurst(start_clicks, pause_clicks, crypto, interval):
             interpretation = "La série ressemble à une marche aléatoire : pas de tendance claire."
 
         # Créer le graphique
-        figure = {
-            'data': [
-                go.Scatter(
-                    x=display_data["Time"],
-                    y=display_data["Close"],
-                    mode='lines',
-                    name=f'{crypto[:-4]} Close Price'
-                )
-            ],
-            'layout': {
-                'title': f'Prix de {crypto[:-4]} en Temps Réel',
-                'xaxis': {'title': 'Temps'},
-                'yaxis': {'title': 'Prix (USD)'},
+        with span("hurst_analysis.figure", RENDER):
+            # Décimer la partie visible à la largeur du graphique avant l'envoi
+            x_range = x_range_from_relayout(relayout_data)
+            max_points = plot_width or default_plot_width
+            times, closes = decimate(display_data["Time"].values, display_data["Close"].values,
+                                     max_points, x_range=x_range)
+
+            figure = {
+                'data': [
+                    go.Scatter(
+                        x=times,
+                        y=closes,
+                        mode='lines',
+                        name=f'{crypto[:-4]} Close Price'
+                    )
+                ],
+                'layout': {
+                    'title': f'Prix de {crypto[:-4]} en Temps Réel',
+                    'uirevision': crypto,  # Conserver le zoom entre deux rafraîchissements
+                    'xaxis': {'title': 'Temps'},
+                    'yaxis': {'title': 'Prix (USD)'},
+                }
             }
-        }
-        return figure, f"Valeur de H = {hurst_value:.2f}", interpretation
+
+            # Hurst glissant en surimpression, sur un axe secondaire
+            rolling = session["rolling_hurst"].iloc[:len(display_data)]
+            if overlays and 'rolling' in overlays and rolling.notna().any():
+                valid = rolling.notna().values
+                hurst_times, hurst_values = decimate(display_data["Time"].values[valid], rolling.values[valid],
+                                                     max_points, x_range=x_range)
+                figure['data'].append(go.Scatter(
+                    x=hurst_times,
+                    y=hurst_values,
+                    mode='lines',
+                    name=f'Hurst glissant ({rolling_window})',
+                    yaxis='y2',
+                    line={'color': 'orange'}
+                ))
+                figure['layout']['yaxis2'] = {'title': 'H', 'overlaying': 'y', 'side': 'right', 'range': [0, 1]}
+        # Le navigateur n'interroge le serveur que pendant le rejeu
+        return figure, f"Valeur de H = {hurst_value:.2f}", interpretation, not clock.running
 
     except Exception as e:
-        print(f"Erreur dans le callback : {e}")
-        return {}, "Erreur", "Erreur lors du calcul de l'exposant de Hurst"
-
-# Fonction pour simuler l'évolution des données en temps réel
-def update_data():
-    global running, current_index, market_data
-    while True:
-        if running and current_index < len(market_data):
-            time.sleep(0.5)
-            current_index += 1
-        elif running and current_index >= len(market_data):
-            running = False
-
-# Lancer la mise à jour des données en arrière-plan
-Thread(target=update_data, daemon=True).start()
+        instrumentation.record_error("hurst_analysis.update_graph_and_hurst", CALLBACK, e)
+        return {}, "Erreur", "Erreur lors du calcul de l'exposant de Hurst", True
+
+# Carte de chaleur multi-actifs, relue dans la table à chaque rafraîchissement
+@instrumented(CALLBACK)
+def update_hurst_heatmap(n_intervals):
+    return heatmap_figure(hurst_table)
+
+# Application Dash : mise en page, callbacks, table de Hurst en arrière-plan et mesures exposées sur /metrics
+def create_app():
+    import dash
+    from dash.dependencies import Input, Output, State
+
+    app = dash.Dash(__name__)
+    instrumentation.register_metrics_route(app)
+    app.layout = serve_layout
+
+    # Largeur de la fenêtre du navigateur, qui borne le nombre de points envoyés
+    app.clientside_callback(
+        "function(sessionId) { return window.innerWidth; }",
+        Output('plot-width', 'data'),
+        Input('session-id', 'data')
+    )
+    app.callback(
+        [Output('market-plot', 'figure'),
+         Output('hurst-exponent', 'children'),
+         Output('hurst-interpretation', 'children'),
+         Output('replay-interval', 'disabled')],
+        [Input('start-button', 'n_clicks'),
+         Input('pause-button', 'n_clicks'),
+         Input('crypto-dropdown', 'value'),
+         Input('interval-dropdown', 'value'),
+         Input('speed-dropdown', 'value'),
+         Input('replay-interval', 'n_intervals'),
+         Input('market-plot', 'relayoutData'),
+         Input('overlay-options', 'value')],
+        [State('session-id', 'data'),
+         State('plot-width', 'data')]
+    )(update_graph_and_hurst)
+    app.callback(
+        Output('hurst-heatmap', 'figure'),
+        Input('heatmap-interval', 'n_intervals')
+    )(update_hurst_heatmap)
+    hurst_table.start()
+    return app
 
 # Lancer l'application
+def main():
+    instrumentation.configure_from_env(default="time")
+    create_app().run(debug=True)
+
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    main()
@@ -0,0 +1,152 @@
+import math
+
+import numpy as np
+
+from instrumentation import COMPUTE, instrumented
+
+# Estimateurs vectorisés de l'exposant de Hurst
+#
+# Trois méthodes, toutes calculées par remodelage (n_séries, n_blocs, échelle)
+# des incréments, sans boucle sur les blocs ni sur les séries :
+# - 'rs'     : statistique R/S classique (étendue des écarts cumulés / écart-type) ;
+# - 'dfa'    : Detrended Fluctuation Analysis d'ordre 1 sur le profil cumulé ;
+# - 'aggvar' : écart-type des sommes par blocs (variance agrégée).
+# Chaque méthode produit une fluctuation F(s) telle que F(s) ≈ c · s^H, et H
+# est la pente de la régression de log10 F sur log10 s.
+#
+# L'écart-type de la variance agrégée est estimé sur les sommes par blocs :
+# avec 2 à 4 blocs, il est fortement biaisé vers le bas aux grandes
+# échelles, ce qui écrase la pente. Ses échelles sont donc bornées pour
+# garder au moins MIN_BLOCKS['aggvar'] blocs.
+
+METHODS = ("rs", "dfa", "aggvar")
+# Nombre minimal de blocs complets à la plus grande échelle, par méthode
+MIN_BLOCKS = {"rs": 2, "dfa": 2, "aggvar": 10}
+
+
+def default_scales(n, min_scale=10, max_scale=None, min_blocks=2):
+    """Échelles géométriques (pas de 10**0.25), avec au moins `min_blocks` blocs à la plus grande."""
+    max_scale = max_scale or n // min_blocks
+    exponents = np.arange(math.log10(min_scale), math.log10(max_scale) + 1e-9, 0.25)
+    return np.unique((10 ** exponents).astype(int))
+
+
+def to_increments(series, kind="price"):
+    """
+    Convertit une série (ou un panel, temps sur le dernier axe) en incréments.
+    Args:
+        series (array-like): Prix, marche aléatoire ou incréments.
+        kind (str): 'price' (rendements relatifs), 'random_walk' (différences) ou 'change'.
+    Returns:
+        np.ndarray: Incréments en float64.
+    """
+    series = np.asarray(series, dtype=np.float64)
+    if kind == "price":
+        return series[..., 1:] / series[..., :-1] - 1.0
+    if kind == "random_walk":
+        return np.diff(series, axis=-1)
+    if kind == "change":
+        return series
+    raise ValueError(f"Type de série inconnu : {kind}")
+
+
+def _blocks(incs, scale):
+    """Vue (n_séries, n_blocs, échelle) sur les blocs complets."""
+    m = incs.shape[-1] // scale
+    return incs[..., :m * scale].reshape(incs.shape[0], m, scale)
+
+
+def _rs_fluctuation(incs, scale):
+    blocks = _blocks(incs, scale)
+    deviations = blocks - blocks.mean(axis=-1, keepdims=True)
+    profile = np.cumsum(deviations, axis=-1)
+    R = profile.max(axis=-1) - profile.min(axis=-1)
+    S = blocks.std(axis=-1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = np.where((R > 0) & (S > 0), R / S, np.nan)
+    # Les blocs où R/S est indéfini sont ignorés, comme dans compute_Hc
+    valid = np.isfinite(rs)
+    counts = valid.sum(axis=-1)
+    with np.errstate(invalid="ignore"):
+        return np.where(counts > 0, np.where(valid, rs, 0.0).sum(axis=-1) / counts, np.nan)
+
+
+def _dfa_fluctuation(profile, scale):
+    segments = _blocks(profile, scale)
+    t = np.arange(scale, dtype=np.float64)
+    t -= t.mean()
+    centered = segments - segments.mean(axis=-1, keepdims=True)
+    # Tendance linéaire de chaque segment en forme close
+    slope = centered @ t / (t @ t)
+    residual = (centered ** 2).mean(axis=-1) - slope ** 2 * (t @ t) / scale
+    return np.sqrt(np.maximum(residual, 0.0).mean(axis=-1))
+
+
+def _aggvar_fluctuation(incs, scale):
+    sums = _blocks(incs, scale).sum(axis=-1)
+    return sums.std(axis=-1, ddof=1)
+
+
+def _fit_loglog(scales, fluctuations):
+    """Régression log10 F = log10 c + H log10 s, série par série, en ignorant les points non finis."""
+    x = np.log10(scales.astype(np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.log10(fluctuations)
+    w = np.isfinite(y)
+    y = np.where(w, y, 0.0)
+    count = w.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = (w * x).sum(axis=-1) / count
+        y_mean = y.sum(axis=-1) / count
+        dx = np.where(w, x - x_mean[:, None], 0.0)
+        H = (dx * (y - y_mean[:, None])).sum(axis=-1) / (dx ** 2).sum(axis=-1)
+    intercept = y_mean - H * x_mean
+    return np.where(count >= 2, H, np.nan), np.where(count >= 2, intercept, np.nan)
+
+
+@instrumented(COMPUTE)
+def estimate_hurst(series, method="rs", kind="price", min_scale=10, max_scale=None, scales=None):
+    """
+    Estime l'exposant de Hurst d'une série ou d'un panel de séries.
+    Args:
+        series (array-like): Série 1D ou tableau 2D (séries x temps).
+        method (str): 'rs', 'dfa' ou 'aggvar'.
+        kind (str): 'price', 'random_walk' ou 'change' (voir to_increments).
+        min_scale (int): Plus petite échelle.
+        max_scale (int): Plus grande échelle (moitié de la longueur par défaut, dixième pour 'aggvar').
+        scales (array-like): Échelles explicites, à la place de min_scale/max_scale ; les
+            échelles laissant moins de MIN_BLOCKS[method] blocs sont écartées.
+    Returns:
+        tuple: (H, c, scales, fluctuations) avec F(s) ≈ c · s^H ; H et c sont
+        des scalaires pour une série 1D, des tableaux (n_séries,) sinon, et
+        fluctuations a la forme (n_séries, n_échelles) ou (n_échelles,).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method} (choisir parmi {METHODS})")
+    values = np.asarray(series, dtype=np.float64)
+    single = values.ndim == 1
+    values = np.atleast_2d(values)
+
+    incs = to_increments(values, kind)
+    n = incs.shape[-1]
+    min_blocks = MIN_BLOCKS[method]
+    if scales is None:
+        scales = default_scales(n, min_scale, max_scale, min_blocks)
+    scales = np.asarray(scales, dtype=int)
+    scales = scales[(scales >= 4) & (scales <= n // min_blocks)]
+    if len(scales) < 2:
+        raise ValueError(f"Série trop courte ({n} incréments) pour estimer l'exposant de Hurst.")
+
+    if method == "rs":
+        fluctuations = np.stack([_rs_fluctuation(incs, s) for s in scales], axis=-1)
+    elif method == "dfa":
+        profile = np.cumsum(incs - incs.mean(axis=-1, keepdims=True), axis=-1)
+        fluctuations = np.stack([_dfa_fluctuation(profile, s) for s in scales], axis=-1)
+    else:
+        fluctuations = np.stack([_aggvar_fluctuation(incs, s) for s in scales], axis=-1)
+
+    H, intercept = _fit_loglog(scales, fluctuations)
+    c = 10 ** intercept
+    if single:
+        return float(H[0]), float(c[0]), scales, fluctuations[0]
+    return H, c, scales, fluctuations
@@ -0,0 +1,268 @@
+import math
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from hurst_estimators import estimate_hurst
+from instrumentation import FETCH, RENDER, instrumented, record_error
+from timeframes import MultiTimeframe
+
+# Table précalculée de l'exposant de Hurst, par (symbole, intervalle)
+#
+# Un thread de fond rafraîchit toutes les paires ensemble, toutes les
+# `refresh` secondes, par un seul appel concurrent au client Binance :
+# - une requête par symbole : seules les klines de base (1m) sont
+#   demandées, les autres intervalles en sont déduits localement
+#   (timeframes.MultiTimeframe), donc cohérents entre eux ; l'historique
+#   natif de chaque intervalle n'est demandé qu'au premier chargement ;
+# - rafraîchissement incrémental : pour un symbole déjà chargé, on ne
+#   demande que les klines à partir de la dernière connue (toujours ouverte,
+#   donc redemandée) ; après une interruption plus longue que la page,
+#   le symbole est rechargé entièrement ;
+# - Hurst recalculé uniquement pour les paires dont les prix ont changé,
+#   en un appel vectorisé d'estimate_hurst par longueur de série ;
+# - chaque entrée est remplacée d'un bloc : une lecture est une simple
+#   recherche dans un dictionnaire, sans attendre le réseau ni le calcul.
+# En cas d'échec d'une paire, sa dernière version reste servie, avec
+# l'erreur dans l'entrée ; l'échec est signalé par un RuntimeWarning et
+# compté dans les mesures (instrumentation.record_error).
+# hurst_frame() rassemble les valeurs en tableau symboles x intervalles
+# pour la carte de chaleur multi-actifs (heatmap_figure).
+
+
+def klines_frame(klines):
+    """Klines (tableau structuré de binance_client) -> DataFrame 'Time' (clôture), 'Close'."""
+    return pd.DataFrame({
+        "Time": pd.to_datetime(klines["close_time"], unit='ms'),
+        "Close": klines["close"],
+    })
+
+
+def _fetch_many(queries):
+    from binance_client import fetch_many_sync
+    return fetch_many_sync(queries)
+
+
+class HurstTable:
+    """
+    Séries de prix et exposants de Hurst de toutes les paires (symbole, intervalle), tenus à jour.
+    Args:
+        symbols (list): Symboles (ex: 'BTCUSDT').
+        intervals (list): Intervalles (ex: '1m'), multiples de `base_interval`.
+        limit (int): Nombre de klines conservées par paire.
+        base_interval (str): Unité des klines demandées à chaque rafraîchissement.
+        refresh (float): Délai entre deux rafraîchissements, en secondes.
+        method (str): Estimateur de Hurst ('rs', 'dfa' ou 'aggvar').
+        fetch_many (callable): fetch_many(requêtes) -> résultats ou exceptions, dans l'ordre
+            (binance_client.fetch_many_sync par défaut).
+        timer (callable): Horloge des dates de mise à jour.
+    """
+
+    def __init__(self, symbols, intervals, limit=500, base_interval="1m", refresh=30.0, method="rs",
+                 fetch_many=None, timer=time.time):
+        self.symbols = list(symbols)
+        self.intervals = list(intervals)
+        self.limit = limit
+        self.base_interval = base_interval
+        # Klines de base par page ; la construction vérifie aussi que les intervalles en sont des multiples
+        self._base_limit = MultiTimeframe(self.intervals, base_interval, limit).base_limit
+        self.refresh = refresh
+        self.method = method
+        self._fetch_many = fetch_many or _fetch_many
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._frames = {}   # symbole -> MultiTimeframe ; utilisés par le seul rafraîchissement
+        self._klines = {}   # (symbole, intervalle) -> klines de la dernière version servie
+        self._entries = {}  # (symbole, intervalle) -> entrée servie (dictionnaire en lecture seule)
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+
+    def keys(self):
+        return [(symbol, interval) for symbol in self.symbols for interval in self.intervals]
+
+    # Lecture
+    def get(self, symbol, interval):
+        """
+        Entrée d'une paire, ou None si elle n'a pas encore été chargée.
+        Returns:
+            dict: 'data' (DataFrame 'Time', 'Close'), 'hurst', 'updated_at', 'version' et
+            'error' (dernier échec, None si le dernier rafraîchissement a réussi). À ne pas modifier.
+        """
+        return self._entries.get((symbol, interval))
+
+    def hurst_frame(self):
+        """Exposants de Hurst en DataFrame (symboles en lignes, intervalles en colonnes ; NaN si absent)."""
+        entries = self._entries
+        values = [[entries[(s, i)]["hurst"] if (s, i) in entries else np.nan for i in self.intervals]
+                  for s in self.symbols]
+        return pd.DataFrame(values, index=self.symbols, columns=self.intervals, dtype=float)
+
+    def wait_ready(self, timeout=None):
+        """Attend la fin du premier rafraîchissement ; renvoie False à l'expiration du délai."""
+        return self._ready.wait(timeout)
+
+    # Rafraîchissement
+    @instrumented(FETCH)
+    def refresh_once(self):
+        """
+        Met à jour toutes les paires (klines de base nouvelles seulement, Hurst des paires modifiées).
+        Returns:
+            int: Nombre de paires dont les prix ont changé.
+        """
+        with self._refresh_lock:
+            results = self._fetch({symbol: self._queries(symbol) for symbol in self.symbols})
+
+            # Interruption plus longue qu'une page : la page est pleine, on recharge le symbole
+            gaps = [symbol for symbol, fetched in results.items()
+                    if symbol in self._frames and not isinstance(fetched[self.base_interval], Exception)
+                    and len(fetched[self.base_interval]) >= self._base_limit]
+            for symbol in gaps:
+                del self._frames[symbol]
+            if gaps:
+                results.update(self._fetch({symbol: self._queries(symbol) for symbol in gaps}))
+
+            errors = {}
+            for symbol, fetched in results.items():
+                error = next((r for r in fetched.values() if isinstance(r, Exception)), None)
+                if error is not None:
+                    warnings.warn(f"Échec du rafraîchissement de {symbol}, dernière version servie : {error!r}",
+                                  RuntimeWarning)
+                    record_error("hurst_table.HurstTable.refresh_once", FETCH, error)
+                    errors.update(((symbol, interval), error) for interval in self.intervals)
+                    continue
+                frames = self._frames.get(symbol)
+                if frames is None:
+                    frames = MultiTimeframe(self.intervals, self.base_interval, self.limit)
+                    for interval, klines in fetched.items():
+                        if interval != self.base_interval:
+                            frames.seed(interval, klines)
+                    self._frames[symbol] = frames
+                frames.update(fetched[self.base_interval])
+
+            keys = self.keys()
+            changed = {}
+            for key in keys:
+                frames = self._frames.get(key[0])
+                if frames is None or key in errors:
+                    continue
+                old, klines = self._klines.get(key), frames.klines(key[1])
+                if klines is None or klines is old:
+                    continue
+                self._klines[key] = klines
+                if (old is None or len(klines) != len(old)
+                        or not np.array_equal(klines["open_time"], old["open_time"])
+                        or not np.array_equal(klines["close"], old["close"])):
+                    changed[key] = klines
+
+            hurst = self._hurst({key: klines["close"] for key, klines in changed.items()})
+            now = self._timer()
+            with self._lock:
+                entries = dict(self._entries)
+                for key, klines in changed.items():
+                    previous = entries.get(key)
+                    entries[key] = {"data": klines_frame(klines), "hurst": hurst[key], "updated_at": now,
+                                    "version": previous["version"] + 1 if previous else 1, "error": None}
+                for key in keys:
+                    if key in errors and key in entries:
+                        entries[key] = {**entries[key], "error": errors[key]}
+                    elif key not in changed and key in entries and entries[key]["error"] is not None:
+                        entries[key] = {**entries[key], "error": None, "updated_at": now}
+                self._entries = entries
+                self.refreshes += 1
+        self._ready.set()
+        return len(changed)
+
+    def _queries(self, symbol):
+        """Requêtes d'un symbole : klines de base depuis la dernière reçue, ou chargement complet."""
+        frames = self._frames.get(symbol)
+        if frames is not None and frames.last_open_time() is not None:
+            return {self.base_interval: {"symbol": symbol, "interval": self.base_interval,
+                                         "start_time": frames.last_open_time(), "limit": self._base_limit}}
+        queries = {self.base_interval: {"symbol": symbol, "interval": self.base_interval, "limit": self._base_limit}}
+        for interval in self.intervals:
+            if interval != self.base_interval:
+                queries[interval] = {"symbol": symbol, "interval": interval, "limit": self.limit}
+        return queries
+
+    def _fetch(self, queries):
+        """{symbole: {intervalle: requête}} -> {symbole: {intervalle: klines ou exception}}, en un appel."""
+        flat = [(symbol, interval, query) for symbol, by_interval in queries.items()
+                for interval, query in by_interval.items()]
+        results = self._fetch_many([query for _, _, query in flat])
+        fetched = {}
+        for (symbol, interval, _), result in zip(flat, results):
+            fetched.setdefault(symbol, {})[interval] = result
+        return fetched
+
+    def _hurst(self, closes):
+        """Hurst de chaque série, en un appel vectorisé par longueur."""
+        by_length = {}
+        for key, values in closes.items():
+            by_length.setdefault(len(values), []).append(key)
+        hurst = {}
+        for keys in by_length.values():
+            try:
+                H = estimate_hurst(np.stack([closes[key] for key in keys]), method=self.method, kind='price')[0]
+            except ValueError:
+                H = [math.nan] * len(keys)  # Séries trop courtes
+            hurst.update((key, float(h)) for key, h in zip(keys, H))
+        return hurst
+
+    # Thread de fond
+    def start(self):
+        """Lance le thread de rafraîchissement (sans effet s'il tourne déjà)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="hurst-table", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Arrête le thread de rafraîchissement après le rafraîchissement en cours."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                # Déjà comptée comme erreur par la mesure de refresh_once
+                warnings.warn(f"Erreur lors du rafraîchissement de la table de Hurst : {e!r}", RuntimeWarning)
+            self._stop.wait(self.refresh)
+
+
+@instrumented(RENDER)
+def heatmap_figure(table):
+    """Carte de chaleur de l'exposant de Hurst (symboles x intervalles), centrée sur 0.5."""
+    import plotly.graph_objs as go
+
+    frame = table.hurst_frame()
+    text = [[f"{h:.2f}" if np.isfinite(h) else "" for h in row] for row in frame.values]
+    return go.Figure(
+        data=[go.Heatmap(
+            z=frame.values,
+            x=list(frame.columns),
+            y=[symbol[:-4] if symbol.endswith("USDT") else symbol for symbol in frame.index],
+            text=text,
+            texttemplate="%{text}",
+            colorscale="RdBu_r",
+            zmin=0, zmax=1, zmid=0.5,
+            colorbar={'title': 'H'},
+        )],
+        layout={
+            'title': "Exposant de Hurst par paire et par intervalle",
+            'xaxis': {'title': 'Intervalle'},
+            'yaxis': {'autorange': 'reversed'},
+        },
+    )
@@ -0,0 +1,353 @@
+import bisect
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Mesures par étape (récupération, calcul, rendu) : latence et pic de mémoire
+#
+# Une mesure (« span ») entoure un bloc de code, par un gestionnaire de
+# contexte (`with span(...)`) ou un décorateur (`@instrumented(...)`). Pour
+# chaque nom, on tient un histogramme cumulatif des durées (seaux fixes,
+# comme Prometheus), le nombre d'appels et d'exceptions, et, si le suivi de
+# mémoire est activé, le pic d'allocation (tracemalloc) au-dessus du niveau
+# d'entrée. Les mesures imbriquées remontent leur pic aux mesures parentes
+# de la même pile (une par contexte : thread ou tâche asyncio). Le pic de
+# tracemalloc est global et remis à zéro à l'entrée de chaque mesure : une
+# mesure ouverte en même temps dans un autre thread ou une autre tâche perd
+# alors le pic atteint avant cette remise à zéro. Sous concurrence, les
+# pics ne sont donc qu'indicatifs ; ils sont exacts pour du code séquentiel.
+#
+# Désactivées, les mesures se réduisent à un test de drapeau : le
+# décorateur appelle directement la fonction et `span` renvoie un contexte
+# vide partagé. Activation : variable d'environnement INSTRUMENTATION
+# ('time' ou '1' pour les durées, 'memory' pour les durées et la mémoire,
+# 'off' ou '0' sinon), ou enable() / disable().
+
+FETCH = "fetch"
+COMPUTE = "compute"
+RENDER = "render"
+CALLBACK = "callback"
+
+# Bornes supérieures des seaux de durée, en secondes (le dernier seau, +Inf, est implicite)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Settings:
+    enabled = False
+    memory = False
+    owns_tracemalloc = False  # tracemalloc démarré par enable(), donc à arrêter ici
+
+
+_settings = _Settings()
+_lock = threading.Lock()
+_metrics = {}  # nom -> _SpanMetrics
+_stack = contextvars.ContextVar("instrumentation_stack", default=())
+
+
+class _SpanMetrics:
+    def __init__(self, name, stage):
+        self.name = name
+        self.stage = stage
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.peak_bytes = 0
+        self.last_peak_bytes = 0
+        self.last_error = None
+
+    def observe(self, elapsed, failed, peak):
+        self.buckets[bisect.bisect_left(BUCKETS, elapsed)] += 1
+        self.count += 1
+        self.errors += failed
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        if peak is not None:
+            self.peak_bytes = max(self.peak_bytes, peak)
+            self.last_peak_bytes = peak
+
+    def quantile(self, q):
+        """Borne supérieure du seau contenant le quantile q (None si aucune observation)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max
+
+
+class _Frame:
+    """Niveau de mémoire à l'entrée d'une mesure et pic observé depuis."""
+    __slots__ = ("baseline", "peak")
+
+    def __init__(self, baseline):
+        self.baseline = baseline
+        self.peak = baseline
+
+
+class _Span:
+    __slots__ = ("name", "stage", "started", "frame", "parents", "token")
+
+    def __init__(self, name, stage):
+        self.name = name
+        self.stage = stage
+
+    def __enter__(self):
+        self.frame = None
+        if _settings.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # Le pic est remis à zéro pour cette mesure : les parentes (même pile) retiennent d'abord
+            # le leur ; les mesures ouvertes dans d'autres threads ou tâches le perdent
+            self.parents = _stack.get()
+            for frame in self.parents:
+                frame.peak = max(frame.peak, peak)
+            tracemalloc.reset_peak()
+            self.frame = _Frame(current)
+            self.token = _stack.set(self.parents + (self.frame,))
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        peak = None
+        if self.frame is not None:
+            if tracemalloc.is_tracing():
+                _, absolute = tracemalloc.get_traced_memory()
+                absolute = max(self.frame.peak, absolute)
+                peak = absolute - self.frame.baseline
+                for frame in self.parents:
+                    frame.peak = max(frame.peak, absolute)
+            _stack.reset(self.token)
+        _observe(self.name, self.stage, elapsed, exc_type is not None, peak)
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _observe(name, stage, elapsed, failed, peak):
+    with _lock:
+        metrics = _metrics.get(name)
+        if metrics is None:
+            metrics = _metrics[name] = _SpanMetrics(name, stage)
+        metrics.observe(elapsed, failed, peak)
+
+
+def span(name, stage=COMPUTE):
+    """
+    Mesure le bloc `with` sous le nom donné.
+    Args:
+        name (str): Nom de la mesure (ex: 'hurst_analysis.figure').
+        stage (str): Étape : FETCH, COMPUTE, RENDER ou CALLBACK.
+    """
+    if not _settings.enabled:
+        return _NULL_SPAN
+    return _Span(name, stage)
+
+
+def instrumented(stage=COMPUTE, name=None):
+    """
+    Décorateur : mesure chaque appel de la fonction (synchrone ou coroutine).
+    Args:
+        stage (str): Étape : FETCH, COMPUTE, RENDER ou CALLBACK.
+        name (str): Nom de la mesure ; '<module>.<fonction>' par défaut.
+    """
+    def decorate(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _settings.enabled:
+                    return await func(*args, **kwargs)
+                with _Span(label, stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _settings.enabled:
+                return func(*args, **kwargs)
+            with _Span(label, stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record_error(name, stage=CALLBACK, error=None):
+    """
+    Compte une exception rattrapée par l'appelant (qui ne traverse donc aucune mesure).
+    Args:
+        name (str): Nom de la mesure.
+        stage (str): Étape : FETCH, COMPUTE, RENDER ou CALLBACK.
+        error (BaseException): Exception rattrapée ; son texte est gardé ('last_error' du JSON).
+    """
+    if _settings.enabled:
+        with _lock:
+            metrics = _metrics.get(name)
+            if metrics is None:
+                metrics = _metrics[name] = _SpanMetrics(name, stage)
+            metrics.errors += 1
+            if error is not None:
+                metrics.last_error = repr(error)
+
+
+def _track_memory(memory):
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _settings.owns_tracemalloc = True
+    elif not memory and _settings.owns_tracemalloc:
+        tracemalloc.stop()
+        _settings.owns_tracemalloc = False
+    _settings.memory = memory
+
+
+def enable(memory=False):
+    """Active les mesures ; `memory` démarre aussi tracemalloc (coûteux : à réserver au diagnostic)."""
+    _track_memory(memory)
+    _settings.enabled = True
+
+
+def disable():
+    """Désactive les mesures (les résultats déjà collectés sont conservés)."""
+    _settings.enabled = False
+    _track_memory(False)
+
+
+def is_enabled():
+    return _settings.enabled
+
+
+def configure_from_env(default="off"):
+    """Active ou non les mesures selon INSTRUMENTATION (ou `default` si la variable est absente)."""
+    mode = os.environ.get("INSTRUMENTATION", default).strip().lower()
+    if mode in ("memory", "mem"):
+        enable(memory=True)
+    elif mode in ("1", "on", "time", "true"):
+        enable(memory=False)
+    else:
+        disable()
+
+
+def reset():
+    """Efface les résultats collectés."""
+    with _lock:
+        _metrics.clear()
+
+
+def snapshot():
+    """
+    Résultats courants, une entrée par mesure.
+    Returns:
+        dict: 'enabled', 'memory' et 'spans' (liste triée par étape puis nom) ;
+        p50/p95 sont les bornes des seaux contenant ces quantiles, 'last_error' le
+        texte de la dernière exception passée à record_error.
+    """
+    with _lock:
+        spans = [{
+            "name": m.name,
+            "stage": m.stage,
+            "count": m.count,
+            "errors": m.errors,
+            "sum_seconds": m.total,
+            "mean_seconds": m.total / m.count if m.count else None,
+            "max_seconds": m.max,
+            "p50_seconds": m.quantile(0.5),
+            "p95_seconds": m.quantile(0.95),
+            "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], _cumulative(m.buckets))),
+            "peak_bytes_max": m.peak_bytes if _settings.memory or m.peak_bytes else None,
+            "peak_bytes_last": m.last_peak_bytes if _settings.memory or m.peak_bytes else None,
+            "last_error": m.last_error,
+        } for m in _metrics.values()]
+    spans.sort(key=lambda s: (s["stage"], s["name"]))
+    return {"enabled": _settings.enabled, "memory": _settings.memory, "spans": spans}
+
+
+def _cumulative(counts):
+    total, out = 0, []
+    for count in counts:
+        total += count
+        out.append(total)
+    return out
+
+
+def to_json(indent=None):
+    """Résultats au format JSON."""
+    return json.dumps(snapshot(), indent=indent)
+
+
+def format_summary():
+    """Tableau texte des mesures (pour les scripts, en fin d'exécution)."""
+    lines = [f"{'étape':<9} {'mesure':<55} {'appels':>7} {'erreurs':>7} {'total (s)':>10} "
+             f"{'moyenne (ms)':>12} {'max (ms)':>10} {'pic (Mio)':>10}"]
+    for s in snapshot()["spans"]:
+        mean = f"{s['mean_seconds'] * 1e3:12.2f}" if s["count"] else f"{'-':>12}"
+        peak = f"{s['peak_bytes_max'] / 2**20:10.1f}" if s["peak_bytes_max"] is not None else f"{'-':>10}"
+        lines.append(f"{s['stage']:<9} {s['name']:<55} {s['count']:>7} {s['errors']:>7} "
+                     f"{s['sum_seconds']:10.3f} {mean} {s['max_seconds'] * 1e3:10.2f} {peak}")
+    return "\n".join(lines)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus():
+    """Résultats au format texte d'exposition Prometheus."""
+    lines = [
+        "# HELP span_duration_seconds Durée des étapes instrumentées.",
+        "# TYPE span_duration_seconds histogram",
+    ]
+    data = snapshot()
+    for s in data["spans"]:
+        labels = f'span="{_escape(s["name"])}",stage="{_escape(s["stage"])}"'
+        for bound, count in s["buckets"].items():
+            lines.append(f'span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f"span_duration_seconds_sum{{{labels}}} {s['sum_seconds']!r}")
+        lines.append(f"span_duration_seconds_count{{{labels}}} {s['count']}")
+    lines += ["# HELP span_errors_total Exceptions levées ou rattrapées dans les étapes instrumentées.",
+              "# TYPE span_errors_total counter"]
+    for s in data["spans"]:
+        lines.append(f'span_errors_total{{span="{_escape(s["name"])}",stage="{_escape(s["stage"])}"}} {s["errors"]}')
+    peaks = [s for s in data["spans"] if s["peak_bytes_max"] is not None]
+    if peaks:
+        lines += ["# HELP span_peak_bytes Pic d'allocation au-dessus du niveau d'entrée (maximum observé).",
+                  "# TYPE span_peak_bytes gauge"]
+        for s in peaks:
+            lines.append(f'span_peak_bytes{{span="{_escape(s["name"])}",stage="{_escape(s["stage"])}"}} '
+                         f'{s["peak_bytes_max"]}')
+    return "\n".join(lines) + "\n"
+
+
+def register_metrics_route(app, path="/metrics"):
+    """
+    Expose les résultats sur le serveur Flask d'une application Dash :
+    texte Prometheus par défaut, JSON avec ?format=json.
+    """
+    from flask import Response, request
+
+    def metrics():
+        if request.args.get("format") == "json":
+            return Response(to_json(), mimetype="application/json")
+        return Response(to_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    app.server.add_url_rule(path, "instrumentation_metrics", metrics)
+
+
+configure_from_env()
@@ -0,0 +1,68 @@
+import argparse
+import bisect
+import json
+import os
+
+from aiohttp import web
+
+# Serveur HTTP local qui rejoue des klines enregistrées
+#
+# Imite GET /api/v3/klines de Binance (symbol, interval, startTime, endTime,
+# limit) à partir de fichiers '<SYMBOL>_<interval>.json' contenant la liste
+# brute des klines. Permet de tester binance_client et les dashboards sans
+# réseau : BINANCE_API_URL=http://127.0.0.1:8080 python hurst_analysis.py
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 1000
+
+
+def load_recordings(directory):
+    """Charge tous les fichiers enregistrés, indexés par (symbole, intervalle)."""
+    recordings = {}
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        symbol, interval = name[:-5].rsplit("_", 1)
+        with open(os.path.join(directory, name)) as f:
+            rows = sorted(json.load(f), key=lambda row: row[0])
+        recordings[(symbol, interval)] = ([row[0] for row in rows], rows)
+    return recordings
+
+
+def select_klines(open_times, rows, start_time=None, end_time=None, limit=DEFAULT_LIMIT):
+    """Applique les règles de sélection de l'API Binance à une liste triée de klines."""
+    lo = bisect.bisect_left(open_times, start_time) if start_time is not None else 0
+    hi = bisect.bisect_right(open_times, end_time) if end_time is not None else len(rows)
+    if start_time is not None:
+        return rows[lo:min(hi, lo + limit)]
+    return rows[max(lo, hi - limit):hi]
+
+
+def make_app(recordings):
+    async def klines(request):
+        query = request.query
+        key = (query.get("symbol"), query.get("interval"))
+        if key not in recordings:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400)
+        limit = min(int(query.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+        start_time = int(query["startTime"]) if "startTime" in query else None
+        end_time = int(query["endTime"]) if "endTime" in query else None
+        open_times, rows = recordings[key]
+        return web.json_response(select_klines(open_times, rows, start_time, end_time, limit))
+
+    app = web.Application()
+    app.router.add_get("/api/v3/klines", klines)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejoue des klines Binance enregistrées.")
+    parser.add_argument("directory", help="Répertoire des fichiers <SYMBOL>_<interval>.json.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    web.run_app(make_app(load_recordings(args.directory)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import threading
+import time
+
+# Données de marché partagées entre les sessions d'un tableau de bord
+#
+# Une entrée par clé (symbole, intervalle) :
+# - regroupement des requêtes : une seule récupération en cours par clé,
+#   les sessions qui la demandent en même temps attendent son résultat ;
+# - rafraîchissement après `ttl` secondes, à la demande suivante : la
+#   version expirée est servie aussitôt à tous pendant qu'un seul thread
+#   de fond la rafraîchit (seul le tout premier chargement d'une clé fait
+#   attendre) ; si la source échoue, la dernière version connue reste servie ;
+# - comptage des références : chaque session regarde au plus une clé, et une
+#   entrée que plus aucune session ne regarde est supprimée ;
+# - valeurs dérivées (indicateurs calculés à partir des données) mises en
+#   cache par version des données, donc calculées une fois pour tous.
+# Les données servies sont partagées : les sessions ne doivent pas les modifier.
+
+
+class _Entry:
+    def __init__(self):
+        self.data = None
+        self.fetched_at = None
+        self.version = 0
+        self.error = None
+        self.loading = None  # threading.Event de la récupération en cours
+        self.sessions = set()
+        self.derived = {}
+        self.derived_lock = threading.Lock()
+
+
+class MarketDataHub:
+    """
+    Cache partagé de données de marché, par clé.
+    Args:
+        fetch (callable): fetch(clé) -> données ; lève une exception en cas d'échec.
+        ttl (float): Durée de validité des données, en secondes.
+        session_timeout (float): Une session inactive depuis plus longtemps libère sa clé.
+        timer (callable): Source de temps monotone.
+    """
+
+    def __init__(self, fetch, ttl=30.0, session_timeout=3600.0, timer=time.monotonic):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.session_timeout = session_timeout
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._session_keys = {}
+        self._last_seen = {}
+        self.fetches = 0  # Nombre d'appels à la source
+
+    def acquire(self, session_id, key):
+        """
+        Rattache la session à `key` (et la détache de sa clé précédente) puis
+        renvoie les données, récupérées ou rafraîchies si nécessaire.
+        """
+        with self._lock:
+            self._expire_sessions()
+            self._last_seen[session_id] = self._timer()
+            previous = self._session_keys.get(session_id)
+            if previous != key:
+                if previous is not None:
+                    self._detach(session_id, previous)
+                self._session_keys[session_id] = key
+            entry = self._entries.setdefault(key, _Entry())
+            entry.sessions.add(session_id)
+        return self._load(key, entry)
+
+    def _load(self, key, entry):
+        with self._lock:
+            now = self._timer()
+            if entry.data is not None and now - entry.fetched_at < self.ttl:
+                return entry.data
+            leader = entry.loading is None
+            if leader:
+                entry.loading = threading.Event()
+                self.fetches += 1
+            loading = entry.loading
+            stale = entry.data
+
+        if stale is not None:
+            # Version expirée servie sans attendre ; le meneur lance le rafraîchissement en arrière-plan
+            if leader:
+                threading.Thread(target=self._refresh, args=(key, entry, loading),
+                                 name="market-data-refresh", daemon=True).start()
+            return stale
+        if leader:
+            self._refresh(key, entry, loading)
+        else:
+            loading.wait()
+
+        with self._lock:
+            if entry.data is not None:
+                return entry.data
+            raise entry.error
+
+    def _refresh(self, key, entry, loading):
+        data, error = None, None
+        try:
+            data = self._fetch(key)
+        except Exception as e:
+            error = e
+        with self._lock:
+            if error is None:
+                entry.data = data
+                entry.fetched_at = self._timer()
+                entry.version += 1
+                entry.derived = {}
+            else:
+                print(f"Échec de la récupération de {key} : {error!r}"
+                      + (" ; données précédentes conservées" if entry.data is not None else ""))
+            entry.error = error
+            entry.loading = None
+            if not entry.sessions and self._entries.get(key) is entry:
+                del self._entries[key]
+        loading.set()
+
+    def derived(self, key, name, compute):
+        """
+        Valeur calculée à partir des données de `key`, une fois par version des données.
+        Args:
+            key: Clé acquise par la session appelante ; si l'entrée a été libérée entre-temps
+                (session expirée, autre thread), les données sont rechargées.
+            name (str): Nom de la valeur dérivée.
+            compute (callable): compute(données) -> valeur.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+        if entry.data is None:
+            self._load(key, entry)
+        with self._lock:
+            data, version = entry.data, entry.version
+        with entry.derived_lock:
+            cached = entry.derived.get(name)
+            if cached is None or cached[0] != version:
+                cached = (version, compute(data))
+                entry.derived[name] = cached
+            return cached[1]
+
+    def touch(self, session_id):
+        """Signale que la session est toujours active."""
+        with self._lock:
+            if session_id in self._session_keys:
+                self._last_seen[session_id] = self._timer()
+
+    def release(self, session_id):
+        """Détache une session (fermeture d'onglet, déconnexion)."""
+        with self._lock:
+            key = self._session_keys.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+            if key is not None:
+                self._detach(session_id, key)
+
+    def _detach(self, session_id, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.sessions.discard(session_id)
+        # Une récupération en cours termine normalement puis supprime l'entrée si elle est toujours orpheline
+        if not entry.sessions and entry.loading is None:
+            del self._entries[key]
+
+    def _expire_sessions(self):
+        limit = self._timer() - self.session_timeout
+        for session_id in [s for s, seen in self._last_seen.items() if seen < limit]:
+            del self._last_seen[session_id]
+            self._detach(session_id, self._session_keys.pop(session_id))
+
+    def stats(self):
+        """Clés en cache avec leur nombre de sessions, et nombre total de récupérations."""
+        with self._lock:
+            return {"entries": {key: len(entry.sessions) for key, entry in self._entries.items()},
+                    "fetches": self.fetches}
@@ -1,53 +1,97 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
+import data_cache
+import reporting
+from feature_graph import FeatureGraph
+import instrumentation
+from instrumentation import COMPUTE, FETCH, RENDER, instrumented, span
 
 # Fonction pour récupérer les données
+@instrumented(FETCH)
 def fetch_data(ticker, start_date, end_date):
-    data = yf.download(ticker, start=start_date, end=end_date)
+    data = data_cache.download(ticker, start=start_date, end=end_date)
     return data['Close']
 
 # Calcul de l'effet Momentum
-def calculate_momentum(data, window):
-    momentum = data.diff(window)
-    return momentum
+@instrumented(COMPUTE)
+def calculate_momentum(data, window, graph=None):
+    graph = graph or FeatureGraph(data)
+    return graph.get("momentum", window)
 
 # Calcul du retour à la moyenne
-def calculate_mean_reversion(data, window):
-    rolling_mean = data.rolling(window).mean()
-    deviation = data - rolling_mean
-    return deviation
+@instrumented(COMPUTE)
+def calculate_mean_reversion(data, window, graph=None):
+    graph = graph or FeatureGraph(data)
+    return graph.get("mean_reversion", window)
+
+# Matrice de caractéristiques pour la prédiction des rendements futurs
+@instrumented(COMPUTE)
+def build_features(data, momentum_windows, mean_reversion_windows, graph=None):
+    """
+    Momentum et retour à la moyenne sur plusieurs fenêtres, rapportés au prix
+    pour être comparables d'un ticker à l'autre.
+    Args:
+        data (pd.Series): Prix de clôture.
+        momentum_windows (list): Fenêtres du momentum.
+        mean_reversion_windows (list): Fenêtres de la moyenne mobile.
+        graph (FeatureGraph): Graphe partagé (créé si absent).
+    Returns:
+        pd.DataFrame: Une colonne par caractéristique, indexée comme `data`.
+    """
+    graph = graph or FeatureGraph(data)
+    features = {f"momentum_{w}": calculate_momentum(data, w, graph) / data for w in momentum_windows}
+    features.update({f"mean_reversion_{w}": calculate_mean_reversion(data, w, graph) / data
+                     for w in mean_reversion_windows})
+    return pd.DataFrame(features, index=data.index)
 
 # Analyse et visualisation
-def analyze_stock(ticker, start_date, end_date, momentum_window, mean_reversion_window):
+def analyze_stock(ticker, start_date, end_date, momentum_window, mean_reversion_window, output=None):
     # Récupérer les données
     data = fetch_data(ticker, start_date, end_date)
+    return plot_momentum_analysis(data, ticker, momentum_window, mean_reversion_window, output)
 
-    # Calculer Momentum et Retour à la moyenne
-    momentum = calculate_momentum(data, momentum_window)
-    mean_reversion = calculate_mean_reversion(data, mean_reversion_window)
+# Prix, moyenne mobile et signe du momentum sur un même graphique
+def plot_momentum_analysis(data, ticker, momentum_window, mean_reversion_window, output=None):
+    """
+    Args:
+        data (pd.Series): Prix de clôture.
+        ticker (str): Symbole de l'actif.
+        momentum_window (int): Fenêtre du momentum.
+        mean_reversion_window (int): Fenêtre de la moyenne mobile.
+        output (str): Fichier .png ou .svg ; None pour afficher la figure.
+    """
+    # Calculer Momentum et Retour à la moyenne (intermédiaires partagés via le graphe)
+    graph = FeatureGraph(data)
+    momentum = calculate_momentum(data, momentum_window, graph)
+    mean_reversion = calculate_mean_reversion(data, mean_reversion_window, graph)
 
     # Visualiser les résultats
-    plt.figure(figsize=(14, 8))
-    plt.plot(data, label="Prix de clôture", linewidth=2)
-    plt.plot(data.rolling(mean_reversion_window).mean(), label=f"Moyenne mobile ({mean_reversion_window} jours)", linestyle='--')
-    plt.scatter(data.index, data[momentum > 0], color='green', label="Momentum positif", alpha=0.6)
-    plt.scatter(data.index, data[momentum < 0], color='red', label="Momentum négatif", alpha=0.6)
-    plt.title(f"Analyse de {ticker}: Momentum et Retour à la Moyenne")
-    plt.xlabel("Date")
-    plt.ylabel("Prix")
-    plt.legend()
-    plt.grid()
-    plt.show()
-
-# Paramètres
-ticker = "AAPL"  # Exemple : action Apple
-start_date = "2020-01-01"
-end_date = "2023-01-01"
-momentum_window = 5  # Nombre de jours pour calculer le momentum
-mean_reversion_window = 20  # Fenêtre pour la moyenne mobile
-
-# Lancer l'analyse
-analyze_stock(ticker, start_date, end_date, momentum_window, mean_reversion_window)
+    with span("quanta.plot_momentum_analysis.figure", RENDER):
+        fig, ax = reporting.figure((14, 8), output)
+        ax.plot(data, label="Prix de clôture", linewidth=2)
+        ax.plot(graph.get("rolling_mean", mean_reversion_window), label=f"Moyenne mobile ({mean_reversion_window} jours)", linestyle='--')
+        ax.scatter(data.index, data.where(momentum > 0), color='green', label="Momentum positif", alpha=0.6)
+        ax.scatter(data.index, data.where(momentum < 0), color='red', label="Momentum négatif", alpha=0.6)
+        ax.set_title(f"Analyse de {ticker}: Momentum et Retour à la Moyenne")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Prix")
+        ax.legend()
+        ax.grid()
+    return reporting.finish(fig, output)
+
+def main():
+    # Paramètres
+    ticker = "AAPL"  # Exemple : action Apple
+    start_date = "2020-01-01"
+    end_date = "2023-01-01"
+    momentum_window = 5  # Nombre de jours pour calculer le momentum
+    mean_reversion_window = 20  # Fenêtre pour la moyenne mobile
+
+    # Lancer l'analyse
+    analyze_stock(ticker, start_date, end_date, momentum_window, mean_reversion_window)
+
+    if instrumentation.is_enabled():
+        print(instrumentation.format_summary())
+
+if __name__ == "__main__":
+    main()
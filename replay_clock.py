@@ -0,0 +1,185 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# Horloge de rejeu déterministe
+#
+# L'index courant est une fonction pure du temps virtuel écoulé :
+#     index = index_ancre + floor((maintenant - temps_ancre) * vitesse / pas)
+# Il n'y a donc ni thread ni boucle d'attente : l'horloge ne consomme aucun
+# CPU entre deux lectures (les tableaux de bord la lisent à chaque
+# rafraîchissement), et la séquence d'index est la même pour une vitesse
+# donnée quel que soit l'ordonnancement des requêtes. Pause, reprise et
+# changement de vitesse ré-ancrent le temps virtuel. L'horloge n'a aucune
+# part d'aléa, donc pas de graine : celle-ci appartient à la série rejouée
+# (replay_seed dans showfractal.py), et une même graine rejouée à la même
+# vitesse donne le même rejeu.
+#
+# SessionStore garde l'état de chaque session de navigateur et libère les
+# sessions inactives (délai d'inactivité, et nombre maximal de sessions en
+# ordre LRU), avec un rappel pour libérer ce qu'elles retiennent ailleurs.
+
+MIN_SPEED = 1
+MAX_SPEED = 10_000
+
+
+class ReplayClock:
+    """
+    Horloge de rejeu sur `n_steps` pas de `step_seconds` secondes (à vitesse 1x).
+    Args:
+        n_steps (int): Nombre de pas à rejouer.
+        step_seconds (float): Durée d'un pas à vitesse 1x.
+        speed (float): Facteur d'accélération, entre 1 et 10 000.
+        timer (callable): Source de temps monotone (remplaçable pour les rejeux hors temps réel).
+    """
+
+    def __init__(self, n_steps, step_seconds=0.5, speed=1.0, timer=time.monotonic):
+        self._lock = threading.Lock()
+        self._running = False
+        self._timer = timer
+        self.n_steps = n_steps
+        self.step_seconds = step_seconds
+        self._speed = _check_speed(speed)
+        self._anchor_index = 0
+        self._anchor_time = timer()
+
+    # Index courant
+    def _index_at(self, now):
+        if not self._running:
+            return self._anchor_index
+        # Le petit epsilon évite de perdre un pas sur les arrondis flottants
+        elapsed_steps = int((now - self._anchor_time) * self._speed / self.step_seconds + 1e-9)
+        index = min(self.n_steps, self._anchor_index + elapsed_steps)
+        if index >= self.n_steps:
+            # Fin du rejeu : l'horloge s'arrête d'elle-même
+            self._anchor_index = index
+            self._running = False
+        return index
+
+    def _reanchor(self):
+        now = self._timer()
+        self._anchor_index = self._index_at(now)
+        self._anchor_time = now
+
+    @property
+    def index(self):
+        with self._lock:
+            return self._index_at(self._timer())
+
+    @property
+    def running(self):
+        with self._lock:
+            self._index_at(self._timer())
+            return self._running
+
+    @property
+    def speed(self):
+        return self._speed
+
+    # Contrôles
+    def start(self, n_steps=None):
+        """Repart du début (avec éventuellement un nouveau nombre de pas) et lance le rejeu."""
+        with self._lock:
+            if n_steps is not None:
+                self.n_steps = n_steps
+            self._anchor_index = 0
+            self._anchor_time = self._timer()
+            if self.n_steps > 0:
+                self._running = True
+            else:
+                self._running = False
+
+    def seek(self, index, n_steps=None):
+        """Place l'horloge sur `index` (avec éventuellement un nouveau nombre de pas), en pause."""
+        with self._lock:
+            if n_steps is not None:
+                self.n_steps = n_steps
+            self._anchor_index = max(0, min(index, self.n_steps))
+            self._anchor_time = self._timer()
+            self._running = False
+
+    def pause(self):
+        with self._lock:
+            self._reanchor()
+            self._running = False
+
+    def resume(self):
+        with self._lock:
+            if self._anchor_index < self.n_steps:
+                self._anchor_time = self._timer()
+                self._running = True
+
+    def set_speed(self, speed):
+        with self._lock:
+            self._reanchor()
+            self._speed = _check_speed(speed)
+
+
+def _check_speed(speed):
+    if not MIN_SPEED <= speed <= MAX_SPEED:
+        raise ValueError(f"La vitesse doit être comprise entre {MIN_SPEED} et {MAX_SPEED}.")
+    return speed
+
+
+class SessionStore:
+    """
+    État par session de navigateur, créé à la demande et protégé par un verrou.
+    Args:
+        factory (callable): Crée l'état d'une nouvelle session.
+        ttl (float): Une session inactive depuis plus longtemps est supprimée, en secondes.
+        max_sessions (int): Nombre maximal de sessions ; au-delà, la moins récemment utilisée est supprimée.
+        on_evict (callable): on_evict(session_id, état), appelé après la suppression d'une session.
+        timer (callable): Source de temps monotone.
+    """
+
+    def __init__(self, factory, ttl=3600.0, max_sessions=1000, on_evict=None, timer=time.monotonic):
+        self._factory = factory
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._on_evict = on_evict
+        self._timer = timer
+        self._sessions = OrderedDict()  # session_id -> (dernier accès, état), du plus ancien au plus récent
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id():
+        return str(uuid.uuid4())
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id):
+        """État de la session (créé au premier appel) ; l'appel compte comme une activité."""
+        now = self._timer()
+        with self._lock:
+            evicted = self._expire(now)
+            entry = self._sessions.pop(session_id, None)
+            state = self._factory() if entry is None else entry[1]
+            self._sessions[session_id] = (now, state)
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False))
+        self._evicted(evicted)
+        return state
+
+    def release(self, session_id):
+        """Supprime une session (fermeture d'onglet, déconnexion)."""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._evicted([(session_id, entry)])
+
+    def _expire(self, now):
+        # Les sessions sont rangées par dernier accès : les expirées sont en tête
+        evicted = []
+        while self._sessions:
+            session_id, (seen, _) = next(iter(self._sessions.items()))
+            if now - seen <= self.ttl:
+                break
+            evicted.append(self._sessions.popitem(last=False))
+        return evicted
+
+    def _evicted(self, evicted):
+        if self._on_evict is not None:
+            for session_id, (_, state) in evicted:
+                self._on_evict(session_id, state)
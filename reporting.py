@@ -0,0 +1,267 @@
+import argparse
+import html
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import pandas as pd
+
+# Rendu des graphiques sans affichage, et rapports en lot
+#
+# Les fonctions de tracé du projet acceptent un argument `output` : sans
+# lui, elles affichent la figure comme avant (plt.show / fig.show) ; avec
+# lui, elles l'écrivent sur disque au format déduit de l'extension (.png,
+# .svg, .html) et rendent la main aussitôt.
+# - matplotlib : en mode fichier, les figures ne passent pas par pyplot ;
+#   une figure par taille est créée une fois par processus puis vidée et
+#   réutilisée d'un graphique à l'autre (pas de fenêtre, pas de registre
+#   global de figures à nettoyer).
+# - plotly : les pages HTML partagent un seul plotly.min.js écrit à côté
+#   d'elles au lieu d'embarquer 3,5 Mo chacune ; PNG et SVG demandent kaleido.
+# render_reports répartit les graphiques d'un univers de tickers sur un
+# pool de processus (toutes les vues d'un ticker dans le même processus,
+# données chargées une fois) et écrit un index HTML unique par exécution,
+# avec le débit en graphiques par seconde.
+
+FORMATS = ("png", "svg", "html")
+RESULT_COLUMNS = ["chart", "ticker", "path", "seconds", "error"]
+
+_figures = {}  # taille -> figure matplotlib réutilisée (mode fichier)
+
+
+def headless():
+    """Sélectionne le moteur matplotlib Agg (aucune fenêtre) ; à appeler avant tout tracé."""
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+def figure(figsize, output=None):
+    """
+    Figure matplotlib et ses axes.
+    Args:
+        figsize (tuple): Taille en pouces.
+        output (str): Fichier de destination ; None pour une figure pyplot affichable.
+    Returns:
+        tuple: (figure, axes).
+    """
+    if output is None:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=figsize)
+        return fig, fig.add_subplot()
+    from matplotlib.figure import Figure
+    fig = _figures.get(figsize)
+    if fig is None:
+        fig = _figures[figsize] = Figure(figsize=figsize)
+    else:
+        fig.clear()
+    return fig, fig.add_subplot()
+
+
+def finish(fig, output=None, dpi=100):
+    """
+    Affiche la figure (matplotlib ou plotly), ou l'écrit dans `output`.
+    Returns:
+        str: Chemin écrit, ou None si la figure a été affichée.
+    """
+    if output is None:
+        if hasattr(fig, "savefig"):
+            import matplotlib.pyplot as plt
+            plt.show()
+        else:
+            fig.show()
+        return None
+
+    extension = os.path.splitext(output)[1].lstrip(".").lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Format non pris en charge : {output} (attendu : {', '.join(FORMATS)}).")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if hasattr(fig, "savefig"):
+        if extension == "html":
+            raise ValueError("Les figures matplotlib s'exportent en PNG ou SVG, pas en HTML.")
+        fig.savefig(output, dpi=dpi)
+    elif extension == "html":
+        fig.write_html(output, include_plotlyjs="directory", full_html=True)
+    else:
+        fig.write_image(output)  # Demande kaleido
+    return output
+
+
+# Graphiques par ticker : nom -> fonction(données OHLCV, ticker, fichier)
+def _render_sma(data, ticker, output):
+    from trading_quantitative_strategy import calculate_moving_averages, generate_signals, plot_results
+    frame = data[['Close']].copy()
+    frame['Return'] = frame['Close'].pct_change()
+    plot_results(generate_signals(calculate_moving_averages(frame, 10, 50)), ticker, output)
+
+
+def _render_fractals(data, ticker, output):
+    from Fractale import detect_fractals, plot_fractals
+    plot_fractals(detect_fractals(data.copy()), ticker, output)
+
+
+def _render_bearish(data, ticker, output):
+    from fractaldown import find_bearish_fractals, plot_bearish_fractals
+    frame = find_bearish_fractals(data.add_suffix(f"_{ticker}"), column=f"High_{ticker}")
+    plot_bearish_fractals(frame, ticker, output)
+
+
+def _render_momentum(data, ticker, output):
+    from quanta import plot_momentum_analysis
+    plot_momentum_analysis(data['Close'], ticker, 5, 20, output)
+
+
+CHARTS = {
+    "sma": _render_sma,
+    "fractals": _render_fractals,
+    "bearish": _render_bearish,
+    "momentum": _render_momentum,
+}
+
+
+def _safe_name(ticker):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in ticker)
+
+
+def _init_worker():
+    headless()
+
+
+def _render_batch(tickers, charts, output_dir, fmt, start, end):
+    """Charge chaque ticker une fois puis trace toutes les vues demandées."""
+    import data_cache
+    rows = []
+    for ticker in tickers:
+        started = time.perf_counter()
+        try:
+            data = data_cache.download(ticker, start=start, end=end)
+            if data.empty:
+                raise ValueError("aucune donnée")
+        except Exception as e:
+            rows.extend({"chart": chart, "ticker": ticker, "path": None,
+                         "seconds": time.perf_counter() - started, "error": repr(e)} for chart in charts)
+            continue
+        for chart in charts:
+            started = time.perf_counter()
+            path = f"{chart}_{_safe_name(ticker)}.{fmt}"
+            try:
+                CHARTS[chart](data, ticker, os.path.join(output_dir, path))
+                rows.append({"chart": chart, "ticker": ticker, "path": path,
+                             "seconds": time.perf_counter() - started, "error": None})
+            except Exception as e:
+                rows.append({"chart": chart, "ticker": ticker, "path": None,
+                             "seconds": time.perf_counter() - started, "error": repr(e)})
+    return rows
+
+
+def render_reports(tickers, charts=tuple(CHARTS), output_dir=None, fmt="png", start="2022-01-01",
+                   end="2023-01-01", workers=None, batch_size=8, max_in_flight=None):
+    """
+    Trace les graphiques demandés pour chaque ticker, sans affichage, avec un pool de processus.
+    Args:
+        tickers (list): Symboles à traiter.
+        charts (list): Vues à produire (clés de CHARTS).
+        output_dir (str): Répertoire du rapport (reports/<date-heure> par défaut).
+        fmt (str): 'png' ou 'svg' (les vues par ticker sont des figures matplotlib).
+        start (str): Date de début ('YYYY-MM-DD').
+        end (str): Date de fin ('YYYY-MM-DD').
+        workers (int): Nombre de processus (nombre de cœurs par défaut).
+        batch_size (int): Nombre de tickers par tâche.
+        max_in_flight (int): Nombre maximal de tâches soumises simultanément.
+    Returns:
+        tuple: (pd.DataFrame une ligne par graphique, chemin de l'index HTML, graphiques par seconde).
+    """
+    unknown = set(charts) - set(CHARTS)
+    if unknown:
+        raise ValueError(f"Graphiques inconnus : {sorted(unknown)} (disponibles : {sorted(CHARTS)}).")
+    if fmt not in ("png", "svg"):
+        raise ValueError("Les graphiques par ticker s'exportent en 'png' ou 'svg'.")
+    output_dir = output_dir or os.path.join("reports", datetime.now().strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+
+    started = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        for batch in batches:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows.extend(future.result())
+            pending.add(pool.submit(_render_batch, batch, list(charts), output_dir, fmt, start, end))
+        for future in pending:
+            rows.extend(future.result())
+    elapsed = time.perf_counter() - started
+
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS).sort_values(["ticker", "chart"]).reset_index(drop=True)
+    rendered = int(results["error"].isna().sum())
+    throughput = rendered / elapsed if elapsed > 0 else float("nan")
+    results.to_csv(os.path.join(output_dir, "results.csv"), index=False)
+    index = write_index(results, output_dir, elapsed, title=f"Rapport du {datetime.now():%Y-%m-%d %H:%M}")
+    return results, index, throughput
+
+
+def write_index(results, output_dir, elapsed, title="Rapport"):
+    """Écrit index.html : débit, puis une section par ticker avec ses graphiques et les erreurs."""
+    rendered = int(results["error"].isna().sum())
+    lines = [
+        "<!DOCTYPE html>",
+        '<html><head><meta charset="utf-8">',
+        f"<title>{html.escape(title)}</title>",
+        "<style>body{font-family:sans-serif;margin:2em}figure{display:inline-block;margin:0.5em}"
+        "img{width:480px;border:1px solid #ccc}.error{color:#b00}</style>",
+        "</head><body>",
+        f"<h1>{html.escape(title)}</h1>",
+        f"<p>{rendered} graphiques ({len(results) - rendered} échecs) en {elapsed:.1f} s, "
+        f"soit {rendered / max(elapsed, 1e-9):.1f} graphiques/s. "
+        '<a href="results.csv">Détail (CSV)</a></p>',
+        "<ul>" + "".join(f'<li><a href="#{html.escape(_safe_name(t))}">{html.escape(t)}</a></li>'
+                         for t in results["ticker"].unique()) + "</ul>",
+    ]
+    for ticker, group in results.groupby("ticker", sort=True):
+        lines.append(f'<h2 id="{html.escape(_safe_name(ticker))}">{html.escape(ticker)}</h2>')
+        for row in group.itertuples():
+            if row.error is None or pd.isna(row.error):
+                path = html.escape(row.path)
+                lines.append(f'<figure><a href="{path}"><img src="{path}" loading="lazy" '
+                             f'alt="{html.escape(row.chart)}"></a><figcaption>{html.escape(row.chart)}</figcaption></figure>')
+            else:
+                lines.append(f'<p class="error">{html.escape(row.chart)} : {html.escape(row.error)}</p>')
+    lines.append("</body></html>")
+    path = os.path.join(output_dir, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graphiques sans affichage pour un univers de tickers.")
+    parser.add_argument("tickers", help="Fichier texte avec un ticker par ligne.")
+    parser.add_argument("--charts", nargs="+", choices=sorted(CHARTS), default=list(CHARTS))
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--start", default="2022-01-01")
+    parser.add_argument("--end", default="2023-01-01")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output-dir", default=None, help="Répertoire du rapport (reports/<date-heure> par défaut).")
+    args = parser.parse_args()
+
+    with open(args.tickers) as f:
+        tickers = [line.strip() for line in f if line.strip()]
+
+    headless()
+    results, index, throughput = render_reports(tickers, args.charts, args.output_dir, args.format,
+                                                args.start, args.end, workers=args.workers)
+    failures = results[results["error"].notna()]
+    print(f"{len(results) - len(failures)} graphiques, {len(failures)} échecs, "
+          f"{throughput:.1f} graphiques/s -> {index}")
+    if len(failures):
+        print(failures[["chart", "ticker", "error"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
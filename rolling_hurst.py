@@ -0,0 +1,110 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from hurst_estimators import default_scales, to_increments
+from instrumentation import COMPUTE, instrumented
+
+# Exposant de Hurst glissant (DFA d'ordre 1)
+#
+# Dans la DFA, le profil de chaque segment est détrendé linéairement : la
+# moyenne des incréments de la fenêtre ne change donc rien aux résidus, et
+# la variance résiduelle d'un segment [p, p + s[ ne dépend pas de la fenêtre
+# qui le contient. Elle est calculée une seule fois par (p, s) à partir de
+# sommes cumulées de Y, Y² et k·Y, puis partagée par toutes les fenêtres
+# qui se chevauchent. La moyenne sur les m = fenêtre // s segments d'une
+# fenêtre s'obtient ensuite par une somme cumulée de pas s (vue remodelée
+# (-1, s)), soit O(1) par fenêtre et par échelle.
+
+PARALLEL_MIN_WINDOWS = 500_000  # En dessous, le coût du pool dépasse le gain
+
+
+def _segment_rss(profile, scale):
+    """Variance résiduelle (par point) après régression linéaire de chaque segment de longueur `scale`."""
+    n = len(profile)
+    k = np.arange(n, dtype=np.float64)
+    zero = np.zeros(1)
+    s1 = np.concatenate([zero, np.cumsum(profile)])
+    s2 = np.concatenate([zero, np.cumsum(profile * profile)])
+    s3 = np.concatenate([zero, np.cumsum(k * profile)])
+
+    p = np.arange(n - scale + 1)
+    sum_y = s1[p + scale] - s1[p]
+    sum_yy = s2[p + scale] - s2[p]
+    # Somme de j·Y_{p+j} pour j = 0..s-1 (indice local au segment)
+    sum_jy = (s3[p + scale] - s3[p]) - p * sum_y
+
+    j_sum = scale * (scale - 1) / 2.0
+    j_var = scale * (scale * scale - 1) / 12.0  # Somme des (j - moyenne)²
+    sxy = sum_jy - j_sum * sum_y / scale
+    syy = sum_yy - sum_y * sum_y / scale
+    return np.maximum(syy - sxy * sxy / j_var, 0.0) / scale
+
+
+def _strided_window_sum(values, scale, count, n_windows):
+    """Pour chaque t < n_windows, somme de values[t + k·scale] pour k = 0..count-1."""
+    length = n_windows + (count - 1) * scale
+    padded = np.zeros(-(-(length + scale) // scale) * scale)
+    padded[scale:scale + length] = values[:length]
+    cumulative = np.cumsum(padded.reshape(-1, scale), axis=0).ravel()
+    t = np.arange(n_windows)
+    return cumulative[t + count * scale] - cumulative[t]
+
+
+def _rolling_dfa_chunk(incs, window, scales):
+    """Exposant de Hurst de chaque fenêtre d'incréments entièrement contenue dans `incs`."""
+    n_windows = len(incs) - window + 1
+    # Profil recentré localement pour limiter les erreurs d'arrondi des sommes cumulées
+    profile = np.cumsum(incs - incs.mean())
+    log_f = np.empty((n_windows, len(scales)))
+    for i, scale in enumerate(scales):
+        count = window // scale
+        total = _strided_window_sum(_segment_rss(profile, scale), scale, count, n_windows)
+        with np.errstate(divide="ignore"):
+            log_f[:, i] = 0.5 * np.log10(total / count)
+    x = np.log10(scales.astype(np.float64))
+    x -= x.mean()
+    return (log_f - log_f.mean(axis=1, keepdims=True)) @ x / (x @ x)
+
+
+@instrumented(COMPUTE)
+def rolling_hurst(series, window=256, kind="price", scales=None, min_scale=10, chunk_size=250_000, workers=None):
+    """
+    Exposant de Hurst (DFA) de chaque fenêtre glissante, pas de 1.
+    Args:
+        series (pd.Series | array-like): Prix (ou incréments, selon `kind`).
+        window (int): Nombre d'incréments par fenêtre.
+        kind (str): 'price', 'random_walk' ou 'change' (voir hurst_estimators.to_increments).
+        scales (array-like): Échelles DFA ; par défaut de min_scale à window // 4.
+        min_scale (int): Plus petite échelle par défaut.
+        chunk_size (int): Nombre de fenêtres traitées par paquet.
+        workers (int): Nombre de processus ; par défaut tous les cœurs au-delà de
+            PARALLEL_MIN_WINDOWS fenêtres, sinon calcul dans le processus courant.
+    Returns:
+        pd.Series: H aligné sur le dernier point de chaque fenêtre (aucune donnée
+        future), NaN tant que la première fenêtre n'est pas complète.
+    """
+    index = series.index if isinstance(series, pd.Series) else None
+    values = np.asarray(series, dtype=np.float64)
+    incs = to_increments(values, kind)
+    offset = len(values) - len(incs)  # 1 pour des prix, 0 pour des incréments
+    scales = np.asarray(scales, dtype=int) if scales is not None else default_scales(window, min_scale, window // 4)
+    if len(scales) < 2:
+        raise ValueError("Il faut au moins deux échelles : augmenter la fenêtre ou réduire min_scale.")
+
+    result = np.full(len(values), np.nan)
+    n_windows = len(incs) - window + 1
+    if n_windows > 0:
+        starts = range(0, n_windows, chunk_size)
+        chunks = [incs[s:min(s + chunk_size, n_windows) + window - 1] for s in starts]
+        if workers is None:
+            workers = (os.cpu_count() or 1) if n_windows >= PARALLEL_MIN_WINDOWS else 1
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(_rolling_dfa_chunk, chunks, [window] * len(chunks), [scales] * len(chunks)))
+        else:
+            parts = [_rolling_dfa_chunk(chunk, window, scales) for chunk in chunks]
+        result[offset + window - 1:] = np.concatenate(parts)
+    return pd.Series(result, index=index, name="Hurst")
@@ -1,105 +1,154 @@
-import dash
-from dash import dcc, html
-from dash.dependencies import Input, Output
-import numpy as np
-import pandas as pd
-import plotly.graph_objs as go
-import time
-from threading import Thread
-
-# Initialiser l'application Dash
-app = dash.Dash(__name__)
+from functools import lru_cache
+from fractional_brownian import fbm
+from replay_clock import ReplayClock, SessionStore
+from downsampling import decimate, x_range_from_relayout
+import instrumentation
+from instrumentation import CALLBACK, COMPUTE, RENDER, instrumented, span
+
+# Dash et plotly ne sont importés qu'à la création de l'application et
+# dans les callbacks : les fonctions de calcul s'importent sans eux
 
 # Générer des données initiales (séries fractales simulées)
-def generate_fractal_series(length=1000):
-    np.random.seed(42)
-    return np.cumsum(np.random.randn(length))
+@instrumented(COMPUTE)
+def generate_fractal_series(length=1000, H=0.5, seed=42):
+    return fbm(length, H, seed=seed)
 
-# Données initiales
+# Données rejouées, générées au premier affichage
 data_length = 500
-data = generate_fractal_series(data_length)
+replay_seed = 42  # Graine de la série rejouée : même graine et même vitesse, même rejeu
 time_indices = list(range(data_length))
 
-# Mise en page de l'application
-app.layout = html.Div([
-    html.H1("Modélisation Interactive des Séries Fractales"),
-    
-    # Graphique interactif
-    dcc.Graph(id='fractal-plot', style={'height': '70vh'}),
-    
-    # Contrôles pour l'utilisateur
-    html.Div([
-        html.Label("Échelle de temps (en points):"),
-        dcc.Slider(
-            id='scale-slider',
-            min=50,
-            max=1000,
-            step=50,
-            value=500,
-            marks={i: str(i) for i in range(50, 1001, 200)},
-        ),
-        html.Button('Start', id='start-button', n_clicks=0),
-        html.Button('Pause', id='pause-button', n_clicks=0),
-    ], style={'margin-top': '20px'}),
-])
-
-# Variables globales pour le mode "Start/Pause"
-running = False
-current_index = 0
-
-# Fonction pour mettre à jour le graphique
-@app.callback(
-    Output('fractal-plot', 'figure'),
-    [Input('scale-slider', 'value'),
-     Input('start-button', 'n_clicks'),
-     Input('pause-button', 'n_clicks')]
-)
-def update_graph(scale, start_clicks, pause_clicks):
-    global running, current_index, data, time_indices
+@lru_cache(maxsize=1)
+def replay_series():
+    return generate_fractal_series(data_length, seed=replay_seed)
+
+speeds = [1, 10, 100, 1000, 10000]
+step_seconds = 0.1  # Durée d'un point rejoué à vitesse 1x
+default_plot_width = 1200  # Nombre de points envoyés tant que la largeur n'est pas connue
+
+# Horloge de rejeu propre à chaque session de navigateur
+sessions = SessionStore(lambda: ReplayClock(data_length, step_seconds=step_seconds))
+
+# Mise en page de l'application (générée à chaque chargement pour attribuer un identifiant de session)
+def serve_layout():
+    from dash import dcc, html
+
+    return html.Div([
+        html.H1("Modélisation Interactive des Séries Fractales"),
+        dcc.Store(id='session-id', data=SessionStore.new_id()),
+        dcc.Interval(id='replay-interval', interval=200, disabled=True),
+        dcc.Store(id='plot-width'),
+
+        # Graphique interactif
+        dcc.Graph(id='fractal-plot', style={'height': '70vh'}),
+
+        # Contrôles pour l'utilisateur
+        html.Div([
+            html.Label("Échelle de temps (en points):"),
+            dcc.Slider(
+                id='scale-slider',
+                min=50,
+                max=1000,
+                step=50,
+                value=500,
+                marks={i: str(i) for i in range(50, 1001, 200)},
+            ),
+            html.Label("Vitesse de rejeu :"),
+            dcc.Dropdown(
+                id='speed-dropdown',
+                options=[{'label': f'{speed}x', 'value': speed} for speed in speeds],
+                value=1
+            ),
+            html.Button('Start', id='start-button', n_clicks=0),
+            html.Button('Pause', id='pause-button', n_clicks=0),
+        ], style={'margin-top': '20px'}),
+    ])
+
+# Fonction pour mettre à jour le graphique (enregistrée par create_app)
+@instrumented(CALLBACK)
+def update_graph(scale, start_clicks, pause_clicks, speed, n_intervals, relayout_data, session_id, plot_width):
+    import dash
+    import plotly.graph_objs as go
+
+    clock = sessions.get(session_id)
+    data = replay_series()
     
-    # Gestion du démarrage et de la pause
+    # Gestion du démarrage et de la pause (Pause bascule entre pause et reprise)
     ctx = dash.callback_context
     if ctx.triggered and 'start-button' in ctx.triggered[0]['prop_id']:
-        running = True
+        clock.start()
     elif ctx.triggered and 'pause-button' in ctx.triggered[0]['prop_id']:
-        running = False
+        if clock.running:
+            clock.pause()
+        else:
+            clock.resume()
+    if speed and speed != clock.speed:
+        clock.set_speed(speed)
     
     # Afficher les données jusqu'à l'index actuel
+    running = clock.running
+    current_index = clock.index
     display_data = data[:current_index] if running else data[:scale]
     display_time = time_indices[:current_index] if running else time_indices[:scale]
+
+    with span("showfractal.figure", RENDER):
+        # Décimer la partie visible à la largeur du graphique avant l'envoi
+        display_time, display_data = decimate(display_time, display_data, plot_width or default_plot_width,
+                                              x_range=x_range_from_relayout(relayout_data))
     
-    # Créer le graphique
-    figure = {
-        'data': [
-            go.Scatter(
-                x=display_time,
-                y=display_data,
-                mode='lines',
-                name='Série Fractale'
-            )
-        ],
-        'layout': {
-            'title': 'Évolution des Séries Fractales',
-            'xaxis': {'title': 'Temps'},
-            'yaxis': {'title': 'Valeur'},
+        # Créer le graphique
+        figure = {
+            'data': [
+                go.Scatter(
+                    x=display_time,
+                    y=display_data,
+                    mode='lines',
+                    name='Série Fractale'
+                )
+            ],
+            'layout': {
+                'title': 'Évolution des Séries Fractales',
+                'uirevision': 'fractal',  # Conserver le zoom entre deux rafraîchissements
+                'xaxis': {'title': 'Temps'},
+                'yaxis': {'title': 'Valeur'},
+            }
         }
-    }
-    return figure
-
-# Fonction pour faire évoluer les données automatiquement
-def update_data():
-    global running, current_index, data_length, data
-    while True:
-        if running:
-            time.sleep(0.1)  # Pause pour simuler l'évolution
-            if current_index < data_length:
-                current_index += 1
-            else:
-                running = False
-
-# Lancer la mise à jour des données dans un thread séparé
-Thread(target=update_data, daemon=True).start()
+    # Le navigateur n'interroge le serveur que pendant le rejeu
+    return figure, not running
+
+# Application Dash : mise en page, callbacks et mesures exposées sur /metrics
+def create_app():
+    import dash
+    from dash.dependencies import Input, Output, State
+
+    app = dash.Dash(__name__)
+    instrumentation.register_metrics_route(app)
+    app.layout = serve_layout
+
+    # Largeur de la fenêtre du navigateur, qui borne le nombre de points envoyés
+    app.clientside_callback(
+        "function(sessionId) { return window.innerWidth; }",
+        Output('plot-width', 'data'),
+        Input('session-id', 'data')
+    )
+    app.callback(
+        [Output('fractal-plot', 'figure'),
+         Output('replay-interval', 'disabled')],
+        [Input('scale-slider', 'value'),
+         Input('start-button', 'n_clicks'),
+         Input('pause-button', 'n_clicks'),
+         Input('speed-dropdown', 'value'),
+         Input('replay-interval', 'n_intervals'),
+         Input('fractal-plot', 'relayoutData')],
+        [State('session-id', 'data'),
+         State('plot-width', 'data')]
+    )(update_graph)
+    return app
 
 # Lancer l'application
+def main():
+    instrumentation.configure_from_env(default="time")
+    create_app().run(debug=True)
+
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    main()
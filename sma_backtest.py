@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import COMPUTE, instrumented
+
+# Balayage vectorisé des paramètres de la stratégie de croisement de SMA
+#
+# Toutes les moyennes mobiles sont calculées une seule fois à partir d'une
+# somme cumulée, puis chaque couple (fenêtre courte, fenêtre longue) est
+# évalué par diffusion NumPy sur un tableau (courtes x longues x temps),
+# découpé en paquets de fenêtres courtes pour borner la mémoire.
+
+TRADING_DAYS = 252
+
+
+def rolling_means(close, windows):
+    """
+    Calcule plusieurs SMA à partir d'une seule somme cumulée.
+    Args:
+        close (np.ndarray): Prix de clôture.
+        windows (array-like): Tailles de fenêtre.
+    Returns:
+        np.ndarray: Tableau (len(windows), len(close)), NaN avant la première fenêtre complète.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    prefix = np.concatenate([[0.0], np.cumsum(close)])
+    sma = np.full((len(windows), n), np.nan)
+    for i, w in enumerate(windows):
+        if w <= n:
+            sma[i, w - 1:] = (prefix[w:] - prefix[:n - w + 1]) / w
+    return sma
+
+
+def _max_drawdown(equity):
+    """Perte maximale depuis un sommet, le long du dernier axe ; le capital initial (1.0) compte comme sommet."""
+    ratio = np.maximum.accumulate(equity, axis=-1)
+    np.maximum(ratio, 1.0, out=ratio)
+    np.divide(equity, ratio, out=ratio)
+    return 1.0 - ratio.min(axis=-1)
+
+
+@instrumented(COMPUTE)
+def sweep_sma_crossover(close, short_windows, long_windows, cost=0.0, chunk_size=8):
+    """
+    Évalue toute une grille de couples de fenêtres en une passe vectorisée.
+    Args:
+        close (array-like): Prix de clôture.
+        short_windows (array-like): Fenêtres courtes à tester.
+        long_windows (array-like): Fenêtres longues à tester.
+        cost (float): Coût par unité de changement de position (ex: 0.0005 = 5 pb).
+        chunk_size (int): Nombre de fenêtres courtes traitées par paquet.
+    Returns:
+        pd.DataFrame: Une ligne par couple valide (courte < longue) avec le
+        rendement total, le ratio de Sharpe annualisé et la perte maximale.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    short_windows = np.asarray(short_windows, dtype=int)
+    long_windows = np.asarray(long_windows, dtype=int)
+    windows = np.union1d(short_windows, long_windows)
+    sma = rolling_means(close, windows)
+    position_of = {w: i for i, w in enumerate(windows)}
+    sma_long = sma[[position_of[w] for w in long_windows]]
+
+    # Rendement de la barre t, capté par la position prise à la clôture de t - 1
+    returns = close[1:] / close[:-1] - 1.0
+
+    n_short, n_long = len(short_windows), len(long_windows)
+    total_return = np.full((n_short, n_long), np.nan)
+    sharpe = np.full((n_short, n_long), np.nan)
+    max_drawdown = np.full((n_short, n_long), np.nan)
+
+    for start in range(0, n_short, chunk_size):
+        stop = min(start + chunk_size, n_short)
+        # Seules les fenêtres longues strictement supérieures à la plus petite
+        # fenêtre courte du paquet donnent des couples valides.
+        cols = np.flatnonzero(long_windows > short_windows[start:stop].min())
+        if not len(cols):
+            continue
+        sma_short = sma[[position_of[w] for w in short_windows[start:stop]]]
+
+        # Même convention que generate_signals : 1 au-dessus, -1 en dessous
+        # ou à égalité, 0 tant que la SMA longue n'est pas définie.
+        position = np.greater(sma_short[:, None, :], sma_long[None, cols, :]).astype(np.float64)
+        position *= 2.0
+        position -= 1.0
+        for j, w in enumerate(long_windows[cols]):
+            position[:, j, :w - 1] = 0.0
+
+        if cost:
+            turnover = np.abs(np.diff(position, axis=-1, prepend=0.0))[..., :-1]
+        # Calcul en place : la position n'est plus utilisée ensuite
+        strategy = position[..., :-1]
+        strategy *= returns
+        if cost:
+            strategy -= cost * turnover
+
+        mean = strategy.mean(axis=-1)
+        std = strategy.std(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe[start:stop, cols] = np.where(std > 0, mean / std, np.nan) * np.sqrt(TRADING_DAYS)
+        strategy += 1.0
+        equity = np.cumprod(strategy, axis=-1, out=strategy)
+        total_return[start:stop, cols] = equity[..., -1] - 1.0
+        max_drawdown[start:stop, cols] = _max_drawdown(equity)
+
+    short_grid, long_grid = np.meshgrid(short_windows, long_windows, indexing="ij")
+    results = pd.DataFrame({
+        "short_window": short_grid.ravel(),
+        "long_window": long_grid.ravel(),
+        "total_return": total_return.ravel(),
+        "sharpe": sharpe.ravel(),
+        "max_drawdown": max_drawdown.ravel(),
+    })
+    return results[results["short_window"] < results["long_window"]].reset_index(drop=True)
@@ -0,0 +1,133 @@
+import numpy as np
+
+# Détection de fractales en continu, barre par barre, sur de nombreux symboles
+#
+# Chaque symbole dispose d'un tampon circulaire des `window` dernières barres
+# (plus hauts, plus bas, dates), stocké comme une ligne de tableaux NumPy
+# partagés par tous les symboles. À l'arrivée d'une barre, seule la barre
+# centrale du tampon (arrivée `window // 2` barres plus tôt) est testée,
+# avec la même règle que fractal_engine.find_fractals : un pivot est
+# confirmé exactement `window // 2` barres après lui (deux barres pour les
+# fractales de Williams), en O(window) = O(1) par barre. Les fractales
+# confirmées sont transmises aux abonnés sous forme de tableau structuré.
+
+BEARISH = 1   # Sommet local des plus hauts
+BULLISH = -1  # Creux local des plus bas
+
+EVENT_DTYPE = np.dtype([
+    ("symbol", np.int64),          # Indice du symbole (voir StreamingFractals.symbols)
+    ("kind", np.int8),             # BEARISH ou BULLISH
+    ("pivot_time", np.int64),      # Date de la barre pivot
+    ("price", np.float64),         # Plus haut (sommet) ou plus bas (creux) du pivot
+    ("confirmed_time", np.int64),  # Date de la barre qui confirme le pivot
+])
+
+
+class StreamingFractals:
+    """
+    Détecteur de fractales en ligne pour un ensemble de symboles.
+    Args:
+        symbols (list): Symboles connus au départ (d'autres peuvent s'ajouter ensuite).
+        window (int): Taille impaire de la fenêtre (5 pour les fractales de Williams).
+    """
+
+    def __init__(self, symbols=(), window=5):
+        if window < 3 or window % 2 == 0:
+            raise ValueError("La fenêtre doit être un entier impair supérieur ou égal à 3.")
+        self.window = window
+        self.symbols = []
+        self._index = {}
+        self._subscribers = []
+        capacity = max(len(symbols), 16)
+        self._high = np.full((capacity, window), np.nan)
+        self._low = np.full((capacity, window), np.nan)
+        self._time = np.zeros((capacity, window), dtype=np.int64)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        for symbol in symbols:
+            self.index_of(symbol)
+
+    def index_of(self, symbol):
+        """Indice du symbole, créé (avec agrandissement des tableaux si besoin) à la première utilisation."""
+        index = self._index.get(symbol)
+        if index is None:
+            index = len(self.symbols)
+            if index == len(self._count):
+                self._grow(2 * index)
+            self.symbols.append(symbol)
+            self._index[symbol] = index
+        return index
+
+    def _grow(self, capacity):
+        extra = capacity - len(self._count)
+        self._high = np.vstack([self._high, np.full((extra, self.window), np.nan)])
+        self._low = np.vstack([self._low, np.full((extra, self.window), np.nan)])
+        self._time = np.vstack([self._time, np.zeros((extra, self.window), dtype=np.int64)])
+        self._count = np.concatenate([self._count, np.zeros(extra, dtype=np.int64)])
+
+    def subscribe(self, callback):
+        """Appelle `callback(events)` (tableau EVENT_DTYPE non vide) à chaque fractale confirmée."""
+        self._subscribers.append(callback)
+
+    def update(self, symbol, high, low, time):
+        """Ajoute une barre pour un symbole. Returns: tableau EVENT_DTYPE des fractales confirmées."""
+        return self.update_batch([self.index_of(symbol)], [high], [low], [time])
+
+    def update_batch(self, indices, high, low, time):
+        """
+        Ajoute une barre pour chacun des symboles donnés (au plus une barre par symbole).
+        Args:
+            indices (array-like): Indices des symboles (voir index_of).
+            high (array-like): Plus hauts des nouvelles barres.
+            low (array-like): Plus bas.
+            time (array-like): Dates (entiers, par exemple en ms).
+        Returns:
+            np.ndarray: Tableau EVENT_DTYPE des fractales confirmées par ces barres.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        # Un indice répété écrirait deux barres dans la même case du tampon
+        if len(np.unique(indices)) != len(indices):
+            raise ValueError("Chaque symbole ne peut recevoir qu'une barre par appel à update_batch.")
+        slot = self._count[indices] % self.window
+        self._high[indices, slot] = high
+        self._low[indices, slot] = low
+        self._time[indices, slot] = time
+        self._count[indices] += 1
+
+        rows = indices[self._count[indices] >= self.window]
+        if len(rows) == 0:
+            return np.empty(0, dtype=EVENT_DTYPE)
+        # Barre centrale du tampon : arrivée window // 2 barres avant la dernière
+        center = (self._count[rows] - 1 - self.window // 2) % self.window
+        arange = np.arange(len(rows))
+        highs = self._high[rows]
+        lows = self._low[rows]
+        pivot_high = highs[arange, center]
+        pivot_low = lows[arange, center]
+        highs[arange, center] = -np.inf
+        lows[arange, center] = np.inf
+        bearish = pivot_high > highs.max(axis=1)
+        bullish = pivot_low < lows.min(axis=1)
+        if not (bearish.any() or bullish.any()):
+            return np.empty(0, dtype=EVENT_DTYPE)
+
+        newest = (self._count[rows] - 1) % self.window
+        events = np.empty(int(bearish.sum() + bullish.sum()), dtype=EVENT_DTYPE)
+        n_bearish = int(bearish.sum())
+        for part, mask, kind, price in ((events[:n_bearish], bearish, BEARISH, pivot_high),
+                                        (events[n_bearish:], bullish, BULLISH, pivot_low)):
+            part["symbol"] = rows[mask]
+            part["kind"] = kind
+            part["pivot_time"] = self._time[rows[mask], center[mask]]
+            part["price"] = price[mask]
+            part["confirmed_time"] = self._time[rows[mask], newest[mask]]
+        for callback in list(self._subscribers):
+            callback(events)
+        return events
+
+    def reset(self, symbol):
+        """Vide le tampon d'un symbole (par exemple après un trou dans le flux)."""
+        index = self.index_of(symbol)
+        self._count[index] = 0
+        self._high[index] = np.nan
+        self._low[index] = np.nan
+        self._time[index] = 0
@@ -0,0 +1,139 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from hurst_estimators import MIN_BLOCKS
+
+# Exposant de Hurst incrémental
+#
+# Même statistique que hurst_estimators.estimate_hurst(method='rs',
+# kind='price') : les rendements sont découpés en blocs consécutifs de w
+# rendements depuis le début de la série ; pour chaque bloc, R est l'étendue
+# des écarts cumulés à la moyenne du bloc et S l'écart-type (ddof=1) ; H est
+# la pente de log10(R/S moyen) sur log10(w), pour les échelles ayant au moins
+# MIN_BLOCKS['rs'] blocs complets. Le tableau de bord affiche ainsi la même
+# valeur que la table de Hurst pour une même série.
+#
+# Seuls les max_scale derniers rendements sont gardés : un bloc de taille w
+# est évalué une fois, à sa clôture (tous les w rendements), en O(w), soit
+# O(1) amorti par prix et par échelle, indépendamment de la longueur de la
+# session. Sans fenêtre, chaque échelle ne garde que la somme et le nombre
+# des R/S ; avec une fenêtre (lookback), les R/S des blocs encore dans la
+# fenêtre sont gardés pour être retirés à leur sortie (au plus
+# lookback / w par échelle). La mémoire reste donc bornée.
+
+
+def default_scales(min_scale=10, max_scale=1000):
+    """Échelles géométriques (pas de 10**0.25), comme hurst_estimators.default_scales."""
+    exponents = np.arange(math.log10(min_scale), math.log10(max_scale) + 1e-9, 0.25)
+    return sorted(set(int(10 ** x) for x in exponents))
+
+
+def _block_rs(block):
+    """R/S classique d'un bloc de rendements (NaN si R ou S est nul)."""
+    profile = np.cumsum(block - block.mean())
+    R = profile.max() - profile.min()
+    S = block.std(ddof=1)
+    return R / S if R > 0 and S > 0 else math.nan
+
+
+class _ScaleState:
+    """Somme des R/S des blocs terminés pour une échelle."""
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.blocks = deque()  # Avec une fenêtre : (indice du premier rendement du bloc, R/S ou NaN)
+        self.count = 0  # Blocs complets
+        self.valid = 0  # Blocs dont le R/S est défini
+        self.rs_sum = 0.0
+
+
+class StreamingHurst:
+    """
+    Estimateur de Hurst mis à jour prix par prix.
+    Args:
+        min_scale (int): Plus petite taille de bloc, en rendements.
+        max_scale (int): Plus grande taille de bloc (bornée par lookback / 2).
+        lookback (int): Fenêtre glissante en nombre de prix, None pour toute la session.
+    """
+
+    def __init__(self, min_scale=10, max_scale=1000, lookback=None):
+        if lookback is not None:
+            max_scale = min(max_scale, lookback // 2)
+        self.lookback = lookback
+        self.scales = [_ScaleState(w) for w in default_scales(min_scale, max_scale)]
+        self.n = 0
+        self.last_price = None
+        self.value = math.nan
+        # Derniers rendements (au moins la plus grande échelle), décalés quand le tampon est plein
+        self._capacity = 2 * max(max_scale, 1)
+        self._returns = np.empty(self._capacity)
+        self._filled = 0
+        self._count = 0  # Rendements reçus
+
+    def update(self, price):
+        """
+        Ajoute un prix et retourne l'exposant de Hurst courant.
+        Args:
+            price (float): Nouveau prix de clôture.
+        Returns:
+            float: H, ou NaN tant que moins de deux échelles ont assez de blocs complets.
+        """
+        price = float(price)
+        previous, self.last_price = self.last_price, price
+        self.n += 1
+        if previous is None:
+            return self.value
+
+        if self._filled == self._capacity:
+            keep = self._capacity // 2
+            self._returns[:keep] = self._returns[self._filled - keep:self._filled]
+            self._filled = keep
+        self._returns[self._filled] = price / previous - 1.
+        self._filled += 1
+        self._count += 1
+
+        for state in self.scales:
+            if self._count % state.scale == 0:
+                rs = _block_rs(self._returns[self._filled - state.scale:self._filled])
+                state.count += 1
+                if not math.isnan(rs):
+                    state.rs_sum += rs
+                    state.valid += 1
+                if self.lookback is not None:
+                    state.blocks.append((self._count - state.scale, rs))
+
+            # Éviction en O(1) des blocs sortis de la fenêtre (les lookback derniers prix)
+            if self.lookback is not None:
+                oldest = self._count - (self.lookback - 1)
+                while state.blocks and state.blocks[0][0] < oldest:
+                    rs = state.blocks.popleft()[1]
+                    state.count -= 1
+                    if not math.isnan(rs):
+                        state.rs_sum -= rs
+                        state.valid -= 1
+
+        self.value = self._fit()
+        return self.value
+
+    def extend(self, prices):
+        """Ajoute une séquence de prix et retourne l'exposant de Hurst final."""
+        for price in prices:
+            self.update(price)
+        return self.value
+
+    def _fit(self):
+        """Régression de log10(R/S moyen) sur log10(échelle)."""
+        xs, ys = [], []
+        for state in self.scales:
+            if state.count >= MIN_BLOCKS["rs"] and state.valid:
+                xs.append(math.log10(state.scale))
+                ys.append(math.log10(state.rs_sum / state.valid))
+        if len(xs) < 2:
+            return math.nan
+        x_mean = sum(xs) / len(xs)
+        y_mean = sum(ys) / len(ys)
+        sxx = sum((x - x_mean) ** 2 for x in xs)
+        sxy = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+        return sxy / sxx
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Les modules du projet sont à la racine du dépôt, sans paquet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Aucune fenêtre, aucun accès réseau et pas de mesures pendant les tests
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ.setdefault("MARKET_DATA_OFFLINE", "1")
+os.environ.setdefault("INSTRUMENTATION", "off")
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomaly_scanner import (RESULT_COLUMNS, _betainc, _student_two_sided, benjamini_hochberg, group_tests,
+                             pre_holiday_mask, scan_calendar_anomalies)
+
+# Valeurs de référence : scipy (absent des dépendances du projet)
+stats = pytest.importorskip("scipy.stats")
+special = pytest.importorskip("scipy.special")
+
+
+def price_panel(n_days=800, n_tickers=6, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-01", periods=n_days)
+    returns = rng.normal(0.0005, 0.01, (n_days, n_tickers))
+    prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates,
+                          columns=[f"T{i}" for i in range(n_tickers)])
+    prices.iloc[:150, 1] = np.nan  # Ticker coté plus tard
+    prices.iloc[300:310, 2] = np.nan  # Suspension de cotation
+    return prices
+
+
+# Fonctions spéciales
+@pytest.mark.parametrize("a,b", [(0.5, 0.5), (2.0, 0.5), (15.0, 0.5), (120.0, 0.5), (3.5, 7.25)])
+def test_betainc_matches_scipy(a, b):
+    x = np.linspace(0.001, 0.999, 200)
+    expected = special.betainc(a, b, x)
+    result = _betainc(np.full_like(x, a), np.full_like(x, b), x)
+    np.testing.assert_allclose(result, expected, rtol=1e-9, atol=1e-14)
+
+
+def test_student_two_sided_matches_scipy():
+    t = np.array([-8.0, -2.5, -0.3, 0.0, 0.7, 1.96, 4.0, 30.0])
+    df = np.array([3.2, 10.0, 57.5, 8.0, 1.5, 1000.0, 24.7, 200.0])
+    np.testing.assert_allclose(_student_two_sided(t, df), 2 * stats.t.sf(np.abs(t), df), rtol=1e-8, atol=1e-300)
+
+
+def test_student_two_sided_invalid_inputs_are_nan():
+    p = _student_two_sided(np.array([np.nan, 1.0, 1.0, np.inf]), np.array([10.0, np.nan, 0.0, 10.0]))
+    assert np.isnan(p).all()
+
+
+# Benjamini-Hochberg
+def test_benjamini_hochberg_matches_scipy():
+    p = np.random.default_rng(1).uniform(0, 1, 500) ** 3
+    np.testing.assert_allclose(benjamini_hochberg(p), stats.false_discovery_control(p, method="bh"), rtol=1e-12)
+
+
+def test_benjamini_hochberg_ignores_nan():
+    p = np.array([0.01, np.nan, 0.04, 0.03, np.nan, 0.5])
+    q = benjamini_hochberg(p)
+    assert np.isnan(q[[1, 4]]).all()
+    finite = np.isfinite(p)
+    np.testing.assert_allclose(q[finite], stats.false_discovery_control(p[finite], method="bh"))
+
+
+# Test de Welch par groupe
+def test_group_tests_matches_welch_per_ticker_and_group():
+    rng = np.random.default_rng(2)
+    n_periods, n_tickers, n_groups = 400, 5, 4
+    returns = rng.normal(0, 1, (n_periods, n_tickers)) * rng.uniform(0.5, 2, n_tickers)
+    returns[rng.uniform(size=returns.shape) < 0.1] = np.nan
+    labels = rng.integers(-1, n_groups, n_periods)
+    returns = returns + (labels == 2)[:, None] * 0.4
+
+    result = group_tests(returns, labels, n_groups, min_obs=10)
+    for g in range(n_groups):
+        for j in range(n_tickers):
+            column = returns[:, j]
+            inside = column[(labels == g) & np.isfinite(column)]
+            outside = column[(labels >= 0) & (labels != g) & np.isfinite(column)]
+            reference = stats.ttest_ind(inside, outside, equal_var=False)
+            assert result["n"][g, j] == len(inside)
+            assert result["n_other"][g, j] == len(outside)
+            assert result["mean"][g, j] == pytest.approx(inside.mean())
+            assert result["mean_other"][g, j] == pytest.approx(outside.mean())
+            assert result["t_stat"][g, j] == pytest.approx(reference.statistic, rel=1e-8)
+            assert result["df"][g, j] == pytest.approx(reference.df, rel=1e-8)
+            assert result["p_value"][g, j] == pytest.approx(reference.pvalue, rel=1e-7)
+
+
+def test_group_tests_min_obs():
+    returns = np.random.default_rng(3).normal(size=(30, 2))
+    labels = np.zeros(30, dtype=int)
+    labels[:5] = 1
+    result = group_tests(returns, labels, 2, min_obs=10)
+    assert np.isnan(result["t_stat"]).all()
+    assert np.isnan(result["p_value"]).all()
+    assert (result["n"][1] == 5).all()
+
+
+# Scan complet
+def test_scan_matches_reference_pipeline():
+    prices = price_panel()
+    results = scan_calendar_anomalies(prices, effects=("day_of_week", "turn_of_month"), chunk_size=4)
+    assert list(results.columns) == RESULT_COLUMNS
+    assert results["p_value"].is_monotonic_increasing
+
+    returns = prices / prices.shift(1) - 1
+    weekday = prices.index.dayofweek
+    for ticker in prices.columns:
+        column = returns[ticker]
+        for day, name in enumerate(["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi"]):
+            inside = column[weekday == day].dropna()
+            outside = column[weekday != day].dropna()
+            reference = stats.ttest_ind(inside, outside, equal_var=False)
+            row = results[(results["ticker"] == ticker) & (results["effect"] == "day_of_week")
+                          & (results["group"] == name)].iloc[0]
+            assert row["n"] == len(inside) and row["n_other"] == len(outside)
+            assert row["t_stat"] == pytest.approx(reference.statistic, rel=1e-8)
+            assert row["p_value"] == pytest.approx(reference.pvalue, rel=1e-7)
+    # Correction sur l'ensemble des tests, tous paquets de tickers confondus
+    np.testing.assert_allclose(results["q_value"], stats.false_discovery_control(results["p_value"], method="bh"))
+    assert set(results["effect"]) == {"day_of_week", "turn_of_month"}
+    assert (results.loc[results["effect"] == "turn_of_month", "group"] == "J-1..J+3").all()
+
+
+def test_scan_independent_of_chunk_size():
+    prices = price_panel(n_tickers=7)
+    a = scan_calendar_anomalies(prices, chunk_size=2)
+    b = scan_calendar_anomalies(prices, chunk_size=500)
+    key = ["ticker", "effect", "group"]
+    pd.testing.assert_frame_equal(a.sort_values(key).reset_index(drop=True),
+                                  b.sort_values(key).reset_index(drop=True))
+
+
+def test_scan_detects_planted_effect():
+    prices = price_panel(n_days=2500, n_tickers=3, seed=4)
+    returns = prices.pct_change()
+    returns.loc[prices.index.dayofweek == 0, "T0"] += 0.01  # Lundis anormaux pour T0
+    planted = prices.iloc[0] * (1 + returns.fillna(0)).cumprod()
+    results = scan_calendar_anomalies(planted, effects=("day_of_week",))
+    top = results.iloc[0]
+    assert (top["ticker"], top["group"]) == ("T0", "Lundi")
+    assert top["q_value"] < 1e-6
+
+
+def test_scan_empty_and_unknown_effect():
+    prices = price_panel(n_days=5)
+    results = scan_calendar_anomalies(prices, effects=("day_of_week",))
+    assert results.empty and list(results.columns) == RESULT_COLUMNS
+    with pytest.raises(ValueError):
+        scan_calendar_anomalies(price_panel(), effects=("lune",))
+
+
+def test_pre_holiday_mask():
+    index = pd.DatetimeIndex(["2021-12-22", "2021-12-23", "2021-12-27", "2021-12-28", "2021-12-29"])
+    # Le 24 décembre (vendredi) n'est pas coté : le 23 est une veille de férié
+    assert pre_holiday_mask(index).tolist() == [False, True, False, False, False]
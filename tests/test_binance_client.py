@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+
+import numpy as np
+import pytest
+from aiohttp import web
+
+import binance_client
+from binance_client import KlineBuffer, close_sync_clients, decode_klines, fetch_klines_sync, parse_klines
+from kline_replay_server import make_app
+
+MINUTE = 60_000
+
+
+def make_rows(n, start=1_700_000_000_000):
+    return [[start + i * MINUTE, f"{100 + i:.2f}", f"{101 + i:.2f}", f"{99 + i:.2f}", f"{100.5 + i:.2f}", "1.5",
+             start + i * MINUTE + MINUTE - 1, "150.0", i, "0.7", "70.0", "0"] for i in range(n)]
+
+
+@pytest.fixture(scope="module")
+def server():
+    """Serveur de rejeu local (BTCUSDT 1m, 2500 klines) ; compte les connexions TCP ouvertes."""
+    rows = make_rows(2500)
+    app = make_app({("BTCUSDT", "1m"): ([row[0] for row in rows], rows)})
+    connections = set()
+
+    @web.middleware
+    async def count_connections(request, handler):
+        connections.add(id(request.transport))
+        return await handler(request)
+
+    app.middlewares.append(count_connections)
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    loop.run_until_complete(site.start())
+    port = site._server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield {"url": f"http://127.0.0.1:{port}", "rows": rows, "connections": connections}
+    close_sync_clients()
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_decode_klines():
+    rows = make_rows(3)
+    values = decode_klines(json.dumps(rows).encode())
+    assert values.shape == (3, 12)
+    assert values[2, 0] == rows[2][0] and values[1, 4] == 101.5
+    assert decode_klines(b"[]").shape == (0, 12)
+    with pytest.raises(ValueError):
+        decode_klines(b'[[1,"a"]]')
+    with pytest.raises(ValueError):
+        decode_klines(b"[[1,2,3]]")
+
+
+def test_parse_klines_bytes_and_list_agree():
+    rows = make_rows(5)
+    from_bytes = parse_klines(json.dumps(rows).encode())
+    from_list = parse_klines(rows)
+    assert from_bytes.dtype == from_list.dtype
+    for name in from_bytes.dtype.names:
+        np.testing.assert_array_equal(from_bytes[name], from_list[name])
+    assert parse_klines(rows, np.float32)["close"].dtype == np.float32
+
+
+def test_kline_buffer_pages():
+    rows = make_rows(6)
+    buffer = KlineBuffer(capacity=2)
+    buffer.prepend(json.dumps(rows[2:4]).encode())
+    buffer.prepend(json.dumps(rows[0:2]).encode())
+    buffer.append(json.dumps(rows[4:6]).encode())
+    assert len(buffer) == 6
+    np.testing.assert_array_equal(buffer.klines["open_time"], [row[0] for row in rows])
+
+
+def test_sync_fetch_paginates(server):
+    rows = server["rows"]
+    latest = fetch_klines_sync("BTCUSDT", "1m", limit=1500, base_url=server["url"])
+    np.testing.assert_array_equal(latest["open_time"], [row[0] for row in rows[-1500:]])
+    forward = fetch_klines_sync("BTCUSDT", "1m", start_time=rows[10][0], limit=1200, base_url=server["url"])
+    np.testing.assert_array_equal(forward["open_time"], [row[0] for row in rows[10:1210]])
+    assert forward["close"][0] == float(rows[10][4])
+
+
+def test_sync_calls_reuse_one_connection(server):
+    close_sync_clients()
+    server["connections"].clear()
+    for _ in range(5):
+        fetch_klines_sync("BTCUSDT", "1m", limit=10, base_url=server["url"])
+    assert len(server["connections"]) == 1
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        fetch_klines_sync("BTCUSDT", "1m", limit=10, base_url=server["url"]))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert len(results) == 3
+    # Appels séquentiels puis depuis d'autres threads : même client, connexions keep-alive réutilisées
+    assert len(server["connections"]) <= 3
+    assert len(binance_client._sync_clients) == 1
+
+
+def test_errors_are_raised_to_sync_callers(server):
+    with pytest.raises(ValueError):
+        fetch_klines_sync("UNKNOWN", "1m", limit=10, base_url=server["url"])
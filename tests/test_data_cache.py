@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cache import OHLCVCache, _merge_ranges, _missing_ranges, adjust_prices
+
+
+class FakeSource:
+    """Barres quotidiennes synthétiques (jours ouvrés), avec journal des plages demandées."""
+
+    def __init__(self, empty=False, fail=False):
+        self.calls = []
+        self.empty = empty
+        self.fail = fail
+        dates = pd.bdate_range("2020-01-01", "2021-12-31", name="Date")
+        close = 100 + np.arange(len(dates), dtype=float)
+        self.data = pd.DataFrame({"Open": close - 1, "High": close + 1, "Low": close - 2, "Close": close,
+                                  "Adj Close": close / 2, "Volume": np.full(len(dates), 1000.0)}, index=dates)
+
+    def fetch(self, ticker, start, end, interval):
+        self.calls.append((pd.Timestamp(start), pd.Timestamp(end)))
+        if self.fail:
+            raise ConnectionError("hors ligne")
+        if self.empty:
+            return self.data.iloc[:0]
+        return self.data[(self.data.index >= start) & (self.data.index < end)]
+
+
+def ts(value):
+    return pd.Timestamp(value)
+
+
+def test_missing_ranges():
+    covered = [[ts("2020-02-01"), ts("2020-03-01")], [ts("2020-04-01"), ts("2020-05-01")]]
+    assert _missing_ranges(covered, ts("2020-01-01"), ts("2020-06-01")) == [
+        (ts("2020-01-01"), ts("2020-02-01")), (ts("2020-03-01"), ts("2020-04-01")),
+        (ts("2020-05-01"), ts("2020-06-01"))]
+    assert _missing_ranges(covered, ts("2020-02-10"), ts("2020-02-20")) == []
+    assert _missing_ranges([], ts("2020-01-01"), ts("2020-01-02")) == [(ts("2020-01-01"), ts("2020-01-02"))]
+
+
+def test_merge_ranges_joins_touching_and_overlapping():
+    merged = _merge_ranges([[ts("2020-03-01"), ts("2020-04-01")], [ts("2020-01-01"), ts("2020-02-01")],
+                            [ts("2020-02-01"), ts("2020-03-15")]])
+    assert merged == [[ts("2020-01-01"), ts("2020-04-01")]]
+
+
+def test_repeated_download_served_from_cache(tmp_path):
+    source = FakeSource()
+    cache = OHLCVCache(root=str(tmp_path), source=source, offline=False)
+    first = cache.download("AAPL", start="2020-03-01", end="2020-06-01", auto_adjust=False)
+    second = cache.download("AAPL", start="2020-03-01", end="2020-06-01", auto_adjust=False)
+    assert len(source.calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    expected = source.data.loc["2020-03-01":"2020-05-31"]
+    np.testing.assert_array_equal(second["Close"].to_numpy(), expected["Close"].to_numpy())
+
+
+def test_only_gaps_are_fetched(tmp_path):
+    source = FakeSource()
+    cache = OHLCVCache(root=str(tmp_path), source=source, offline=False)
+    cache.download("AAPL", start="2020-03-01", end="2020-06-01")
+    cache.download("AAPL", start="2020-07-01", end="2020-08-01")
+    data = cache.download("AAPL", start="2020-02-01", end="2020-09-01", auto_adjust=False)
+    assert source.calls[2:] == [(ts("2020-02-01"), ts("2020-03-01")), (ts("2020-06-01"), ts("2020-07-01")),
+                                (ts("2020-08-01"), ts("2020-09-01"))]
+    expected = source.data.loc["2020-02-01":"2020-08-31"]
+    np.testing.assert_array_equal(data["Close"].to_numpy(), expected["Close"].to_numpy())
+    assert data.index.is_monotonic_increasing and not data.index.duplicated().any()
+
+
+def test_empty_range_is_recorded(tmp_path):
+    source = FakeSource(empty=True)
+    cache = OHLCVCache(root=str(tmp_path), source=source, offline=False)
+    assert cache.download("DELISTED", start="2020-03-01", end="2020-06-01").empty
+    assert cache.download("DELISTED", start="2020-03-01", end="2020-06-01").empty
+    assert len(source.calls) == 1
+    _, _, meta = cache.load_columns("DELISTED")
+    assert meta["covered"] == [[str(ts("2020-03-01")), str(ts("2020-06-01"))]]
+
+
+def test_future_end_is_not_marked_covered(tmp_path):
+    source = FakeSource(empty=True)
+    cache = OHLCVCache(root=str(tmp_path), source=source, offline=False)
+    today = pd.Timestamp.now().normalize()
+    cache.download("AAPL", start=today - pd.Timedelta(days=10), end=today + pd.Timedelta(days=5))
+    cache.download("AAPL", start=today - pd.Timedelta(days=10), end=today + pd.Timedelta(days=5))
+    # Seule la partie à partir d'aujourd'hui est redemandée
+    assert source.calls[1] == (today, today + pd.Timedelta(days=5))
+
+
+def test_offline_never_fetches(tmp_path):
+    source = FakeSource()
+    cache = OHLCVCache(root=str(tmp_path), source=source, offline=True)
+    assert cache.download("AAPL", start="2020-03-01", end="2020-06-01").empty
+    assert source.calls == []
+
+
+def test_source_failure(tmp_path):
+    source = FakeSource()
+    cache = OHLCVCache(root=str(tmp_path), source=source, offline=False)
+    cached = cache.download("AAPL", start="2020-03-01", end="2020-06-01")
+    source.fail = True
+    with pytest.warns(RuntimeWarning):
+        data = cache.download("AAPL", start="2020-01-01", end="2020-06-01")
+    pd.testing.assert_frame_equal(data.loc["2020-03-01":], cached)
+    with pytest.raises(ConnectionError):
+        cache.download("MSFT", start="2020-01-01", end="2020-06-01")
+
+
+def test_prices_are_adjusted_by_default(tmp_path):
+    source = FakeSource()
+    cache = OHLCVCache(root=str(tmp_path), source=source, offline=False)
+    raw = cache.download("AAPL", start="2020-03-01", end="2020-04-01", auto_adjust=False)
+    adjusted = cache.download("AAPL", start="2020-03-01", end="2020-04-01")
+    assert "Adj Close" in raw and "Adj Close" not in adjusted
+    np.testing.assert_allclose(adjusted["Close"], raw["Adj Close"])
+    np.testing.assert_allclose(adjusted["High"], raw["High"] / 2)
+    np.testing.assert_allclose(adjusted["Volume"], raw["Volume"])
+
+
+def test_adjust_prices_without_adjusted_column():
+    frame = pd.DataFrame({"Close": [1.0, 2.0]})
+    assert adjust_prices(frame) is frame
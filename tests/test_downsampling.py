@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsampling import decimate, lttb_indices, minmax_indices, visible_slice, x_range_from_relayout
+
+
+def reference_lttb(x, y, n_out):
+    """Boucle LTTB de référence (Steinarsson), un paquet après l'autre."""
+    n = len(y)
+    selected, a = [0], 0
+    for i in range(n_out - 2):
+        start, end = i * (n - 2) // (n_out - 2) + 1, (i + 1) * (n - 2) // (n_out - 2) + 1
+        next_end = min((i + 2) * (n - 2) // (n_out - 2) + 1, n)
+        avg_x, avg_y = np.mean(x[end:next_end]), np.mean(y[end:next_end])
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    return np.array(selected + [n - 1])
+
+
+def random_walk(n, seed=0):
+    return np.random.default_rng(seed).normal(0, 1, n).cumsum()
+
+
+@pytest.mark.parametrize("n, n_out", [(1000, 100), (1001, 37), (5000, 3), (250, 249)])
+def test_lttb_matches_reference(n, n_out):
+    x = np.sort(np.random.default_rng(n).uniform(0, 100, n))
+    y = random_walk(n, seed=n_out)
+    indices = lttb_indices(x, y, n_out)
+    np.testing.assert_array_equal(indices, reference_lttb(x, y, n_out))
+    # Taille exacte, indices strictement croissants, extrémités conservées
+    assert len(indices) == n_out and (np.diff(indices) > 0).all()
+    assert indices[0] == 0 and indices[-1] == n - 1
+
+
+def test_lttb_keeps_everything_when_small_enough():
+    y = random_walk(50)
+    np.testing.assert_array_equal(lttb_indices(np.arange(50), y, 50), np.arange(50))
+    np.testing.assert_array_equal(lttb_indices(np.arange(50), y, 2), np.arange(50))
+
+
+def test_lttb_accepts_dates():
+    dates = pd.date_range("2024-01-01", periods=2000, freq="min").to_numpy()
+    y = random_walk(2000, seed=1)
+    np.testing.assert_array_equal(lttb_indices(dates, y, 120), lttb_indices(np.arange(2000) * 60.0, y, 120))
+
+
+@pytest.mark.parametrize("n, n_out", [(1000, 100), (1001, 37), (997, 4), (10_000, 1920), (30, 29)])
+def test_minmax_size_endpoints_and_extremes(n, n_out):
+    y = random_walk(n, seed=n_out)
+    indices = minmax_indices(y, n_out)
+    assert len(indices) <= n_out and (np.diff(indices) > 0).all()
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert y.argmin() in indices and y.argmax() in indices
+    # Chaque paquet garde son minimum et son maximum
+    size = -(-n // max((n_out - 2) // 2, 1)) if n > n_out else 1
+    for start in range(0, n, size):
+        kept = y[indices[(indices >= start) & (indices < start + size)]]
+        assert kept.min() == y[start:start + size].min() and kept.max() == y[start:start + size].max()
+
+
+def test_minmax_keeps_isolated_spikes():
+    y = np.zeros(100_000)
+    spikes = [17, 31_234, 64_000, 99_998]
+    y[spikes] = [50.0, -80.0, 120.0, -3.0]
+    kept = minmax_indices(y, 200)
+    assert set(spikes) <= set(kept) and len(kept) <= 200
+
+
+def test_decimate_visible_range_and_methods():
+    x = np.arange(10_000, dtype=float)
+    y = random_walk(10_000, seed=2)
+    dx, dy = decimate(x, y, 100, method="minmax", x_range=(2000.0, 3000.0))
+    lo, hi = visible_slice(x, (2000.0, 3000.0))
+    assert (lo, hi) == (1999, 3002)
+    assert dx[0] == 1999 and dx[-1] == 3001 and len(dx) <= 100
+    assert dy.max() == y[lo:hi].max() and dy.min() == y[lo:hi].min()
+    lx, ly = decimate(x, y, 100)
+    assert len(lx) == 100 and lx[0] == 0 and lx[-1] == 9999
+    np.testing.assert_array_equal(ly, y[lx.astype(int)])
+    with pytest.raises(ValueError):
+        decimate(x, y, 100, method="every_nth")
+
+
+def test_visible_slice_with_dates():
+    dates = pd.date_range("2024-01-01", periods=100, freq="D").to_numpy()
+    assert visible_slice(dates, ("2024-01-10", "2024-01-20")) == (8, 21)
+    assert visible_slice(dates, None) == (0, 100)
+
+
+def test_x_range_from_relayout():
+    assert x_range_from_relayout(None) is None
+    assert x_range_from_relayout({"xaxis.autorange": True}) is None
+    assert x_range_from_relayout({"xaxis.range[0]": 1, "xaxis.range[1]": 2}) == (1, 2)
+    assert x_range_from_relayout({"xaxis.range": [3, 4]}) == (3, 4)
+    assert x_range_from_relayout({"yaxis.range[0]": 0}) is None
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from event_backtester import (BAR_DTYPE, FILL_DTYPE, FillLedger, fills_frame, run_backtest, sma_crossover_strategy,
+                              summarize, to_bars)
+
+
+def make_bars(opens, closes=None, volumes=None):
+    n = len(opens)
+    bars = np.zeros(n, dtype=BAR_DTYPE)
+    bars["open_time"] = 1_700_000_000_000 + np.arange(n) * 60_000
+    bars["open"] = opens
+    bars["close"] = opens if closes is None else closes
+    bars["high"] = np.maximum(bars["open"], bars["close"])
+    bars["low"] = np.minimum(bars["open"], bars["close"])
+    bars["volume"] = 1e9 if volumes is None else volumes
+    return bars
+
+
+def targets_strategy(targets):
+    """Stratégie qui renvoie des positions cibles fixées d'avance."""
+    targets = np.asarray(targets, dtype=float)
+    return lambda bars, start, end: targets[start:end]
+
+
+def test_fill_at_next_open_with_costs():
+    bars = make_bars([100.0, 101.0, 102.0, 103.0], closes=[100.5, 101.5, 102.5, 103.5])
+    equity, fills = run_backtest(bars, targets_strategy([2.0, np.nan, 0.0, np.nan]), initial_cash=1000.0,
+                                 fee_rate=0.001, slippage_bps=10.0)
+    assert fills["bar"].tolist() == [1, 3]
+    assert fills["quantity"].tolist() == [2.0, -2.0]
+    buy, sell = 101.0 * 1.001, 103.0 * 0.999
+    np.testing.assert_allclose(fills["price"], [buy, sell])
+    np.testing.assert_allclose(fills["fee"], [2 * buy * 0.001, 2 * sell * 0.001])
+    np.testing.assert_allclose(fills["slippage"], [2 * 101.0 * 0.001, 2 * 103.0 * 0.001])
+    assert fills["time"].tolist() == bars["open_time"][[1, 3]].tolist()
+
+    cash_after_buy = 1000.0 - 2 * buy - fills["fee"][0]
+    np.testing.assert_allclose(equity["position"], [0, 2, 2, 0])
+    np.testing.assert_allclose(equity["cash"], [1000.0, cash_after_buy, cash_after_buy,
+                                                cash_after_buy + 2 * sell - fills["fee"][1]])
+    np.testing.assert_allclose(equity["equity"], equity["cash"] + equity["position"] * bars["close"])
+    assert equity.index[0] == pd.Timestamp(bars["open_time"][0], unit="ms")
+
+
+def test_latency_and_repeated_targets():
+    bars = make_bars(np.arange(1.0, 11.0))
+    _, fills = run_backtest(bars, targets_strategy([1, 1, 1, np.nan, 3, 3, np.nan, np.nan, np.nan, np.nan]),
+                            latency=3, fee_rate=0.0, slippage_bps=0.0)
+    # Une cible répétée ne crée pas de nouvel ordre ; exécution 3 barres après la décision
+    assert fills["bar"].tolist() == [3, 7]
+    assert fills["quantity"].tolist() == [1.0, 2.0]
+    np.testing.assert_allclose(fills["price"], [4.0, 8.0])
+    with pytest.raises(ValueError):
+        run_backtest(bars, targets_strategy([np.nan] * 10), latency=0)
+
+
+def test_orders_arriving_after_last_bar_are_dropped():
+    bars = make_bars([1.0, 2.0, 3.0])
+    _, fills = run_backtest(bars, targets_strategy([np.nan, np.nan, 5.0]))
+    assert len(fills) == 0
+
+
+def test_partial_participation_and_replacement():
+    volumes = [10.0, 4.0, 4.0, 0.0, 4.0, 4.0, 4.0, 4.0, 4.0, 4.0]
+    bars = make_bars(np.full(10, 10.0), volumes=volumes)
+    # Cible 5 décidée à la barre 0, remplacée par 1 à la barre 5 : au plus 2 unités par barre
+    targets = [5.0, np.nan, np.nan, np.nan, np.nan, 1.0, np.nan, np.nan, np.nan, np.nan]
+    equity, fills = run_backtest(bars, targets_strategy(targets), fee_rate=0.0, slippage_bps=0.0, participation=0.5)
+    # Barre 3 sans volume : rien n'est exécuté, le reliquat attend
+    assert fills["bar"].tolist() == [1, 2, 4, 6, 7]
+    assert fills["quantity"].tolist() == [2.0, 2.0, 1.0, -2.0, -2.0]
+    np.testing.assert_allclose(equity["position"], [0, 2, 4, 4, 5, 5, 3, 1, 1, 1])
+
+
+def test_partial_fill_stops_at_new_target():
+    bars = make_bars(np.full(6, 10.0), volumes=np.full(6, 2.0))
+    targets = [3.0, np.nan, 1.0, np.nan, np.nan, np.nan]
+    _, fills = run_backtest(bars, targets_strategy(targets), participation=1.0)
+    # 2 à la barre 1, puis la nouvelle cible (1) arrive à la barre 3 : vente d'une unité
+    assert fills["bar"].tolist() == [1, 2, 3]
+    assert fills["quantity"].tolist() == [2.0, 1.0, -2.0]
+
+
+def test_impact_grows_with_size():
+    bars = make_bars([100.0, 100.0, 100.0], volumes=[1000.0, 1000.0, 1000.0])
+    _, fills = run_backtest(bars, targets_strategy([50.0, np.nan, np.nan]), slippage_bps=0.0, impact=0.1)
+    np.testing.assert_allclose(fills["price"], [100.0 * (1 + 0.1 * 50 / 1000)])
+
+
+def test_chunked_strategy_matches_single_call():
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 3000)))
+    bars = make_bars(np.concatenate([[100.0], close[:-1]]), closes=close, volumes=rng.uniform(1, 5, 3000))
+    strategy = sma_crossover_strategy(10, 50, size=3.0)
+    one = run_backtest(bars, strategy, participation=0.5)
+    chunked = run_backtest(bars, strategy, participation=0.5, chunk_size=137)
+    pd.testing.assert_frame_equal(one[0], chunked[0])
+    np.testing.assert_array_equal(one[1], chunked[1])
+    assert len(one[1]) > 10
+
+
+def test_ledger_grows_and_frame():
+    ledger = FillLedger(capacity=2)
+    for i in range(5):
+        ledger.append(i, 60_000 * i, 1.0 + i, 10.0, 0.01, 0.001)
+    assert ledger.size == 5 and ledger.fills["bar"].tolist() == [0, 1, 2, 3, 4]
+    assert ledger.fills["quantity"].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    frame = fills_frame(ledger.fills)
+    assert frame["time"].iloc[1] == pd.Timestamp(60_000, unit="ms") and len(frame) == 5
+
+
+def test_to_bars_from_frame():
+    frame = pd.DataFrame({"open_time": [0, 60_000], "open": [1.0, 2.0], "high": [2.0, 3.0], "low": [0.5, 1.5],
+                          "close": [1.5, 2.5], "volume": [10.0, 20.0], "trades": [1, 2]})
+    bars = to_bars(frame)
+    assert bars.dtype == BAR_DTYPE and bars["close"].tolist() == [1.5, 2.5]
+
+
+def test_summarize_measures_from_initial_capital():
+    equity = pd.DataFrame({"equity": [9000.0, 9500.0, 11000.0, 9900.0]})
+    equity.attrs["initial_cash"] = 10_000.0
+    fills = np.zeros(0, dtype=FILL_DTYPE)
+    stats = summarize(equity, fills)
+    # Perte dès la première barre : comptée dans le rendement et le drawdown
+    assert stats["total_return"] == pytest.approx(-0.01)
+    assert stats["max_drawdown"] == pytest.approx(-0.1)
+    assert summarize(equity, fills, initial_cash=9000.0)["total_return"] == pytest.approx(0.1)
+
+
+def test_summarize_backtest_includes_costs():
+    bars = make_bars([100.0] * 5)
+    equity, fills = run_backtest(bars, targets_strategy([10.0, np.nan, 0.0, np.nan, np.nan]), initial_cash=1000.0,
+                                 fee_rate=0.01, slippage_bps=0.0)
+    stats = summarize(equity, fills)
+    assert stats["fills"] == 2 and stats["fees"] == pytest.approx(20.0)
+    assert stats["total_return"] == pytest.approx(-0.02)
+    assert stats["max_drawdown"] == pytest.approx(-0.02)
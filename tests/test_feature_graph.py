@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from feature_graph import FEATURES, FeatureGraph
+
+
+def exact_rolling_std(series, window):
+    """Écart-type (ddof=1) calculé fenêtre par fenêtre, référence plus précise que pandas aux petites fenêtres."""
+    out = np.full(len(series), np.nan)
+    if window > 1:
+        out[window - 1:] = sliding_window_view(series.to_numpy(), window).std(axis=1, ddof=1)
+    return pd.Series(out, index=series.index, name="rolling_std")
+
+
+def price_series(n=1000, seed=0, gaps=False):
+    rng = np.random.default_rng(seed)
+    values = 1e4 + np.cumsum(rng.normal(0, 5, n))  # Prix élevés : teste la précision des sommes cumulées
+    if gaps:
+        values[rng.choice(n, 30, replace=False)] = np.nan
+    return pd.Series(values, index=pd.date_range("2020-01-01", periods=n), name="Close")
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+@pytest.mark.parametrize("window", [1, 2, 20, 250])
+def test_rolling_statistics_match_pandas(window, gaps):
+    series = price_series(gaps=gaps)
+    graph = FeatureGraph(series)
+    rolling = series.rolling(window)
+    pd.testing.assert_series_equal(graph.get("rolling_mean", window), rolling.mean().rename("rolling_mean"),
+                                   rtol=1e-9)
+    pd.testing.assert_series_equal(graph.get("rolling_std", window), exact_rolling_std(series, window),
+                                   rtol=1e-8, atol=1e-9)
+    pd.testing.assert_series_equal(graph.get("momentum", window), series.diff(window).rename("momentum"))
+    pd.testing.assert_series_equal(graph.get("mean_reversion", window),
+                                   (series - rolling.mean()).rename("mean_reversion"), rtol=1e-9, atol=1e-8)
+
+
+def test_panel_matches_column_by_column():
+    panel = pd.DataFrame({"A": price_series(seed=1, gaps=True), "B": price_series(seed=2)})
+    graph = FeatureGraph(panel)
+    zscore = graph.get("zscore", 30)
+    assert list(zscore.columns) == ["A", "B"] and zscore.index.equals(panel.index)
+    for column in panel:
+        expected = FeatureGraph(panel[column]).get("zscore", 30)
+        np.testing.assert_allclose(zscore[column], expected, rtol=1e-12, equal_nan=True)
+
+
+def test_shared_nodes_are_computed_once():
+    graph = FeatureGraph(price_series())
+    graph.get("rolling_mean", 20)
+    first = graph.computed
+    # Même nœud : servi depuis le cache
+    graph.get("rolling_mean", 20)
+    assert graph.computed == first
+    # Autre fenêtre : les sommes cumulées sont réutilisées, seuls les nœuds fenêtrés sont calculés
+    graph.get("rolling_mean", 50)
+    assert graph.computed == first + 4  # rolling_complete, centered_sum, rolling_sum, rolling_mean
+    # Le z-score réutilise la moyenne glissante déjà calculée
+    graph.get("zscore", 50)
+    assert ("rolling_mean", 50) in graph._cache and graph.computed == first + 4 + 6
+    assert graph._cache[("prefix_sum", None)] is graph._node("prefix_sum")
+
+
+def test_clear_invalidates_cache():
+    series = price_series()
+    graph = FeatureGraph(series)
+    before = graph.get("rolling_std", 10)
+    computed = graph.computed
+    graph.clear()
+    assert graph._cache == {}
+    after = graph.get("rolling_std", 10)
+    assert graph.computed == 2 * computed
+    pd.testing.assert_series_equal(before, after)
+
+
+def test_get_many_and_errors():
+    series = price_series(200)
+    graph = FeatureGraph(series)
+    frame = graph.get_many("momentum", [1, 5, 10])
+    assert list(frame.columns) == [1, 5, 10]
+    np.testing.assert_allclose(frame[5], series.diff(5), equal_nan=True)
+    with pytest.raises(ValueError):
+        graph.get("unknown", 5)
+    with pytest.raises(ValueError):
+        graph.get("rolling_mean")
+    with pytest.raises(ValueError):
+        FeatureGraph(series.to_frame()).get_many("momentum", [5])
+    assert {"momentum", "mean_reversion", "zscore"} <= set(FEATURES)
+
+
+def test_window_longer_than_series():
+    graph = FeatureGraph(price_series(10))
+    assert graph.get("rolling_mean", 20).isna().all()
+    assert graph.get("momentum", 20).isna().all()
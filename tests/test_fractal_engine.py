@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fractal_engine import find_fractals, find_fractals_frame, pivot_mask
+
+
+def reference_pivots(values, window, greater):
+    """Boucle de référence : barre centrale strictement au-dessus (au-dessous) de toutes ses voisines."""
+    half = window // 2
+    mask = np.zeros(len(values), dtype=bool)
+    for i in range(half, len(values) - half):
+        neighbours = [values[j] for j in range(i - half, i + half + 1) if j != i]
+        mask[i] = all(values[i] > v for v in neighbours) if greater else all(values[i] < v for v in neighbours)
+    return mask
+
+
+def random_bars(n, seed, ties=False):
+    rng = np.random.default_rng(seed)
+    high = rng.normal(0, 1, n).cumsum()
+    if ties:
+        high = np.round(high)  # Nombreuses égalités entre barres voisines
+    low = high - rng.uniform(0, 2, n)
+    if ties:
+        low = np.round(low)
+    return high, low
+
+
+@pytest.mark.parametrize("window", [3, 5, 7])
+@pytest.mark.parametrize("ties", [False, True])
+def test_matches_reference_loop(window, ties):
+    high, low = random_bars(2000, seed=window, ties=ties)
+    bullish, bearish = find_fractals(high, low, window)
+    np.testing.assert_array_equal(bearish, reference_pivots(high, window, greater=True))
+    np.testing.assert_array_equal(bullish, reference_pivots(low, window, greater=False))
+
+
+@pytest.mark.parametrize("window", [3, 5, 7])
+def test_pivot_mask_is_one_side_of_find_fractals(window):
+    high, low = random_bars(500, seed=1)
+    bullish, bearish = find_fractals(high, low, window)
+    np.testing.assert_array_equal(pivot_mask(high, window, greater=True), bearish)
+    np.testing.assert_array_equal(pivot_mask(low, window, greater=False), bullish)
+
+
+def test_ties_are_not_pivots():
+    # Deux sommets égaux côte à côte : aucun n'est strictement au-dessus de ses voisins
+    high = np.array([1.0, 2.0, 4.0, 4.0, 2.0, 1.0, 3.0, 1.0])
+    assert pivot_mask(high, 3).tolist() == [False, False, False, False, False, False, True, False]
+    assert not pivot_mask(np.ones(50), 5).any() and not pivot_mask(np.ones(50), 5, greater=False).any()
+
+
+def test_edges_and_short_series():
+    high = np.array([5.0, 1.0, 2.0, 9.0, 2.0, 1.0, 7.0])
+    assert pivot_mask(high, 5).tolist() == [False, False, False, True, False, False, False]
+    assert not pivot_mask(high[:4], 5).any()
+    assert pivot_mask(high[:0], 3).shape == (0,)
+
+
+def test_panel_along_either_axis():
+    rng = np.random.default_rng(2)
+    panel = rng.normal(size=(4, 300)).cumsum(axis=1)
+    by_row = pivot_mask(panel, 5)
+    for i, row in enumerate(panel):
+        np.testing.assert_array_equal(by_row[i], reference_pivots(row, 5, greater=True))
+    np.testing.assert_array_equal(pivot_mask(panel.T, 5, axis=0), by_row.T)
+
+
+def test_frame_version_keeps_labels():
+    index = pd.date_range("2024-01-01", periods=100)
+    high = pd.DataFrame(np.random.default_rng(3).normal(size=(100, 2)).cumsum(axis=0), index=index, columns=["A", "B"])
+    low = high - 1
+    bullish, bearish = find_fractals_frame(high, low, window=5)
+    assert bearish.index.equals(index) and list(bearish.columns) == ["A", "B"]
+    np.testing.assert_array_equal(bearish["A"].to_numpy(), reference_pivots(high["A"].to_numpy(), 5, True))
+    np.testing.assert_array_equal(bullish["B"].to_numpy(), reference_pivots(low["B"].to_numpy(), 5, False))
+
+
+@pytest.mark.parametrize("window", [1, 2, 4])
+def test_invalid_window(window):
+    with pytest.raises(ValueError):
+        pivot_mask(np.arange(10.0), window)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from fractional_brownian import fbm, fgn, fgn_autocovariance
+
+
+def test_autocovariance_known_values():
+    np.testing.assert_allclose(fgn_autocovariance(0.5, 5), [1, 0, 0, 0, 0], atol=1e-15)
+    gamma = fgn_autocovariance(0.8, 3)
+    assert gamma[0] == 1.0
+    assert gamma[1] == pytest.approx(0.5 * (2 ** 1.6 - 2))
+
+
+@pytest.mark.parametrize("H", [0.2, 0.5, 0.75, 0.95])
+def test_empirical_autocovariance_matches_theory(H):
+    # Moyenne sur les trajectoires, aux décalages de 0 à 5
+    series = fgn(256, H, n_paths=20_000, seed=0)
+    lags = 6
+    empirical = [np.mean(series[:, :256 - k] * series[:, k:]) for k in range(lags)]
+    np.testing.assert_allclose(empirical, fgn_autocovariance(H, lags), atol=0.02)
+
+
+def test_sigma_and_shapes():
+    assert fgn(100, 0.7, seed=1).shape == (100,)
+    assert fgn(100, 0.7, n_paths=3, seed=1).shape == (3, 100)
+    series = fgn(1000, 0.3, n_paths=200, sigma=2.5, seed=2)
+    assert series.std() == pytest.approx(2.5, rel=0.02)
+
+
+def test_seed_reproducible():
+    np.testing.assert_array_equal(fgn(64, 0.6, n_paths=2, seed=3), fgn(64, 0.6, n_paths=2, seed=3))
+    assert not np.array_equal(fgn(64, 0.6, seed=3), fgn(64, 0.6, seed=4))
+
+
+def test_fbm_variance_scaling():
+    # Var(B_H(t)) = t^(2H)
+    H = 0.7
+    paths = fbm(128, H, n_paths=20_000, seed=5)
+    t = np.array([1, 8, 32, 128])
+    np.testing.assert_allclose(paths[:, t - 1].var(axis=0), t ** (2 * H), rtol=0.05)
+
+
+@pytest.mark.parametrize("H", [0.0, 1.0, -0.1])
+def test_invalid_hurst(H):
+    with pytest.raises(ValueError):
+        fgn(16, H)
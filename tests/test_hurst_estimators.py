@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from fractional_brownian import fbm, fgn
+from hurst_estimators import METHODS, MIN_BLOCKS, default_scales, estimate_hurst
+
+# Écart toléré entre la moyenne des estimations sur 8 trajectoires et le H du générateur
+# (R/S surestime un peu les H faibles, la variance agrégée sous-estime un peu les H forts)
+TOLERANCE = 0.07
+
+
+@pytest.fixture(scope="module")
+def paths():
+    return {H: fgn(2 ** 16, H, n_paths=8, seed=int(H * 10)) for H in (0.3, 0.5, 0.8)}
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("H", [0.3, 0.5, 0.8])
+def test_estimators_recover_known_hurst(paths, method, H):
+    estimates = estimate_hurst(paths[H], method=method, kind="change")[0]
+    assert abs(estimates.mean() - H) < TOLERANCE
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_estimates_increase_with_hurst(paths, method):
+    means = [estimate_hurst(paths[H], method=method, kind="change")[0].mean() for H in (0.3, 0.5, 0.8)]
+    assert means[0] < means[1] < means[2]
+
+
+def test_aggvar_scales_keep_enough_blocks():
+    n = 10_000
+    _, _, scales, _ = estimate_hurst(fgn(n, 0.5, seed=0), method="aggvar", kind="change")
+    assert scales.max() <= n // MIN_BLOCKS["aggvar"]
+    # Les échelles explicites trop grandes sont écartées elles aussi
+    _, _, scales, _ = estimate_hurst(fgn(n, 0.5, seed=0), method="aggvar", kind="change", scales=[10, 100, 5000])
+    assert list(scales) == [10, 100]
+
+
+def test_default_scales_bounds():
+    scales = default_scales(1000)
+    assert scales[0] == 10 and scales[-1] <= 500
+    assert default_scales(1000, min_blocks=10)[-1] <= 100
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_panel_matches_single_series(method):
+    panel = 100 * np.exp(fbm(4096, 0.6, n_paths=3, sigma=0.01, seed=3))
+    H_panel = estimate_hurst(panel, method=method)[0]
+    H_single = [estimate_hurst(series, method=method)[0] for series in panel]
+    np.testing.assert_allclose(H_panel, H_single)
+
+
+def test_kinds_agree_on_random_walk():
+    increments = fgn(4096, 0.7, seed=4)
+    walk = np.concatenate([[0.0], np.cumsum(increments)])
+    H_change = estimate_hurst(increments, method="dfa", kind="change")[0]
+    H_walk = estimate_hurst(walk, method="dfa", kind="random_walk")[0]
+    assert H_change == pytest.approx(H_walk)
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        estimate_hurst(np.arange(1.0, 20.0))
+    with pytest.raises(ValueError):
+        estimate_hurst(np.arange(1.0, 2000.0), method="unknown")
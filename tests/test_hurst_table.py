@@ -0,0 +1,184 @@
+import math
+
+import numpy as np
+import pytest
+
+from binance_client import kline_dtype
+from hurst_estimators import estimate_hurst
+from hurst_table import HurstTable
+from timeframes import resample_klines
+
+MINUTE = 60_000
+START = 1_700_000_000_000 // 3_600_000 * 3_600_000
+
+
+class FakeMarket:
+    """Historique 1m synthétique par symbole, dont seules les `now` premières klines sont publiées."""
+
+    def __init__(self, symbols, n=6000, now=3000):
+        self.history = {symbol: self._klines(n, seed) for seed, symbol in enumerate(symbols)}
+        self.now = now
+        self.failing = set()
+        self.calls = []
+
+    @staticmethod
+    def _klines(n, seed):
+        rng = np.random.default_rng(seed)
+        klines = np.zeros(n, dtype=kline_dtype())
+        klines["open_time"] = START + np.arange(n) * MINUTE
+        klines["close_time"] = klines["open_time"] + MINUTE - 1
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+        klines["open"] = np.concatenate([[100.0], close[:-1]])
+        klines["close"] = close
+        klines["high"] = np.maximum(klines["open"], close)
+        klines["low"] = np.minimum(klines["open"], close)
+        klines["volume"] = rng.random(n)
+        return klines
+
+    def published(self, symbol):
+        return self.history[symbol][:self.now]
+
+    def fetch_many(self, queries):
+        self.calls.append(queries)
+        results = []
+        for query in queries:
+            symbol, interval, limit = query["symbol"], query["interval"], query["limit"]
+            if symbol in self.failing:
+                results.append(ConnectionError(f"{symbol} indisponible"))
+                continue
+            klines = self.published(symbol)
+            if interval != "1m":
+                klines = resample_klines(klines, interval)
+            if "start_time" in query:
+                results.append(klines[klines["open_time"] >= query["start_time"]][:limit])
+            else:
+                results.append(klines[-limit:])
+        return results
+
+
+def expected_close(market, symbol, interval, limit):
+    klines = market.published(symbol)
+    if interval != "1m":
+        klines = resample_klines(klines, interval)
+    return klines["close"][-limit:]
+
+
+def make_table(market, limit=200, intervals=("1m", "5m")):
+    ticks = iter(range(1, 1000))
+    return HurstTable(list(market.history), list(intervals), limit=limit, fetch_many=market.fetch_many,
+                      timer=lambda: next(ticks))
+
+
+def assert_matches_market(table, market):
+    for symbol, interval in table.keys():
+        entry = table.get(symbol, interval)
+        close = expected_close(market, symbol, interval, table.limit)
+        np.testing.assert_allclose(entry["data"]["Close"].to_numpy(), close, rtol=1e-12)
+        assert entry["hurst"] == pytest.approx(estimate_hurst(close, method="rs", kind="price")[0], abs=1e-12)
+
+
+def test_first_load_seeds_native_history():
+    market = FakeMarket(["AAAUSDT", "BBBUSDT"])
+    table = make_table(market)
+    assert table.refresh_once() == 4
+    assert table.wait_ready(0)
+
+    (queries,) = market.calls
+    assert all("start_time" not in q for q in queries)
+    assert sorted((q["symbol"], q["interval"]) for q in queries) == sorted(table.keys())
+    # 200 barres de 5m : seules les 40 dernières sont couvertes par les klines 1m, le reste vient de l'historique natif
+    assert_matches_market(table, market)
+    entry = table.get("AAAUSDT", "5m")
+    assert len(entry["data"]) == 200 and entry["version"] == 1 and entry["error"] is None
+    assert entry["updated_at"] == 1
+
+
+def test_incremental_refresh_requests_only_new_base_klines():
+    market = FakeMarket(["AAAUSDT", "BBBUSDT"])
+    table = make_table(market)
+    table.refresh_once()
+    last_open = {symbol: int(market.published(symbol)["open_time"][-1]) for symbol in market.history}
+
+    market.now += 3
+    assert table.refresh_once() == 4
+    queries = market.calls[-1]
+    assert [(q["symbol"], q["interval"], q["start_time"]) for q in queries] == [
+        (symbol, "1m", last_open[symbol]) for symbol in market.history]
+    assert_matches_market(table, market)
+    assert table.get("AAAUSDT", "1m")["version"] == 2
+
+
+def test_versions_only_bump_on_change():
+    market = FakeMarket(["AAAUSDT"])
+    table = make_table(market, intervals=("1m", "15m"))
+    table.refresh_once()
+    before = {key: table.get(*key) for key in table.keys()}
+
+    # Aucune kline nouvelle : la dernière (toujours ouverte) est redemandée, identique
+    assert table.refresh_once() == 0
+    assert all(table.get(*key) is before[key] for key in table.keys())
+
+    # Une minute de plus : la barre 1m change, la barre 15m en cours aussi
+    market.now += 1
+    assert table.refresh_once() == 2
+    assert [table.get(*key)["version"] for key in table.keys()] == [2, 2]
+    assert table.refreshes == 3
+
+
+def test_gap_reloads_symbol_when_page_is_full():
+    market = FakeMarket(["AAAUSDT"])
+    table = make_table(market)
+    table.refresh_once()
+
+    market.now += 1000  # Interruption plus longue qu'une page de 200 klines
+    table.refresh_once()
+    incremental, reload = market.calls[-2:]
+    assert [q["interval"] for q in incremental] == ["1m"] and "start_time" in incremental[0]
+    assert all("start_time" not in q for q in reload)
+    assert {q["interval"] for q in reload} == {"1m", "5m"}
+    assert_matches_market(table, market)
+
+
+def test_failed_pair_keeps_previous_entry():
+    market = FakeMarket(["AAAUSDT", "BBBUSDT"])
+    table = make_table(market)
+    table.refresh_once()
+    previous = table.get("BBBUSDT", "1m")
+
+    market.now += 5
+    market.failing = {"BBBUSDT"}
+    with pytest.warns(RuntimeWarning, match="BBBUSDT"):
+        assert table.refresh_once() == 2
+    failed = table.get("BBBUSDT", "1m")
+    assert failed["data"] is previous["data"] and failed["version"] == previous["version"]
+    assert isinstance(failed["error"], ConnectionError)
+    assert table.get("AAAUSDT", "1m")["version"] == 2 and table.get("AAAUSDT", "1m")["error"] is None
+
+    market.failing = set()
+    table.refresh_once()
+    recovered = table.get("BBBUSDT", "1m")
+    assert recovered["error"] is None and recovered["version"] == previous["version"] + 1
+    assert_matches_market(table, market)
+
+
+def test_hurst_frame_shape_and_missing_values():
+    market = FakeMarket(["AAAUSDT", "BBBUSDT"])
+    table = make_table(market)
+    frame = table.hurst_frame()
+    assert frame.shape == (2, 2) and frame.isna().all().all()
+
+    market.failing = {"BBBUSDT"}
+    with pytest.warns(RuntimeWarning):
+        table.refresh_once()
+    frame = table.hurst_frame()
+    assert list(frame.index) == ["AAAUSDT", "BBBUSDT"] and list(frame.columns) == ["1m", "5m"]
+    assert frame.loc["AAAUSDT"].notna().all() and frame.loc["BBBUSDT"].isna().all()
+    assert frame.loc["AAAUSDT", "1m"] == table.get("AAAUSDT", "1m")["hurst"]
+
+
+def test_series_too_short_for_hurst():
+    market = FakeMarket(["AAAUSDT"])
+    table = make_table(market, limit=20)
+    table.refresh_once()
+    assert math.isnan(table.get("AAAUSDT", "1m")["hurst"])
+    assert len(table.get("AAAUSDT", "1m")["data"]) == 20
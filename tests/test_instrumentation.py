@@ -0,0 +1,137 @@
+import asyncio
+import json
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import instrumentation
+from instrumentation import BUCKETS, CALLBACK, COMPUTE, FETCH
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+
+def spans():
+    return {s["name"]: s for s in instrumentation.snapshot()["spans"]}
+
+
+def test_histogram_buckets_use_inclusive_upper_bounds():
+    for elapsed in (0.0001, 0.0005, 0.0007, 0.001, 0.3, 100.0):
+        instrumentation._observe("io", FETCH, elapsed, False, None)
+    s = spans()["io"]
+    assert s["count"] == 6 and s["max_seconds"] == 100.0
+    assert s["sum_seconds"] == pytest.approx(100.3023)
+    buckets = s["buckets"]
+    assert list(buckets) == [str(b) for b in BUCKETS] + ["+Inf"]
+    assert buckets["0.0005"] == 2 and buckets["0.001"] == 4 and buckets["0.25"] == 4
+    assert buckets["0.5"] == 5 and buckets["30.0"] == 5 and buckets["+Inf"] == 6
+
+
+def test_quantile_returns_bucket_bound():
+    metrics = instrumentation._SpanMetrics("x", COMPUTE)
+    assert metrics.quantile(0.5) is None
+    for elapsed in [0.002] * 90 + [0.2] * 9 + [60.0]:
+        metrics.observe(elapsed, False, None)
+    assert metrics.quantile(0.5) == 0.0025
+    assert metrics.quantile(0.9) == 0.0025
+    assert metrics.quantile(0.95) == 0.25
+    assert metrics.quantile(1.0) == 60.0  # Au-delà du dernier seau : maximum observé
+
+
+def test_span_and_decorator_record_calls_and_errors():
+    @instrumentation.instrumented(COMPUTE, name="compute.square")
+    def square(x):
+        if x < 0:
+            raise ValueError(x)
+        return x * x
+
+    assert square(3) == 9
+    with pytest.raises(ValueError):
+        square(-1)
+    with instrumentation.span("block", FETCH):
+        pass
+    s = spans()
+    assert (s["compute.square"]["count"], s["compute.square"]["errors"]) == (2, 1)
+    assert s["block"]["stage"] == FETCH and s["block"]["count"] == 1
+
+
+def test_async_functions_are_measured():
+    @instrumentation.instrumented(FETCH)
+    async def fetch():
+        await asyncio.sleep(0)
+        return 42
+
+    assert asyncio.run(fetch()) == 42
+    (name,) = [n for n in spans() if n.endswith("fetch")]
+    assert spans()[name]["count"] == 1
+
+
+def test_disabled_fast_path():
+    instrumentation.disable()
+    calls = []
+
+    @instrumentation.instrumented(COMPUTE, name="off")
+    def work():
+        calls.append(1)
+        return "ok"
+
+    assert work() == "ok" and calls == [1]
+    assert instrumentation.span("off") is instrumentation._NULL_SPAN
+    with instrumentation.span("off"):
+        pass
+    instrumentation.record_error("off")
+    assert instrumentation.snapshot() == {"enabled": False, "memory": False, "spans": []}
+
+
+def test_record_error_keeps_last_exception_text():
+    instrumentation.record_error("callback", CALLBACK)
+    instrumentation.record_error("callback", CALLBACK, KeyError("BTCUSDT"))
+    s = spans()["callback"]
+    assert s["errors"] == 2 and s["count"] == 0
+    assert s["last_error"] == "KeyError('BTCUSDT')"
+
+
+def test_json_and_prometheus_exports():
+    instrumentation._observe('a"b', COMPUTE, 0.003, False, None)
+    instrumentation._observe('a"b', COMPUTE, 2.0, True, None)
+    data = json.loads(instrumentation.to_json())
+    (s,) = data["spans"]
+    assert data["enabled"] and s["name"] == 'a"b' and s["count"] == 2 and s["errors"] == 1
+    assert s["peak_bytes_max"] is None
+
+    text = instrumentation.to_prometheus()
+    labels = 'span="a\\"b",stage="compute"'
+    assert f'span_duration_seconds_bucket{{{labels},le="0.005"}} 1' in text
+    assert f'span_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"span_duration_seconds_count{{{labels}}} 2" in text
+    assert f"span_duration_seconds_sum{{{labels}}} 2.003" in text
+    assert f"span_errors_total{{{labels}}} 1" in text
+    assert "span_peak_bytes" not in text
+    assert text.endswith("\n")
+
+
+def test_memory_peaks_propagate_to_parent_spans():
+    was_tracing = tracemalloc.is_tracing()
+    instrumentation.enable(memory=True)
+    try:
+        with instrumentation.span("outer"):
+            with instrumentation.span("inner"):
+                block = np.ones(2_000_000)  # 16 Mo
+                del block
+            with instrumentation.span("small"):
+                np.ones(10)
+    finally:
+        instrumentation.disable()
+    s = spans()
+    assert s["inner"]["peak_bytes_max"] >= 16_000_000
+    assert s["outer"]["peak_bytes_max"] >= s["inner"]["peak_bytes_max"]
+    assert s["small"]["peak_bytes_max"] < 1_000_000
+    assert tracemalloc.is_tracing() == was_tracing
+    assert "span_peak_bytes" in instrumentation.to_prometheus()
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from market_data_hub import MarketDataHub
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class BlockingSource:
+    """Source dont chaque appel attend `release` ; renvoie (clé, numéro d'appel)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.fail = False
+
+    def __call__(self, key):
+        self.calls += 1
+        call = self.calls
+        assert self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("source indisponible")
+        return (key, call)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "délai dépassé"
+        time.sleep(0.005)
+
+
+def test_concurrent_first_load_is_coalesced():
+    source = BlockingSource()
+    source.release.clear()
+    hub = MarketDataHub(source)
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(hub.acquire(f"s{i}", "BTC"))) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: source.calls == 1)
+    source.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [("BTC", 1)] * 5 and source.calls == 1
+
+
+def test_expired_entry_is_served_while_refreshing():
+    timer = FakeTimer()
+    source = BlockingSource()
+    hub = MarketDataHub(source, ttl=10, timer=timer)
+    assert hub.acquire("a", "BTC") == ("BTC", 1)
+    timer.now = 11
+    source.release.clear()
+    # Version expirée servie sans attendre, un seul rafraîchissement lancé
+    assert hub.acquire("a", "BTC") == ("BTC", 1)
+    assert hub.acquire("b", "BTC") == ("BTC", 1)
+    wait_for(lambda: source.calls == 2)
+    source.release.set()
+    wait_for(lambda: hub.acquire("a", "BTC") == ("BTC", 2))
+    assert source.calls == 2 and hub.fetches == 2
+
+
+def test_failed_refresh_keeps_previous_data():
+    timer = FakeTimer()
+    source = BlockingSource()
+    hub = MarketDataHub(source, ttl=10, timer=timer)
+    hub.acquire("a", "BTC")
+    timer.now = 11
+    source.fail = True
+    assert hub.acquire("a", "BTC") == ("BTC", 1)
+    wait_for(lambda: hub._entries["BTC"].loading is None)
+    assert hub.acquire("a", "BTC") == ("BTC", 1)
+    with pytest.raises(ConnectionError):
+        hub.acquire("b", "ETH")
+
+
+def test_derived_is_computed_once_per_version():
+    timer = FakeTimer()
+    source = BlockingSource()
+    hub = MarketDataHub(source, ttl=10, timer=timer)
+    computed = []
+    compute = lambda data: computed.append(data) or len(computed)
+    hub.acquire("a", "BTC")
+    hub.acquire("b", "BTC")
+    assert hub.derived("BTC", "n", compute) == 1
+    assert hub.derived("BTC", "n", compute) == 1
+    timer.now = 11
+    hub.acquire("a", "BTC")
+    wait_for(lambda: hub._entries["BTC"].version == 2)
+    assert hub.derived("BTC", "n", compute) == 2
+
+
+def test_derived_after_eviction_reloads():
+    source = BlockingSource()
+    hub = MarketDataHub(source)
+    hub.acquire("a", "BTC")
+    hub.release("a")
+    assert hub.stats()["entries"] == {}
+    assert hub.derived("BTC", "key", lambda data: data[0]) == "BTC"
+    assert source.calls == 2
+    assert hub.stats()["entries"] == {}  # Aucune session : l'entrée rechargée n'est pas conservée
+
+
+def test_idle_sessions_release_their_key():
+    timer = FakeTimer()
+    hub = MarketDataHub(BlockingSource(), session_timeout=100, timer=timer)
+    hub.acquire("a", "BTC")
+    hub.acquire("b", "ETH")
+    timer.now = 50
+    hub.touch("b")
+    timer.now = 120
+    hub.acquire("c", "SOL")
+    assert hub.stats()["entries"] == {"ETH": 1, "SOL": 1}
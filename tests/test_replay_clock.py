@@ -0,0 +1,87 @@
+import pytest
+
+from replay_clock import ReplayClock, SessionStore
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_clock_index_is_function_of_virtual_time():
+    timer = FakeTimer()
+    clock = ReplayClock(100, step_seconds=0.5, timer=timer)
+    clock.start()
+    timer.now = 2.0
+    assert clock.index == 4 and clock.running
+    clock.set_speed(10)
+    timer.now = 3.0
+    assert clock.index == 24
+    clock.pause()
+    timer.now = 100.0
+    assert clock.index == 24 and not clock.running
+    clock.resume()
+    timer.now = 1000.0
+    assert clock.index == 100 and not clock.running  # Fin du rejeu
+
+
+def test_clock_seek_parks_at_index():
+    timer = FakeTimer()
+    clock = ReplayClock(10, timer=timer)
+    clock.start()
+    clock.seek(50, n_steps=40)
+    timer.now = 10.0
+    assert clock.index == 40 and not clock.running
+    with pytest.raises(ValueError):
+        clock.set_speed(0)
+
+
+def test_sessions_expire_after_ttl():
+    timer = FakeTimer()
+    evicted = []
+    store = SessionStore(dict, ttl=10, timer=timer, on_evict=lambda session_id, state: evicted.append(session_id))
+    first = store.get("a")
+    store.get("b")
+    timer.now = 8
+    assert store.get("a") is first  # L'accès repousse l'expiration
+    timer.now = 15
+    store.get("c")
+    assert evicted == ["b"] and len(store) == 2
+    timer.now = 30
+    assert store.get("a") is not first
+    assert evicted == ["b", "a", "c"]
+
+
+def test_sessions_lru_cap_and_release():
+    evicted = []
+    store = SessionStore(dict, max_sessions=2, on_evict=lambda session_id, state: evicted.append(session_id))
+    store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+    assert evicted == ["b"]
+    store.release("a")
+    store.release("unknown")
+    assert evicted == ["b", "a"] and len(store) == 1
+
+
+def test_clock_sequence_is_reproducible_for_a_speed():
+    def replay(read_times, speed):
+        timer = FakeTimer()
+        clock = ReplayClock(1000, step_seconds=0.1, speed=speed, timer=timer)
+        clock.start()
+        indices = []
+        for now in read_times:
+            timer.now = now
+            indices.append(clock.index)
+        return indices
+
+    times = [0.05 * k for k in range(1, 200)]
+    # Lectures plus ou moins fréquentes : mêmes index aux mêmes instants
+    sparse = replay(times[::7], 10)
+    assert replay(times, 10)[::7] == sparse == replay(times[::7], 10)
+    assert sparse == [min(1000, int(round(t * 100, 9))) for t in times[::7]]
+    assert replay(times, 100) != replay(times, 10)
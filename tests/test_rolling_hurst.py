@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hurst_estimators import default_scales, estimate_hurst
+from rolling_hurst import rolling_hurst
+
+
+def prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+@pytest.mark.parametrize("window", [80, 128, 200])
+def test_each_window_matches_batch_dfa(window):
+    close = prices(700, seed=window)
+    result = rolling_hurst(close, window=window).to_numpy()
+    scales = default_scales(window, 10, window // 4)
+    # Fenêtre de `window` incréments, donc window + 1 prix, se terminant au point t
+    assert np.isnan(result[:window]).all()
+    for t in range(window, len(close)):
+        expected = estimate_hurst(close[t - window:t + 1], method="dfa", kind="price", scales=scales)[0]
+        assert result[t] == pytest.approx(expected, abs=1e-9)
+
+
+def test_increments_and_explicit_scales():
+    incs = np.random.default_rng(1).normal(size=500)
+    result = rolling_hurst(incs, window=100, kind="change", scales=[5, 10, 20]).to_numpy()
+    assert np.isnan(result[:99]).all()
+    for t in (99, 250, 499):
+        expected = estimate_hurst(incs[t - 99:t + 1], method="dfa", kind="change", scales=[5, 10, 20])[0]
+        assert result[t] == pytest.approx(expected, abs=1e-9)
+
+
+def test_chunks_and_workers_do_not_change_results():
+    close = pd.Series(prices(3000, seed=2), index=pd.date_range("2024-01-01", periods=3000, freq="min"))
+    reference = rolling_hurst(close, window=128)
+    assert reference.index.equals(close.index) and reference.name == "Hurst"
+    pd.testing.assert_series_equal(rolling_hurst(close, window=128, chunk_size=97), reference, atol=1e-10)
+    pd.testing.assert_series_equal(rolling_hurst(close, window=128, chunk_size=700, workers=2), reference,
+                                   atol=1e-10)
+
+
+def test_short_series_and_invalid_scales():
+    assert rolling_hurst(prices(50), window=80).isna().all()
+    with pytest.raises(ValueError):
+        rolling_hurst(prices(500), window=32, min_scale=10)
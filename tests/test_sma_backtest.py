@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sma_backtest import TRADING_DAYS, _max_drawdown, rolling_means, sweep_sma_crossover
+
+
+def prices(n=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, n)))
+
+
+def reference_pair(close, short, long, cost):
+    """Backtest d'un couple avec pandas, selon la convention de generate_signals."""
+    close = pd.Series(close)
+    sma_short = close.rolling(short).mean()
+    sma_long = close.rolling(long).mean()
+    position = pd.Series(np.where(sma_short > sma_long, 1.0, -1.0))
+    position[sma_long.isna()] = 0.0
+    strategy = (position.shift(1) * close.pct_change()).iloc[1:]
+    turnover = position.diff().fillna(position).abs().shift(1).iloc[1:]
+    strategy = strategy - cost * turnover
+    equity = (1 + strategy).cumprod()
+    peak = np.maximum(equity.cummax(), 1.0)
+    return {
+        "total_return": equity.iloc[-1] - 1.0,
+        "sharpe": strategy.mean() / strategy.std(ddof=0) * np.sqrt(TRADING_DAYS),
+        "max_drawdown": 1.0 - (equity / peak).min(),
+    }
+
+
+def test_rolling_means_match_pandas():
+    close = prices(500)
+    windows = [1, 5, 20, 200, 500, 600]
+    sma = rolling_means(close, windows)
+    for i, w in enumerate(windows):
+        np.testing.assert_allclose(sma[i], pd.Series(close).rolling(w).mean().to_numpy(), rtol=1e-10)
+    assert np.isnan(sma[-1]).all()
+
+
+@pytest.mark.parametrize("cost", [0.0, 0.0005])
+def test_sweep_matches_pandas_per_pair(cost):
+    close = prices()
+    shorts, longs = [5, 10, 20, 50], [20, 50, 100, 200]
+    results = sweep_sma_crossover(close, shorts, longs, cost=cost, chunk_size=3)
+    pairs = [(s, l) for s in shorts for l in longs if s < l]
+    assert list(zip(results["short_window"], results["long_window"])) == pairs
+    for row in results.itertuples():
+        expected = reference_pair(close, row.short_window, row.long_window, cost)
+        assert row.total_return == pytest.approx(expected["total_return"], rel=1e-8)
+        assert row.sharpe == pytest.approx(expected["sharpe"], rel=1e-8)
+        assert row.max_drawdown == pytest.approx(expected["max_drawdown"], rel=1e-8)
+
+
+def test_chunk_size_does_not_change_results():
+    close = prices(800, seed=1)
+    shorts, longs = np.arange(2, 30, 3), np.arange(10, 120, 7)
+    pd.testing.assert_frame_equal(sweep_sma_crossover(close, shorts, longs, chunk_size=1),
+                                  sweep_sma_crossover(close, shorts, longs, chunk_size=100))
+
+
+def test_drawdown_counts_initial_capital():
+    # Perte dès la première barre : le sommet est le capital initial, pas le premier point
+    equity = np.array([[0.9, 0.95, 1.1, 0.99], [1.0, 1.2, 0.9, 1.3]])
+    np.testing.assert_allclose(_max_drawdown(equity.copy()), [0.1, 0.25])
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from fractal_engine import find_fractals
+from streaming_fractals import BEARISH, BULLISH, EVENT_DTYPE, StreamingFractals
+
+
+def random_bars(n_symbols, n, seed=0):
+    rng = np.random.default_rng(seed)
+    high = np.round(rng.normal(0, 1, (n_symbols, n)).cumsum(axis=1), 1)  # Arrondi : quelques égalités
+    low = high - np.round(rng.uniform(0.1, 2, (n_symbols, n)), 1)
+    return high, low
+
+
+def expected_events(high, low, window):
+    """Fractales de find_fractals, au format (symbole, type, barre pivot, prix, barre de confirmation)."""
+    bullish, bearish = find_fractals(high, low, window)
+    events = set()
+    for kind, mask, prices in ((BEARISH, bearish, high), (BULLISH, bullish, low)):
+        for symbol, bar in zip(*np.nonzero(np.atleast_2d(mask))):
+            events.add((symbol, kind, bar, np.atleast_2d(prices)[symbol, bar], bar + window // 2))
+    return events
+
+
+def as_set(events):
+    return {(e["symbol"], e["kind"], e["pivot_time"], e["price"], e["confirmed_time"]) for e in events}
+
+
+@pytest.mark.parametrize("window", [3, 5, 7])
+def test_bar_by_bar_matches_find_fractals(window):
+    high, low = random_bars(1, 1500, seed=window)
+    detector = StreamingFractals(["BTC"], window=window)
+    events = []
+    for t in range(high.shape[1]):
+        confirmed = detector.update("BTC", high[0, t], low[0, t], t)
+        # Confirmation exactement window // 2 barres après le pivot
+        assert (confirmed["confirmed_time"] == t).all()
+        assert (confirmed["pivot_time"] == t - window // 2).all()
+        events.extend(confirmed)
+    assert as_set(events) == expected_events(high[0], low[0], window)
+
+
+def test_update_batch_over_several_symbols():
+    high, low = random_bars(6, 800, seed=1)
+    detector = StreamingFractals([f"S{i}" for i in range(6)])
+    received = []
+    detector.subscribe(received.append)
+    returned = []
+    for t in range(high.shape[1]):
+        # Ordre des symboles variable d'une barre à l'autre
+        order = np.random.default_rng(t).permutation(6)
+        events = detector.update_batch(order, high[order, t], low[order, t], t)
+        assert events.dtype == EVENT_DTYPE
+        returned.extend(events)
+    assert as_set(returned) == expected_events(high, low, 5)
+    assert all(len(events) for events in received)
+    assert as_set(np.concatenate(received)) == as_set(returned)
+
+
+def test_symbols_added_later_grow_buffers():
+    high, low = random_bars(40, 300, seed=2)
+    detector = StreamingFractals(window=5)
+    events = []
+    for t in range(high.shape[1]):
+        # Un nouveau symbole tous les 5 barres : capacité initiale (16) dépassée en cours de route
+        active = min(40, 1 + t // 5)
+        indices = [detector.index_of(f"S{i}") for i in range(active)]
+        events.extend(detector.update_batch(indices, high[:active, t], low[:active, t], t))
+    assert len(detector._count) >= 40 and detector.symbols == [f"S{i}" for i in range(40)]
+    expected = set()
+    for i in range(40):
+        start = 5 * i  # Première barre reçue par le symbole i
+        expected |= {(i, kind, bar + start, price, confirmed + start)
+                     for _, kind, bar, price, confirmed in expected_events(high[i, start:], low[i, start:], 5)}
+    assert as_set(events) == expected
+
+
+def test_reset_clears_buffer():
+    detector = StreamingFractals(["A"], window=3)
+    highs = [1.0, 5.0, 2.0, 1.0]
+    for t, h in enumerate(highs[:2]):
+        detector.update("A", h, h - 10, t)
+    detector.reset("A")
+    index = detector.index_of("A")
+    assert detector._count[index] == 0 and (detector._time[index] == 0).all()
+    assert np.isnan(detector._high[index]).all()
+    # Le sommet à 5.0 d'avant la remise à zéro n'est pas confirmé par les barres suivantes
+    assert len(detector.update("A", 2.0, -8.0, 2)) == 0
+    assert len(detector.update("A", 1.0, -9.0, 3)) == 0
+    events = detector.update("A", 3.0, -7.0, 4)
+    assert as_set(events) == {(0, BULLISH, 3, -9.0, 4)}
+
+
+def test_update_batch_rejects_repeated_symbols():
+    detector = StreamingFractals(["A", "B"])
+    with pytest.raises(ValueError):
+        detector.update_batch([0, 1, 0], [1.0, 2.0, 3.0], [0.0, 1.0, 2.0], 0)
+    assert (detector._count == 0).all()
+
+
+@pytest.mark.parametrize("window", [1, 4])
+def test_invalid_window(window):
+    with pytest.raises(ValueError):
+        StreamingFractals(window=window)
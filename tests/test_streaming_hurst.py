@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+from hurst_estimators import estimate_hurst
+from streaming_hurst import StreamingHurst
+
+
+def prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+@pytest.mark.parametrize("n", [101, 500, 1500, 2003])
+def test_matches_batch_rs(n):
+    series = prices(n, seed=n)
+    expected = estimate_hurst(series, method="rs", kind="price", max_scale=1000)[0]
+    assert StreamingHurst().extend(series) == pytest.approx(expected, abs=1e-12)
+
+
+def test_undefined_until_two_scales_have_two_blocks():
+    estimator = StreamingHurst()
+    series = prices(200)
+    values = [estimator.update(p) for p in series]
+    # Échelles 10 et 17 : la seconde a deux blocs complets au 34e rendement (35e prix)
+    assert all(math.isnan(v) for v in values[:34])
+    assert not math.isnan(values[34])
+
+
+def test_memory_stays_flat_without_lookback():
+    estimator = StreamingHurst(max_scale=100)
+    estimator.extend(prices(20_000))
+    assert all(len(state.blocks) == 0 for state in estimator.scales)
+    assert len(estimator._returns) == 200
+    assert estimator.scales[0].count == 19_999 // 10
+
+
+@pytest.mark.parametrize("periods", [1, 3, 10])
+def test_window_matches_fresh_estimator_on_last_prices(periods):
+    # Échelles 10 et 17 (ppcm 170) : les blocs de la fenêtre sont alignés sur son début
+    # quand le nombre de rendements avant la fenêtre est un multiple de 170
+    lookback = 41
+    series = prices(170 * periods + lookback, seed=periods)
+    windowed = StreamingHurst(min_scale=10, max_scale=20, lookback=lookback)
+    windowed.extend(series)
+    window = series[-lookback:]
+    fresh = StreamingHurst(min_scale=10, max_scale=20).extend(window)
+    assert [state.scale for state in windowed.scales] == [10, 17]
+    assert windowed.value == pytest.approx(fresh, abs=1e-12)
+    assert fresh == pytest.approx(estimate_hurst(window, method="rs", kind="price", scales=[10, 17])[0], abs=1e-12)
+    assert [len(state.blocks) for state in windowed.scales] == [4, 2]
+
+
+def test_window_evicts_old_blocks():
+    estimator = StreamingHurst(lookback=200)
+    estimator.extend(prices(5000))
+    for state in estimator.scales:
+        assert len(state.blocks) == state.count <= 199 // state.scale
+        assert state.blocks[0][0] >= 4999 - 199
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_client import kline_dtype
+from timeframes import MultiTimeframe, interval_ms, merge_klines, resample_klines
+
+MINUTE = 60_000
+# Début volontairement en milieu d'heure pour avoir des groupes incomplets aux bords
+START = 1_700_000_000_000 // 3_600_000 * 3_600_000 + 17 * MINUTE
+
+
+def make_klines(n, seed=0):
+    rng = np.random.default_rng(seed)
+    klines = np.zeros(n, dtype=kline_dtype())
+    klines["open_time"] = START + np.arange(n) * MINUTE
+    klines["close_time"] = klines["open_time"] + MINUTE - 1
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    klines["open"] = np.concatenate([[100.0], close[:-1]])
+    klines["close"] = close
+    klines["high"] = np.maximum(klines["open"], close) * (1 + rng.random(n) * 1e-3)
+    klines["low"] = np.minimum(klines["open"], close) * (1 - rng.random(n) * 1e-3)
+    klines["volume"] = rng.random(n)
+    klines["quote_volume"] = klines["volume"] * close
+    klines["trades"] = rng.integers(1, 100, n)
+    klines["taker_buy_base_volume"] = klines["volume"] / 2
+    klines["taker_buy_quote_volume"] = klines["quote_volume"] / 2
+    return klines
+
+
+def assert_klines_equal(actual, expected):
+    assert actual.dtype == expected.dtype and len(actual) == len(expected)
+    for name in actual.dtype.names:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-12, err_msg=name)
+
+
+def test_interval_ms():
+    assert interval_ms("1m") == MINUTE and interval_ms("15m") == 15 * MINUTE
+    assert interval_ms("4h") == 4 * 3_600_000 and interval_ms("1d") == 86_400_000
+    for bad in ("7m", "1w", "", "m", "0h"):
+        with pytest.raises(ValueError):
+            interval_ms(bad)
+
+
+@pytest.mark.parametrize("interval", ["5m", "15m", "1h", "4h"])
+def test_resample_matches_pandas(interval):
+    klines = make_klines(2000)
+    bars = resample_klines(klines, interval)
+    frame = pd.DataFrame({name: klines[name] for name in klines.dtype.names})
+    groups = frame.groupby(frame["open_time"] // interval_ms(interval))
+    expected = groups.agg(open=("open", "first"), high=("high", "max"), low=("low", "min"),
+                          close=("close", "last"), volume=("volume", "sum"), trades=("trades", "sum"))
+    for name in expected.columns:
+        np.testing.assert_allclose(bars[name], expected[name].to_numpy(), err_msg=name)
+    np.testing.assert_array_equal(bars["open_time"] % interval_ms(interval), 0)
+    np.testing.assert_array_equal(bars["close_time"], bars["open_time"] + interval_ms(interval) - 1)
+
+
+def test_resample_empty():
+    assert len(resample_klines(make_klines(0), "1h")) == 0
+
+
+def test_merge_klines_replaces_overlap():
+    klines = make_klines(10)
+    revised = klines[7:].copy()
+    revised["close"] += 1
+    merged = merge_klines(klines[:8], revised, limit=6)
+    np.testing.assert_array_equal(merged["open_time"], klines["open_time"][4:])
+    np.testing.assert_array_equal(merged["close"][-3:], revised["close"])
+    assert merge_klines(klines, klines[:0], 100) is klines
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 250])
+def test_incremental_matches_batch(chunk):
+    klines = make_klines(3000, seed=chunk)
+    frames = MultiTimeframe(["1m", "5m", "15m", "1h"], limit=500)
+    for i in range(0, len(klines), chunk):
+        piece = klines[i:i + chunk].copy()
+        # La dernière kline arrive d'abord ouverte (partielle), puis révisée par l'envoi suivant
+        partial = piece[-1:].copy()
+        partial["close"] *= 1.01
+        partial["high"] = np.maximum(partial["high"], partial["close"])
+        partial["volume"] /= 2
+        frames.update(np.concatenate([piece[:-1], partial]))
+        frames.update(piece[-1:])
+    for interval in ["5m", "15m", "1h"]:
+        expected = resample_klines(klines, interval)
+        # Le premier groupe n'est complet que si les klines de base le couvrent entièrement
+        if klines["open_time"][0] % interval_ms(interval):
+            expected = expected[1:]
+        got = frames.klines(interval)
+        assert_klines_equal(got, expected[-len(got):])
+        assert len(got) == min(500, len(expected))
+    assert_klines_equal(frames.klines("1m"), klines[-frames.base_limit:])
+
+
+def test_seeded_history_is_extended():
+    klines = make_klines(5000)
+    native = resample_klines(klines, "1h")
+    frames = MultiTimeframe(["1m", "1h"], limit=50)
+    frames.seed("1h", native[:70])  # Historique natif jusqu'à la barre en cours
+    seen = int(np.searchsorted(klines["open_time"], native["open_time"][69]) + 20)
+    frames.update(klines[seen - frames.base_limit:seen])
+    frames.update(klines[seen:])
+    assert_klines_equal(frames.klines("1h"), native[-50:])
+
+
+def test_updates_never_modify_returned_arrays():
+    klines = make_klines(200)
+    frames = MultiTimeframe(["5m"], limit=100)
+    frames.update(klines[:100])
+    before = frames.klines("5m")
+    snapshot = before.copy()
+    frames.update(klines[99:])
+    assert frames.klines("5m") is not before
+    assert_klines_equal(before, snapshot)
+
+
+def test_invalid_intervals():
+    with pytest.raises(ValueError):
+        MultiTimeframe(["1m", "90s"])
+    with pytest.raises(ValueError):
+        MultiTimeframe(["5m", "3m"], base="5m")
+    with pytest.raises(KeyError):
+        MultiTimeframe(["1m", "5m"]).klines("1h")
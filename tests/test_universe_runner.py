@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_cache
+from trading_quantitative_strategy import calculate_moving_averages, generate_signals
+from universe_runner import RESULT_COLUMNS, run_universe
+
+
+LENGTHS = {"SHORT": 30}
+
+
+def synthetic_close(ticker):
+    n = LENGTHS.get(ticker, 300)
+    rng = np.random.default_rng(sum(map(ord, ticker)))
+    dates = pd.bdate_range("2022-01-03", periods=n, name="Date")
+    return pd.DataFrame({"Close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))}, index=dates)
+
+
+@pytest.fixture
+def fake_download(monkeypatch):
+    """Remplace le téléchargement : séries synthétiques, vide pour EMPTY, échec pour BAD."""
+    def download(ticker, start=None, end=None, **kwargs):
+        if ticker == "BAD":
+            raise ConnectionError("hors ligne")
+        if ticker == "EMPTY":
+            return synthetic_close(ticker).iloc[:0]
+        return synthetic_close(ticker)
+
+    monkeypatch.setattr(data_cache, "download", download)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_one_row_per_ticker_with_last_signal(fake_download, workers):
+    tickers = [f"T{i}" for i in range(7)] + ["SHORT", "BAD", "EMPTY"]
+    results = run_universe(tickers, "2022-01-01", "2023-06-01", short_window=10, long_window=50,
+                           workers=workers, batch_size=3, max_in_flight=1)
+    assert list(results.columns) == RESULT_COLUMNS
+    assert list(results["ticker"]) == sorted(tickers)
+    rows = results.set_index("ticker")
+    for ticker in tickers[:8]:
+        # Dernière ligne du pipeline complet sur le ticker seul
+        data = generate_signals(calculate_moving_averages(synthetic_close(ticker), 10, 50))
+        row, last = rows.loc[ticker], data.iloc[-1]
+        assert row["date"] == data.index[-1] and row["n_bars"] == len(data)
+        assert row["signal"] == last["Signal"] and row["close"] == last["Close"]
+        np.testing.assert_allclose([row["sma_short"], row["sma_long"]], [last["SMA_Short"], last["SMA_Long"]])
+        assert pd.isna(row["error"]) and row["compute_seconds"] >= 0 and row["download_seconds"] >= 0
+    # Historique plus court que la SMA longue : pas de signal
+    assert rows.loc["SHORT", "signal"] == 0 and np.isnan(rows.loc["SHORT", "sma_long"])
+    assert "ConnectionError" in rows.loc["BAD", "error"] and "aucune donnée" in rows.loc["EMPTY", "error"]
+    assert pd.isna(rows.loc["BAD", "signal"]) and pd.isna(rows.loc["BAD", "date"])
+
+
+def test_all_failures(fake_download):
+    results = run_universe(["BAD", "EMPTY"], "2022-01-01", "2023-06-01", workers=1)
+    assert list(results.columns) == RESULT_COLUMNS and len(results) == 2
+    assert results["error"].notna().all()
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from quanta import build_features
+from walk_forward import evaluate_ticker, fit_folds, forward_returns, run_walk_forward, walk_forward_splits
+
+
+def random_close(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))), index=pd.bdate_range("2015-01-01", periods=n))
+
+
+def naive_fit(X, y, ridge=1e-8):
+    """Équations normales (avec constante) sur les lignes complètes, même régularisation que fit_folds."""
+    ok = np.isfinite(X).all(axis=1) & np.isfinite(y)
+    design = np.column_stack([np.ones(ok.sum()), X[ok]])
+    A = design.T @ design
+    A += ridge * np.trace(A) / len(A) * np.eye(len(A))
+    return np.linalg.solve(A, design.T @ y[ok])
+
+
+@pytest.mark.parametrize("train_size", [None, 300])
+def test_splits_are_purged_and_contiguous(train_size):
+    splits = walk_forward_splits(1000, n_splits=4, min_train_size=252, train_size=train_size, purge=5)
+    train_start, train_end, test_start, test_end = splits.T
+    assert (test_start - train_end == 5).all()
+    assert (test_start[1:] == test_end[:-1]).all() and test_end[-1] == 1000
+    assert test_start[0] == 257 and train_end[0] == 252
+    if train_size is None:
+        assert (train_start == 0).all()
+    else:
+        assert (train_end - train_start == np.minimum(train_end, 300)).all()
+    with pytest.raises(ValueError):
+        walk_forward_splits(260, n_splits=5, min_train_size=252, purge=5)
+
+
+def test_fit_folds_matches_per_fold_refit():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(800, 3))
+    y = X @ [0.5, -1.0, 2.0] + 0.3 + rng.normal(0, 0.1, 800)
+    X[rng.choice(800, 40, replace=False), 1] = np.nan
+    y[rng.choice(800, 20, replace=False)] = np.nan
+    splits = walk_forward_splits(800, n_splits=5, min_train_size=200, train_size=250, purge=3)
+    coefs, n_train = fit_folds(X, y, splits)
+    for k, (start, end, _, _) in enumerate(splits):
+        np.testing.assert_allclose(coefs[k], naive_fit(X[start:end], y[start:end]), rtol=1e-6, atol=1e-8)
+        assert n_train[k] == (np.isfinite(X[start:end]).all(axis=1) & np.isfinite(y[start:end])).sum()
+
+
+@pytest.mark.parametrize("train_size", [None, 400])
+def test_predictions_match_refit_without_future_prices(train_size):
+    close = random_close(1500, seed=2)
+    horizon, windows = 5, ((5, 20), (10, 50))
+    rows, (pred, actual, _) = evaluate_ticker(close, *windows, horizon=horizon, n_splits=4, min_train_size=300,
+                                              train_size=train_size)
+    position = {date: i for i, date in enumerate(close.index)}
+    expected_pred, expected_actual = [], []
+    for row in rows:
+        test_start, test_end = position[row["test_start"]], position[row["test_end"]] + 1
+        # Purge : horizon séances entre la dernière ligne d'apprentissage et le test
+        assert position[row["train_end"]] + horizon + 1 == test_start
+        # Refit naïf sur les seuls prix connus au début du test : la cible de la
+        # dernière ligne d'apprentissage tombe juste avant test_start
+        past = close.iloc[:test_start]
+        X_past = build_features(past, *windows).to_numpy()
+        y_past = forward_returns(past, horizon).to_numpy()
+        train = slice(position[row["train_start"]], position[row["train_end"]] + 1)
+        coef = naive_fit(X_past[train], y_past[train])
+        assert row["n_train"] == np.isfinite(y_past[train]).sum()
+
+        # Les caractéristiques d'une séance de test n'utilisent que les prix jusqu'à elle
+        X_test = build_features(close.iloc[:test_end], *windows).to_numpy()[test_start:test_end]
+        y_test = forward_returns(close, horizon).to_numpy()[test_start:test_end]
+        ok = np.isfinite(X_test).all(axis=1) & np.isfinite(y_test)
+        expected_pred.append((coef[0] + X_test @ coef[1:])[ok])
+        expected_actual.append(y_test[ok])
+    np.testing.assert_allclose(pred, np.concatenate(expected_pred), rtol=1e-5, atol=1e-9)
+    np.testing.assert_array_equal(actual, np.concatenate(expected_actual))
+
+
+def test_future_prices_do_not_change_earlier_folds():
+    close = random_close(1200, seed=3)
+    rows, _ = evaluate_ticker(close, horizon=5, n_splits=3, min_train_size=300)
+    # Les cibles des plis précédents s'arrêtent horizon séances après le début du dernier test
+    shock = close.index.get_loc(rows[-1]["test_start"]) + 5
+    shocked = close.copy()
+    shocked.iloc[shock:] *= np.exp(np.random.default_rng(4).normal(0, 0.2, len(close) - shock))
+    shocked_rows, _ = evaluate_ticker(shocked, horizon=5, n_splits=3, min_train_size=300)
+    metrics = ["mse", "r2", "ic", "hit_rate"]
+    for before, after in zip(rows[:-1], shocked_rows[:-1]):
+        assert all(before[k] == after[k] for k in before if k not in metrics)
+        np.testing.assert_allclose([before[k] for k in metrics], [after[k] for k in metrics], rtol=1e-9)
+    assert abs(rows[-1]["mse"] - shocked_rows[-1]["mse"]) > 1e-6
+
+
+def test_run_walk_forward_pool_and_errors():
+    series = {f"T{i}": random_close(900, seed=10 + i) for i in range(5)}
+    series["SHORT"] = random_close(100)
+    options = dict(horizon=5, n_splits=3, min_train_size=300)
+    folds, summary = run_walk_forward(series, workers=1, batch_size=2, **options)
+    pooled_folds, pooled_summary = run_walk_forward(series, workers=2, batch_size=2, **options)
+    pd.testing.assert_frame_equal(folds, pooled_folds)
+    pd.testing.assert_frame_equal(summary, pooled_summary)
+    assert len(folds) == 15 and list(summary["ticker"]) == sorted(series)
+    short = summary.set_index("ticker").loc["SHORT"]
+    assert "ValueError" in short["error"] and pd.isna(short["n_folds"])
@@ -0,0 +1,161 @@
+import numpy as np
+
+# Unités de temps supérieures calculées localement à partir des klines de base
+#
+# Plutôt qu'une requête par intervalle, on ne récupère que les klines de
+# base (1m) et on en déduit les autres : une barre de l'intervalle `ms`
+# regroupe les klines de base dont open_time // ms est identique (mêmes
+# bornes que Binance, alignées sur l'heure UTC). L'agrégation est
+# vectorisée : début et fin de chaque groupe repérés d'un coup, puis
+# plus haut, plus bas et volumes par np.maximum/minimum/add.reduceat.
+#
+# MultiTimeframe tient les séries de toutes les unités d'un symbole. À
+# chaque nouvelle kline de base, seules les barres supérieures qui la
+# contiennent sont recalculées, à partir des klines de base de leur
+# groupe (au plus 60 pour 1h) : l'historique n'est jamais réagrégé. La
+# dernière kline de base, encore ouverte, peut être révisée par la
+# suivante ; la barre supérieure en cours est alors recalculée de même.
+# Les tableaux renvoyés ne sont jamais modifiés par la suite (les mises à
+# jour en construisent de nouveaux), ils peuvent donc être partagés.
+
+_UNIT_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000}
+DAY_MS = 86_400_000
+
+# Champs additionnés lors de l'agrégation (open, high, low, close et les temps sont traités à part)
+SUMMED_FIELDS = ("volume", "quote_volume", "trades", "taker_buy_base_volume", "taker_buy_quote_volume")
+
+
+def interval_ms(interval):
+    """
+    Durée d'un intervalle Binance en ms.
+    Args:
+        interval (str): Minutes, heures ou jours divisant une journée ('1m', '15m', '1h', '4h', '1d').
+    Returns:
+        int: Durée en millisecondes.
+    """
+    try:
+        ms = int(interval[:-1]) * _UNIT_MS[interval[-1]]
+    except (KeyError, ValueError, IndexError):
+        ms = 0
+    if ms <= 0 or DAY_MS % ms:
+        raise ValueError(f"Intervalle non pris en charge : {interval!r} (minutes, heures ou jours divisant une journée).")
+    return ms
+
+
+def resample_klines(klines, interval):
+    """
+    Agrège des klines triées dans une unité de temps supérieure.
+    Args:
+        klines (np.ndarray): Tableau structuré (voir binance_client.kline_dtype), trié par open_time.
+        interval (str): Unité cible (ex: '1h').
+    Returns:
+        np.ndarray: Klines agrégées, de même type ; la dernière est partielle si son
+        groupe n'est pas complet (comme la kline en cours renvoyée par l'API).
+    """
+    ms = interval_ms(interval)
+    if len(klines) == 0:
+        return klines[:0].copy()
+    buckets = klines["open_time"] // ms * ms
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.append(starts[1:], len(klines)) - 1
+
+    out = np.empty(len(starts), dtype=klines.dtype)
+    out["open_time"] = buckets[starts]
+    out["close_time"] = buckets[starts] + ms - 1
+    out["open"] = klines["open"][starts]
+    out["close"] = klines["close"][ends]
+    out["high"] = np.maximum.reduceat(klines["high"], starts)
+    out["low"] = np.minimum.reduceat(klines["low"], starts)
+    for name in SUMMED_FIELDS:
+        out[name] = np.add.reduceat(klines[name], starts)
+    return out
+
+
+def merge_klines(old, new, limit):
+    """
+    Raccorde des klines récentes à un historique et garde les `limit` plus récentes.
+    Args:
+        old (np.ndarray): Historique trié, ou None.
+        new (np.ndarray): Klines triées ; celles de `old` à partir de new[0] sont remplacées.
+        limit (int): Nombre maximal de klines conservées.
+    Returns:
+        np.ndarray: Nouveau tableau (`old` n'est pas modifié).
+    """
+    if old is None:
+        return new[-limit:]
+    if len(new) == 0:
+        return old
+    kept = old[:np.searchsorted(old["open_time"], new["open_time"][0])]
+    return np.concatenate([kept, new])[-limit:]
+
+
+class MultiTimeframe:
+    """
+    Klines d'un symbole dans plusieurs unités de temps, déduites des klines de base.
+    Args:
+        intervals (list): Unités tenues à jour (multiples de `base` ; `base` peut y figurer).
+        base (str): Unité des klines reçues.
+        limit (int): Nombre de barres conservées par unité.
+    """
+
+    def __init__(self, intervals, base="1m", limit=500):
+        base_ms = interval_ms(base)
+        self.base = base
+        self.limit = limit
+        self._ms = {}
+        for interval in intervals:
+            ms = interval_ms(interval)
+            if ms % base_ms:
+                raise ValueError(f"L'intervalle {interval} n'est pas un multiple de {base}.")
+            if interval != base:
+                self._ms[interval] = ms
+        self.intervals = [base] + list(self._ms)
+        # Assez de klines de base pour recalculer la barre en cours de la plus grande unité
+        self.base_limit = max([limit] + [ms // base_ms for ms in self._ms.values()])
+        self._klines = {}
+
+    def klines(self, interval):
+        """Barres d'une unité (None avant les premières données). À ne pas modifier."""
+        if interval not in self.intervals:
+            raise KeyError(interval)
+        return self._klines.get(interval)
+
+    def last_open_time(self):
+        """open_time de la dernière kline de base reçue (None si aucune)."""
+        base = self._klines.get(self.base)
+        return int(base["open_time"][-1]) if base is not None and len(base) else None
+
+    def seed(self, interval, klines):
+        """
+        Historique natif d'une unité supérieure, à fournir avant les klines de base qui le
+        prolongent : l'API ne donne pas en une requête assez de klines de base pour `limit`
+        barres d'une grande unité. Les barres couvertes par les klines de base sont ensuite recalculées.
+        """
+        if interval not in self._ms:
+            raise KeyError(interval)
+        self._klines[interval] = klines[-self.limit:]
+
+    def update(self, klines):
+        """
+        Ajoute des klines de base et recalcule les barres supérieures qui les contiennent.
+        Args:
+            klines (np.ndarray): Klines de base triées ; la première peut réviser la dernière reçue.
+        Returns:
+            dict: Unité -> barres ajoutées ou recalculées (base comprise).
+        """
+        if len(klines) == 0:
+            return {}
+        # Toutes les nouvelles klines servent à l'agrégation, même au-delà de base_limit
+        base = merge_klines(self._klines.get(self.base), klines, self.base_limit + len(klines))
+        self._klines[self.base] = base[-self.base_limit:]
+        changed = {self.base: klines}
+        first = int(klines["open_time"][0])
+        for interval, ms in self._ms.items():
+            start = first // ms * ms
+            if start < base["open_time"][0]:
+                # Groupe dont les premières klines de base manquent : la barre existante (native) est gardée
+                start += ms
+            bars = resample_klines(base[np.searchsorted(base["open_time"], start):], interval)
+            self._klines[interval] = merge_klines(self._klines.get(interval), bars, self.limit)
+            changed[interval] = bars
+        return changed
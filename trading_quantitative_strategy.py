@@ -1,10 +1,14 @@
 # Importation des bibliothèques nécessaires
-import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
+import data_cache
+import reporting
+from sma_backtest import sweep_sma_crossover
+import instrumentation
+from instrumentation import COMPUTE, FETCH, RENDER, instrumented
 
 # Étape 1 : Télécharger les données financières
+@instrumented(FETCH)
 def download_data(ticker, start_date, end_date):
     """
     Télécharge les données de marché pour un actif donné.
@@ -15,11 +19,12 @@ def download_data(ticker, start_date, end_date):
     Returns:
         pd.DataFrame: Données de marché avec les prix de clôture.
     """
-    data = yf.download(ticker, start=start_date, end=end_date)
+    data = data_cache.download(ticker, start=start_date, end=end_date)
     data['Return'] = data['Close'].pct_change()  # Calcul des rendements quotidiens
     return data
 
 # Étape 2 : Calcul des moyennes mobiles
+@instrumented(COMPUTE)
 def calculate_moving_averages(data, short_window, long_window):
     """
     Calcule les moyennes mobiles (SMA) pour identifier les tendances.
@@ -35,6 +40,7 @@ def calculate_moving_averages(data, short_window, long_window):
     return data
 
 # Étape 3 : Génération des signaux de trading
+@instrumented(COMPUTE)
 def generate_signals(data):
     """
     Génère des signaux d'achat et de vente basés sur les croisements de SMA.
@@ -51,32 +57,50 @@ def generate_signals(data):
     return data
 
 # Étape 4 : Visualisation des signaux
-def plot_results(data, ticker):
+@instrumented(RENDER)
+def plot_results(data, ticker, output=None):
     """
     Trace les prix et les moyennes mobiles avec les signaux d'achat et de vente.
     Args:
         data (pd.DataFrame): Données avec signaux.
         ticker (str): Symbole de l'actif.
+        output (str): Fichier .png ou .svg ; None pour afficher la figure.
     """
-    plt.figure(figsize=(14, 7))
-    plt.plot(data['Close'], label=f'{ticker} - Prix de clôture', alpha=0.5)
-    plt.plot(data['SMA_Short'], label='Moyenne mobile courte (SMA)', linestyle='--')
-    plt.plot(data['SMA_Long'], label='Moyenne mobile longue (SMA)', linestyle='--')
+    fig, ax = reporting.figure((14, 7), output)
+    ax.plot(data['Close'], label=f'{ticker} - Prix de clôture', alpha=0.5)
+    ax.plot(data['SMA_Short'], label='Moyenne mobile courte (SMA)', linestyle='--')
+    ax.plot(data['SMA_Long'], label='Moyenne mobile longue (SMA)', linestyle='--')
 
     # Ajouter les signaux d'achat (vert) et de vente (rouge)
     buy_signals = data[data['Signal'] == 1]
     sell_signals = data[data['Signal'] == -1]
-    plt.scatter(buy_signals.index, buy_signals['Close'], label='Signal Achat', marker='^', color='green', alpha=1)
-    plt.scatter(sell_signals.index, sell_signals['Close'], label='Signal Vente', marker='v', color='red', alpha=1)
+    ax.scatter(buy_signals.index, buy_signals['Close'], label='Signal Achat', marker='^', color='green', alpha=1)
+    ax.scatter(sell_signals.index, sell_signals['Close'], label='Signal Vente', marker='v', color='red', alpha=1)
 
-    plt.title('Signaux de Trading basés sur les Moyennes Mobiles')
-    plt.xlabel('Date')
-    plt.ylabel('Prix')
-    plt.legend()
-    plt.show()
+    ax.set_title('Signaux de Trading basés sur les Moyennes Mobiles')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Prix')
+    ax.legend()
+    return reporting.finish(fig, output)
+
+# Étape 5 : Backtest d'une grille de fenêtres
+@instrumented(COMPUTE)
+def backtest_windows(data, short_windows, long_windows, cost=0.0):
+    """
+    Évalue tous les couples de fenêtres (courte, longue) en une passe vectorisée.
+    Args:
+        data (pd.DataFrame): Données de marché.
+        short_windows (list): Fenêtres courtes à tester.
+        long_windows (list): Fenêtres longues à tester.
+        cost (float): Coût de transaction par changement de position.
+    Returns:
+        pd.DataFrame: Rendement total, Sharpe et perte maximale par couple, triés par Sharpe.
+    """
+    results = sweep_sma_crossover(data['Close'].to_numpy(), short_windows, long_windows, cost=cost)
+    return results.sort_values('sharpe', ascending=False).reset_index(drop=True)
 
 # Exemple d'utilisation
-if __name__ == "__main__":
+def main():
     # Paramètres de configuration
     ticker = "AAPL"  # Symbole de l'action (Apple dans cet exemple)
     start_date = "2022-01-01"
@@ -89,5 +113,15 @@ if __name__ == "__main__":
     data = calculate_moving_averages(data, short_window, long_window)
     data = generate_signals(data)
 
+    # Backtest de la grille de paramètres
+    grid = backtest_windows(data, range(2, 51), range(10, 201, 5))
+    print(grid.head(10))
+
     # Visualiser les résultats
     plot_results(data, ticker)
+
+    if instrumentation.is_enabled():
+        print(instrumentation.format_summary())
+
+if __name__ == "__main__":
+    main()
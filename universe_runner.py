@@ -0,0 +1,189 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+from trading_quantitative_strategy import calculate_moving_averages, generate_signals
+
+# Exécution de la stratégie SMA sur tout un univers de tickers
+#
+# 1. Les séries de clôture sont chargées (via le cache) puis concaténées dans
+#    un seul bloc de mémoire partagée, avec un tableau d'offsets par ticker.
+# 2. Les processus du pool s'y attachent une fois, à l'initialisation ; une
+#    tâche ne transporte que (ticker, offset, longueur), jamais de DataFrame.
+# 3. Le nombre de tâches en vol est borné pour limiter la mémoire des résultats.
+#
+# Le résultat est la table des signaux du soir : une ligne par ticker, avec
+# le signal de la dernière séance chargée (colonne date) et les moyennes
+# mobiles correspondantes. L'historique des signaux n'est pas renvoyé ; il se
+# recalcule pour un ticker avec calculate_moving_averages / generate_signals.
+
+RESULT_COLUMNS = ["ticker", "date", "close", "sma_short", "sma_long", "signal",
+                  "n_bars", "download_seconds", "compute_seconds", "error"]
+
+_shared = {}
+
+
+def _attach(name):
+    """S'attache au bloc partagé ; seul le parent est chargé de le détruire."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 : les workers partagent le resource_tracker du parent,
+        # l'enregistrement supplémentaire est sans effet.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(name, total):
+    shm = _attach(name)
+    _shared["shm"] = shm
+    close = np.ndarray((total,), dtype=np.float64, buffer=shm.buf)
+    close.flags.writeable = False
+    _shared["close"] = close
+
+
+def _run_batch(batch, short_window, long_window):
+    """Applique calculate_moving_averages et generate_signals à un paquet de tickers."""
+    close = _shared["close"]
+    rows = []
+    for ticker, offset, length in batch:
+        started = time.perf_counter()
+        try:
+            # Vue en lecture seule sur la mémoire partagée, sans copie
+            prices = close[offset:offset + length]
+            data = pd.DataFrame({'Close': prices}, copy=False)
+            data = calculate_moving_averages(data, short_window, long_window)
+            data = generate_signals(data)
+            last = data.iloc[-1]
+            rows.append({"ticker": ticker, "close": last['Close'],
+                         "sma_short": last['SMA_Short'], "sma_long": last['SMA_Long'],
+                         "signal": int(last['Signal']), "n_bars": length,
+                         "compute_seconds": time.perf_counter() - started, "error": None})
+        except Exception as e:
+            rows.append({"ticker": ticker, "n_bars": length,
+                         "compute_seconds": time.perf_counter() - started, "error": repr(e)})
+    return rows
+
+
+def load_universe(tickers, start_date, end_date, threads=8):
+    """
+    Charge les clôtures de chaque ticker en parallèle (téléchargement limité par le réseau).
+    Returns:
+        tuple: (dict ticker -> (dates, clôtures), dict ticker -> (durée, erreur)).
+    """
+    def load(ticker):
+        started = time.perf_counter()
+        try:
+            data = data_cache.download(ticker, start=start_date, end=end_date)
+            close = data['Close'].dropna()
+            if close.empty:
+                raise ValueError("aucune donnée")
+            return ticker, (close.index, close.to_numpy(dtype=np.float64)), time.perf_counter() - started, None
+        except Exception as e:
+            return ticker, None, time.perf_counter() - started, repr(e)
+
+    series, status = {}, {}
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for ticker, values, seconds, error in pool.map(load, tickers):
+            status[ticker] = (seconds, error)
+            if values is not None:
+                series[ticker] = values
+    return series, status
+
+
+def run_universe(tickers, start_date, end_date, short_window=10, long_window=50,
+                 workers=None, batch_size=32, max_in_flight=None):
+    """
+    Exécute le pipeline SMA sur une liste de tickers avec un pool de processus.
+    Args:
+        tickers (list): Symboles à traiter.
+        start_date (str): Date de début ('YYYY-MM-DD').
+        end_date (str): Date de fin ('YYYY-MM-DD').
+        short_window (int): Fenêtre de la SMA courte.
+        long_window (int): Fenêtre de la SMA longue.
+        workers (int): Nombre de processus (nombre de cœurs par défaut).
+        batch_size (int): Nombre de tickers par tâche.
+        max_in_flight (int): Nombre maximal de tâches soumises simultanément.
+    Returns:
+        pd.DataFrame: Une ligne par ticker (colonnes RESULT_COLUMNS) : clôture, SMA et
+        signal de la dernière séance seulement (0 si l'historique est plus court que
+        long_window), nombre de barres, durées et erreur éventuelle.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 4 * workers
+    series, status = load_universe(tickers, start_date, end_date)
+
+    rows = [{"ticker": t, "download_seconds": s, "error": e}
+            for t, (s, e) in status.items() if e is not None]
+    if not series:
+        return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+    # Concaténation de toutes les séries dans un seul bloc partagé
+    lengths = {t: len(v[1]) for t, v in series.items()}
+    total = sum(lengths.values())
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8)
+    try:
+        close = np.ndarray((total,), dtype=np.float64, buffer=shm.buf)
+        tasks, offset = [], 0
+        for ticker, (_, values) in series.items():
+            close[offset:offset + len(values)] = values
+            tasks.append((ticker, offset, len(values)))
+            offset += len(values)
+        batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, total)) as pool:
+            pending = set()
+            for batch in batches:
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        rows.extend(future.result())
+                pending.add(pool.submit(_run_batch, batch, short_window, long_window))
+            for future in pending:
+                rows.extend(future.result())
+        del close
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    results["download_seconds"] = results["ticker"].map(lambda t: status[t][0])
+    results[["signal", "n_bars"]] = results[["signal", "n_bars"]].astype("Int64")
+    results["date"] = results["ticker"].map(lambda t: series[t][0][-1] if t in series else pd.NaT)
+    return results.sort_values("ticker").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signaux SMA sur un univers de tickers.")
+    parser.add_argument("tickers", help="Fichier texte avec un ticker par ligne.")
+    parser.add_argument("--start", default="2022-01-01")
+    parser.add_argument("--end", default="2023-01-01")
+    parser.add_argument("--short-window", type=int, default=10)
+    parser.add_argument("--long-window", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="universe_signals.csv")
+    args = parser.parse_args()
+
+    with open(args.tickers) as f:
+        tickers = [line.strip() for line in f if line.strip()]
+
+    started = time.perf_counter()
+    results = run_universe(tickers, args.start, args.end, args.short_window,
+                           args.long_window, workers=args.workers)
+    results.to_csv(args.output, index=False)
+
+    failures = results[results["error"].notna()]
+    print(f"{len(results) - len(failures)} tickers traités, {len(failures)} échecs "
+          f"en {time.perf_counter() - started:.1f} s -> {args.output}")
+    if len(failures):
+        print(failures[["ticker", "error"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
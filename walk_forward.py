@@ -0,0 +1,221 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from quanta import build_features
+
+# Validation walk-forward de la régression linéaire momentum / retour à la moyenne
+#
+# Pour chaque ticker, la matrice de caractéristiques et la cible (rendement
+# sur les `horizon` séances suivantes) sont calculées une seule fois. Les
+# régressions de tous les plis sont ajustées à partir de statistiques
+# suffisantes cumulées (X'X, X'y) : l'ajustement d'un pli sur [début, fin[
+# est une simple différence de deux cumuls, puis un système linéaire de la
+# taille du nombre de caractéristiques, résolu pour tous les plis en une
+# fois. Les jeux de test sont des tranches (vues) de la matrice commune.
+# Les lignes d'apprentissage dont la cible chevauche la période de test sont
+# purgées. Les tickers sont répartis sur un pool de processus.
+
+FOLD_COLUMNS = ["ticker", "fold", "train_start", "train_end", "test_start", "test_end",
+                "n_train", "n_test", "mse", "r2", "ic", "hit_rate", "error"]
+SUMMARY_COLUMNS = ["ticker", "n_folds", "n_test", "mse", "r2", "ic", "hit_rate", "error"]
+
+
+def forward_returns(close, horizon):
+    """Rendement entre la clôture de chaque séance et celle `horizon` séances plus tard."""
+    return close.shift(-horizon) / close - 1.0
+
+
+def walk_forward_splits(n, n_splits=5, min_train_size=252, train_size=None, purge=0):
+    """
+    Bornes des plis walk-forward sur n observations consécutives.
+    Args:
+        n (int): Nombre d'observations.
+        n_splits (int): Nombre de plis de test, consécutifs et disjoints.
+        min_train_size (int): Taille minimale de l'apprentissage du premier pli.
+        train_size (int): Fenêtre d'apprentissage glissante ; None pour une fenêtre croissante.
+        purge (int): Nombre d'observations retirées entre apprentissage et test
+            (au moins l'horizon de la cible).
+    Returns:
+        np.ndarray: Tableau (n_plis, 4) de [début_app, fin_app, début_test, fin_test[.
+    """
+    test_size = (n - min_train_size - purge) // n_splits
+    if test_size < 1:
+        raise ValueError(f"Historique trop court ({n} observations) pour {n_splits} plis.")
+    test_start = min_train_size + purge + np.arange(n_splits) * test_size
+    test_end = np.append(test_start[1:], n)
+    train_end = test_start - purge
+    train_start = np.zeros(n_splits, dtype=int) if train_size is None else np.maximum(train_end - train_size, 0)
+    return np.column_stack([train_start, train_end, test_start, test_end])
+
+
+def _cumulative(values):
+    """Cumul sur le premier axe, précédé d'un zéro."""
+    out = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def fit_folds(X, y, splits, ridge=1e-8):
+    """
+    Ajuste une régression linéaire (avec constante) par pli, à partir des cumuls de X'X et X'y.
+    Args:
+        X (np.ndarray): Caractéristiques (n, f) ; les lignes non finies sont ignorées.
+        y (np.ndarray): Cible (n,).
+        splits (np.ndarray): Bornes des plis (voir walk_forward_splits).
+        ridge (float): Régularisation relative, pour les plis mal conditionnés.
+    Returns:
+        tuple: (coefficients (n_plis, f + 1), constante en premier ; nombre de
+        lignes d'apprentissage par pli).
+    """
+    valid = np.isfinite(X).all(axis=1) & np.isfinite(y)
+    design = np.column_stack([np.ones(len(X)), np.where(valid[:, None], X, 0.0)]) * valid[:, None]
+    target = np.where(valid, y, 0.0)
+    xx = _cumulative(design[:, :, None] * design[:, None, :])
+    xy = _cumulative(design * target[:, None])
+    counts = _cumulative(valid.astype(np.float64))
+
+    start, end = splits[:, 0], splits[:, 1]
+    A = xx[end] - xx[start]
+    b = xy[end] - xy[start]
+    scale = np.trace(A, axis1=1, axis2=2)[:, None, None] / A.shape[-1]
+    A = A + ridge * scale * np.eye(A.shape[-1])
+    return np.linalg.solve(A, b[..., None])[..., 0], (counts[end] - counts[start]).astype(int)
+
+
+def _metrics(pred, actual, benchmark):
+    """Erreur quadratique, R² hors échantillon (face à la moyenne d'apprentissage), corrélation et taux de bon signe."""
+    err = actual - pred
+    mse = float(np.mean(err * err))
+    denom = float(np.sum((actual - benchmark) ** 2))
+    r2 = 1.0 - float(np.sum(err * err)) / denom if denom > 0 else np.nan
+    ic = float(np.corrcoef(pred, actual)[0, 1]) if len(pred) > 2 and pred.std() > 0 and actual.std() > 0 else np.nan
+    hit_rate = float(np.mean(np.sign(pred) == np.sign(actual)))
+    return mse, r2, ic, hit_rate
+
+
+def evaluate_ticker(close, momentum_windows=(5, 20, 60), mean_reversion_windows=(10, 20, 50),
+                    horizon=5, n_splits=5, min_train_size=252, train_size=None):
+    """
+    Validation walk-forward sur un ticker.
+    Args:
+        close (pd.Series): Prix de clôture.
+        momentum_windows (tuple): Fenêtres de momentum.
+        mean_reversion_windows (tuple): Fenêtres de retour à la moyenne.
+        horizon (int): Horizon du rendement à prédire, en séances (et taille de la purge).
+        n_splits (int): Nombre de plis.
+        min_train_size (int): Taille minimale du premier apprentissage.
+        train_size (int): Fenêtre glissante d'apprentissage ; None pour une fenêtre croissante.
+    Returns:
+        tuple: (liste de dictionnaires, un par pli ; tableaux concaténés des
+        prédictions hors échantillon, des rendements réalisés et de la moyenne
+        d'apprentissage de leur pli, pour les métriques agrégées).
+    """
+    close = close.dropna()
+    features = build_features(close, momentum_windows, mean_reversion_windows)
+    target = forward_returns(close, horizon)
+    # Le début (fenêtres incomplètes) et la fin (cible inconnue) ne sont pas exploitables
+    usable = features.notna().all(axis=1) & target.notna()
+    first, last = usable.to_numpy().argmax(), len(usable) - usable.to_numpy()[::-1].argmax()
+    X = features.to_numpy()[first:last]
+    y = target.to_numpy()[first:last]
+    dates = close.index[first:last]
+
+    splits = walk_forward_splits(len(X), n_splits, min_train_size, train_size, purge=horizon)
+    coefs, n_train = fit_folds(X, y, splits)
+    rows, oos = [], []
+    for k, (train_start, train_end, test_start, test_end) in enumerate(splits):
+        X_test, y_test = X[test_start:test_end], y[test_start:test_end]
+        ok = np.isfinite(X_test).all(axis=1) & np.isfinite(y_test)
+        pred = (coefs[k, 0] + X_test @ coefs[k, 1:])[ok]
+        actual = y_test[ok]
+        benchmark = np.nanmean(y[train_start:train_end])
+        mse, r2, ic, hit_rate = _metrics(pred, actual, benchmark)
+        rows.append({"fold": k, "train_start": dates[train_start], "train_end": dates[train_end - 1],
+                     "test_start": dates[test_start], "test_end": dates[test_end - 1],
+                     "n_train": int(n_train[k]), "n_test": int(ok.sum()),
+                     "mse": mse, "r2": r2, "ic": ic, "hit_rate": hit_rate, "error": None})
+        oos.append((pred, actual, np.full(len(pred), benchmark)))
+    return rows, tuple(np.concatenate(parts) for parts in zip(*oos))
+
+
+def _evaluate_batch(batch, options):
+    """Évalue un paquet de tickers dans un processus du pool."""
+    folds, summary = [], []
+    for ticker, dates, values in batch:
+        try:
+            rows, (pred, actual, benchmark) = evaluate_ticker(pd.Series(values, index=dates), **options)
+            folds.extend({"ticker": ticker, **row} for row in rows)
+            mse, r2, ic, hit_rate = _metrics(pred, actual, benchmark)
+            summary.append({"ticker": ticker, "n_folds": len(rows), "n_test": len(pred), "mse": mse,
+                            "r2": r2, "ic": ic, "hit_rate": hit_rate, "error": None})
+        except Exception as e:
+            summary.append({"ticker": ticker, "error": repr(e)})
+    return folds, summary
+
+
+def run_walk_forward(series, workers=None, batch_size=16, **options):
+    """
+    Validation walk-forward sur tout un univers, les tickers répartis sur un pool de processus.
+    Args:
+        series (dict): ticker -> pd.Series de clôtures.
+        workers (int): Nombre de processus (nombre de cœurs par défaut ; 1 pour tout
+            calculer dans le processus courant).
+        batch_size (int): Nombre de tickers par tâche.
+        **options: Paramètres de evaluate_ticker.
+    Returns:
+        tuple: (pd.DataFrame des plis, colonnes FOLD_COLUMNS ; pd.DataFrame du
+        résumé par ticker, colonnes SUMMARY_COLUMNS).
+    """
+    workers = workers or os.cpu_count() or 1
+    items = [(t, s.index, s.to_numpy(dtype=np.float64)) for t, s in series.items()]
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    if workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_evaluate_batch, batches, [options] * len(batches)))
+    else:
+        results = [_evaluate_batch(batch, options) for batch in batches]
+    folds = pd.DataFrame([row for f, _ in results for row in f], columns=FOLD_COLUMNS)
+    summary = pd.DataFrame([row for _, s in results for row in s], columns=SUMMARY_COLUMNS)
+    summary[["n_folds", "n_test"]] = summary[["n_folds", "n_test"]].astype("Int64")
+    return folds, summary.sort_values("ticker").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validation walk-forward momentum / retour à la moyenne.")
+    parser.add_argument("tickers", help="Fichier texte avec un ticker par ligne.")
+    parser.add_argument("--start", default="2010-01-01")
+    parser.add_argument("--end", default="2023-01-01")
+    parser.add_argument("--horizon", type=int, default=5)
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--min-train", type=int, default=252)
+    parser.add_argument("--train-size", type=int, default=None, help="Fenêtre glissante (croissante par défaut).")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="walk_forward", help="Préfixe des fichiers CSV produits.")
+    args = parser.parse_args()
+
+    from universe_runner import load_universe
+
+    with open(args.tickers) as f:
+        tickers = [line.strip() for line in f if line.strip()]
+    started = time.perf_counter()
+    loaded, status = load_universe(tickers, args.start, args.end)
+    series = {t: pd.Series(values, index=dates) for t, (dates, values) in loaded.items()}
+    folds, summary = run_walk_forward(series, workers=args.workers, horizon=args.horizon,
+                                      n_splits=args.splits, min_train_size=args.min_train,
+                                      train_size=args.train_size)
+    failed = pd.DataFrame([{"ticker": t, "error": e} for t, (_, e) in status.items() if e is not None])
+    summary = pd.concat([summary, failed], ignore_index=True) if len(failed) else summary
+    folds.to_csv(f"{args.output}_folds.csv", index=False)
+    summary.to_csv(f"{args.output}_summary.csv", index=False)
+    print(f"{len(summary)} tickers, {len(folds)} plis en {time.perf_counter() - started:.1f} s "
+          f"-> {args.output}_folds.csv, {args.output}_summary.csv")
+    print(summary.drop(columns="error").describe().to_string())
+
+
+if __name__ == "__main__":
+    main()